@@ -5,6 +5,9 @@ ALGORITHM_LIST = [
     ("A* Search", "a_star"),
     ("A* Search (Double Moves)", "a_star_ANDOR"),
 
+    ("ARA* Search (Anytime)", "ara_star"),
+    ("ARA* Search (Double Moves)", "ara_star_ANDOR"),
+
     ("BFS", "bfs"),
     ("BFS (Double Moves)", "bfs_ANDOR"),
 
@@ -26,11 +29,16 @@ ALGORITHM_LIST = [
     ("IDDFS", "iddfs"),
     ("IDDFS (Double Moves)", "iddfs_ANDOR"),
 
+    ("Exact table lookup", "exact_table"),
+    ("Exact table (Double Moves)", "exact_table_ANDOR"),
+
     ("IDA* Search", "ida_star"),
     ("IDA* (Double Moves)", "ida_star_ANDOR"),
 
     ("Beam Search", "beam_search"),
     ("Beam Search(Double Moves)", "beam_search_ANDOR"),
+    ("Beam-Stack Search (Complete)", "beam_stack"),
+    ("Beam-Stack (Double Moves)", "beam_stack_ANDOR"),
 
     ("Simulated Annealing", "simulated_annealing"),
     ("Simulated Annealing (Double)", "simulated_annealing_ANDOR"),
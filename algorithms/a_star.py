@@ -1,61 +1,73 @@
-from heapq import heappush, heappop
+from .state_kernel import pack, unpack, board_size
+from .heuristics import get_heuristic
+from .bucket_queue import make_queue
+from .hda_star import PARALLEL_MIN_CELLS, hda_star
+from .ranking import StateRanking
+from .sma_star import node_budget, sma_star_search
+from .perimeter import get_perimeter
 
-def manhattan_distance(state, goal_state):
-    total = 0
-    for i in range(9):
-        if state[i] != 9:
-            curr_row, curr_col = divmod(i, 3)
-            goal_pos = goal_state.index(state[i])
-            goal_row, goal_col = divmod(goal_pos, 3)
-            total += abs(curr_row - goal_row) + abs(curr_col - goal_col)
-    return total
-
-def get_neighbors(state):
-    neighbors = []
-    s = list(state)
-    blank_index = s.index(9)
-    row, col = divmod(blank_index, 3)
-    moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for dr, dc in moves:
-        new_row = row + dr
-        new_col = col + dc
-        if 0 <= new_row < 3 and 0 <= new_col < 3:
-            new_index = new_row * 3 + new_col
-            new_s = s[:]
-            new_s[blank_index], new_s[new_index] = new_s[new_index], new_s[blank_index]
-            neighbors.append(tuple(new_s))
-    return neighbors
-
-def reconstruct_path(state, parent):
+def reconstruct_path(state, parent, size=3):
     path = []
     while state is not None:
-        path.append(state)
+        path.append(unpack(state, size))
         state = parent[state]
     path.reverse()
     return path
 
-def solve(start_state, goal_state):
-    pq = [(0 + manhattan_distance(start_state, goal_state), 0, start_state)]
-    parent = {start_state: None}
-    g_costs = {start_state: 0}
+def solve(start_state, goal_state, heuristic="manhattan", queue="bucket", workers=1, max_nodes=None,
+          max_mb=None, perimeter_depth=None):
+    size = board_size(start_state)
+    start = pack(start_state)
+    goal = pack(goal_state)
+    if workers != 1 and size * size >= PARALLEL_MIN_CELLS:
+        # HDA*: trạng thái chia cho các tiến trình theo băm (hda_star.py); workers=None dùng mọi lõi CPU.
+        # Bảng nhỏ hơn PARALLEL_MIN_CELLS ô giải tuần tự (khởi động tiến trình tốn hơn cả lời giải)
+        path = hda_star(start, goal, size, heuristic, workers)
+        return None if path is None else [unpack(state, size) for state in path]
+    estimator = get_heuristic(goal, size, heuristic)
+    budget = node_budget(max_nodes, max_mb)
+    if budget is not None:
+        # SMA* (sma_star.py): tối đa budget nút trong bộ nhớ, vẫn tối ưu nếu đường đi tối ưu vừa bộ nhớ
+        if not StateRanking(goal, size).reachable(start):
+            return None
+        expand = lambda code, h: [(next_state, 1, h_value) for next_state, h_value in estimator.successors(code, h)]
+        path = sma_star_search(start, goal, estimator(start), expand, budget)
+        return None if path is None else [unpack(state, size) for state in path]
+    start_h = estimator(start)
+    expand = estimator.successors
+    perimeter = None
+    if perimeter_depth is not None:
+        # Chu vi quanh goal (perimeter.py): h chính xác trong chu vi; nút đầu tiên lấy ra nằm trong chu vi
+        # có f nhỏ nhất nên nối đường đi tối ưu trong chu vi là xong
+        perimeter = get_perimeter(goal, size, perimeter_depth)
+        start_h = perimeter.estimate(start, start_h)
+        expand = perimeter.wrap_heuristic(estimator)
+    # Hàng đợi xô theo (f, g), cùng f ưu tiên g lớn; queue="heap" dùng heapq để so sánh (bucket_queue.py)
+    pq = make_queue(queue)
+    pq.push(0 + start_h, 0, start)
+    parent = {start: None}
+    g_costs = {start: 0}
     visited = set()
     
     while pq:
-        f_value, g_value, current = heappop(pq)
-        if current == goal_state:
-            return reconstruct_path(current, parent)
+        f_value, g_value, current = pq.pop()
+        if current == goal:
+            return reconstruct_path(current, parent, size)
         if current in visited:
             continue
         visited.add(current)
-        for next_state in get_neighbors(current):
+        h_current = f_value - g_value
+        if perimeter is not None and h_current <= perimeter.depth and perimeter.distance(current) is not None:
+            path = reconstruct_path(current, parent, size)
+            return path + [unpack(state, size) for state in perimeter.path_from(current)[1:]]
+        for next_state, h_value in expand(current, h_current):
             if next_state in visited:
                 continue
             new_g = g_value + 1
-            h_value = manhattan_distance(next_state, goal_state)
             f_value = new_g + h_value
             if next_state in g_costs and new_g >= g_costs[next_state]:
                 continue
             g_costs[next_state] = new_g
             parent[next_state] = current
-            heappush(pq, (f_value, new_g, next_state))
-    return None
\ No newline at end of file
+            pq.push(f_value, new_g, next_state)
+    return None
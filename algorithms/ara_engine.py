@@ -0,0 +1,103 @@
+import time
+from heapq import heapify, heappush, heappop
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Lõi ARA* (Anytime Repairing A*), dùng chung cho ara_star (di chuyển đơn) và ara_star_ANDOR (di chuyển kép).
+# - Mỗi vòng là một A* có trọng số: khóa f = g + w * h. Với w > 1, đường đi tìm được có chi phí
+#   không quá w lần tối ưu, và thường tìm được rất nhanh.
+# - Sau mỗi vòng, w giảm và tìm kiếm tiếp tục trên cùng g / cha: các nút có g được cải thiện sau khi
+#   đã đóng (closed) nằm trong tập INCONS và được đưa lại vào OPEN, không bắt đầu lại từ đầu.
+# - Vòng dừng khi khóa nhỏ nhất trong OPEN >= g(đích) (h(đích) = 0 nên khóa của đích là g).
+# - Cận chứng minh được: mọi đường tốt hơn đi qua một nút trong OPEN hoặc INCONS, nên
+#   chi phí tối ưu >= min(g + h) trên các nút đó; hệ số bound = g(đích) / min(g + h) (và <= w).
+#   Khi bound = 1 thì đường đi là tối ưu và thuật toán dừng.
+# - deadline (giây): hết giờ thì trả về đường đi tốt nhất hiện có (hoặc None nếu chưa có).
+
+# expand(code, h) -> các (con, chi phí hành động, h_con)
+Expand = Callable[[int, int], List[Tuple[int, int, int]]]
+# on_improve(đường đi, chi phí, hệ số cận) được gọi mỗi khi có lời giải hoặc cận tốt hơn
+Report = Callable[[List[int], int, float], None]
+
+INFINITY = float('inf')
+DEADLINE_CHECK = 256  # Số nút mở rộng giữa hai lần xem đồng hồ
+
+
+def _path_to(code: int, parent: Dict[int, Optional[int]]) -> List[int]:
+    path: List[int] = []
+    current: Optional[int] = code
+    while current is not None:
+        path.append(current)
+        current = parent[current]
+    path.reverse()
+    return path
+
+
+def ara_star_search(start: int, goal: int, start_h: int, expand: Expand, initial_weight: float = 3.0,
+                    weight_step: float = 0.5, deadline: Optional[float] = None,
+                    on_improve: Optional[Report] = None) -> Tuple[Optional[List[int]], float]:
+    """
+    ARA* từ start đến goal. h phải chấp nhận được để cận đúng.
+    Trả về (đường đi tốt nhất tìm được hoặc None, hệ số cận đã chứng minh: chi phí <= bound * tối ưu).
+    """
+    stop_at = None if deadline is None else time.perf_counter() + deadline
+    g: Dict[int, int] = {start: 0}
+    h_of: Dict[int, int] = {start: start_h}
+    parent: Dict[int, Optional[int]] = {start: None}
+    open_set: Set[int] = {start}
+    closed: Set[int] = set()
+    incons: Set[int] = set()
+    weight = max(1.0, initial_weight)
+    heap: List[Tuple[float, int, int]] = [(weight * start_h, 0, start)]  # (khóa, -g, mã); cùng khóa ưu tiên g lớn
+
+    best_path: Optional[List[int]] = None
+    best_cost = INFINITY
+    bound = INFINITY
+    expansions = 0
+
+    while True:
+        # Một vòng A* có trọng số (ImprovePath)
+        while heap and heap[0][0] < g.get(goal, INFINITY):
+            _, negative_g, code = heappop(heap)
+            if code not in open_set or -negative_g != g[code]:
+                continue  # Mục lỗi thời
+            open_set.discard(code)
+            closed.add(code)
+            expansions += 1
+            if stop_at is not None and expansions % DEADLINE_CHECK == 0 and time.perf_counter() >= stop_at:
+                return best_path, bound
+            code_g = g[code]
+            for child, cost, child_h in expand(code, h_of[code]):
+                child_g = code_g + cost
+                if child_g < g.get(child, INFINITY):
+                    g[child] = child_g
+                    h_of[child] = child_h
+                    parent[child] = code
+                    if child in closed:
+                        incons.add(child)
+                    else:
+                        open_set.add(child)
+                        heappush(heap, (child_g + weight * child_h, -child_g, child))
+
+        if goal not in g:
+            return None, INFINITY  # Đã duyệt hết mà không đến được đích
+
+        # Cận dưới của chi phí tối ưu từ các nút còn dang dở
+        lower = min((g[code] + h_of[code] for code in open_set | incons), default=INFINITY)
+        cost = g[goal]
+        new_bound = 1.0 if lower >= cost else min(weight, cost / lower)
+        if cost < best_cost or new_bound < bound:
+            if cost < best_cost:
+                best_path, best_cost = _path_to(goal, parent), cost
+            bound = new_bound
+            if on_improve is not None:
+                on_improve(best_path, best_cost, bound)
+        if bound <= 1.0:
+            return best_path, bound
+
+        # Giảm trọng số, đưa INCONS vào OPEN và tính lại khóa
+        weight = max(1.0, min(weight - weight_step, bound))
+        open_set |= incons
+        incons.clear()
+        closed.clear()
+        heap = [(g[code] + weight * h_of[code], -g[code], code) for code in open_set]
+        heapify(heap)
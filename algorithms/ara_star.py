@@ -0,0 +1,26 @@
+from .state_kernel import pack, unpack, board_size
+from .heuristics import get_heuristic
+from .ranking import StateRanking
+from .ara_engine import ara_star_search
+
+def solve(start_state, goal_state, heuristic="manhattan", deadline=None, initial_weight=3.0,
+          weight_step=0.5, on_improve=None):
+    size = board_size(start_state)
+    start = pack(start_state)
+    goal = pack(goal_state)
+    if not StateRanking(goal, size).reachable(start):
+        return None
+    estimator = get_heuristic(goal, size, heuristic)
+
+    def expand(code, h):
+        return [(next_state, 1, h_value) for next_state, h_value in estimator.successors(code, h)]
+
+    # on_improve(đường đi dạng tuple, số bước, hệ số cận): mỗi lời giải tốt hơn cùng cận đã chứng minh
+    def report_tuples(path, cost, bound):
+        on_improve([unpack(state, size) for state in path], cost, bound)
+
+    # ARA* (ara_engine.py): lời giải đầu tiên với trọng số initial_weight, rồi giảm dần về 1 (tối ưu);
+    # deadline (giây) hết thì trả về lời giải tốt nhất hiện có
+    path, _ = ara_star_search(start, goal, estimator(start), expand, initial_weight, weight_step,
+                              deadline, None if on_improve is None else report_tuples)
+    return None if path is None else [unpack(state, size) for state in path]
@@ -0,0 +1,55 @@
+from typing import Callable, List, Optional, Tuple
+from .state_kernel import pack, unpack, board_size
+from .heuristics import get_heuristic
+from .ranking import StateRanking
+from .ara_engine import ara_star_search
+
+State = Tuple[int, ...]
+
+def solve(start_state: State, goal_state: State, heuristic: str = 'manhattan',
+          deadline: Optional[float] = None, initial_weight: float = 3.0, weight_step: float = 0.5,
+          on_improve: Optional[Callable[[List[State], int, float], None]] = None) -> Optional[List[State]]:
+    """
+    Giải 8-Puzzle bằng ARA* (A* có trọng số giảm dần, xem ara_engine.py) với di chuyển kép
+    (di chuyển đơn chi phí 1, di chuyển kép chi phí 2, giống a_star_ANDOR).
+
+    Args:
+        start_state (tuple): Trạng thái bắt đầu.
+        goal_state (tuple): Trạng thái đích.
+        heuristic (str): Tên heuristic trong heuristics.HEURISTICS (mặc định 'manhattan').
+        deadline (float): Thời gian tối đa (giây); hết giờ thì trả về lời giải tốt nhất hiện có.
+            None (mặc định) = chạy đến khi chứng minh được lời giải tối ưu.
+        initial_weight (float): Trọng số của h ở vòng đầu tiên (lời giải đầu tiên nhanh, chi phí
+            không quá initial_weight lần tối ưu).
+        weight_step (float): Lượng giảm trọng số sau mỗi vòng.
+        on_improve (callable): Gọi on_improve(đường đi, chi phí, hệ số cận) mỗi khi có lời giải hoặc
+            cận tốt hơn; chi phí <= hệ số cận * chi phí tối ưu.
+
+    Returns:
+        list: Đường đi tốt nhất tìm được (list các tuple trạng thái), None nếu không có.
+    """
+    try:
+        size = board_size(start_state)
+        if len(goal_state) != len(start_state):
+            return None
+        start = pack(start_state)
+        goal = pack(goal_state)
+    except (ValueError, TypeError):
+         print("ARA* (Double): Trạng thái không hợp lệ.")
+         return None
+
+    if not StateRanking(goal, size).reachable(start):
+         print("ARA* (Double): Trạng thái không giải được.")
+         return None
+    estimator = get_heuristic(goal, size, heuristic)
+
+    def report_tuples(path: List[int], cost: int, bound: float) -> None:
+        on_improve([unpack(state, size) for state in path], cost, bound)
+
+    # Hàng xóm (gồm di chuyển kép) từ bảng macro tính sẵn, kèm chi phí và h cập nhật tăng dần
+    found_path, _ = ara_star_search(start, goal, estimator(start), estimator.macro_successors,
+                                    initial_weight, weight_step, deadline,
+                                    None if on_improve is None else report_tuples)
+    if found_path is None:
+        return None
+    return [unpack(state, size) for state in found_path]
@@ -0,0 +1,165 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy là phụ thuộc tùy chọn: không có thì simulated_annealing chạy một chuỗi như cũ
+    np = None
+
+from .macro_tables import get_macro_table
+
+# Simulated annealing nhiều chuỗi (chain) chạy song song theo lô trên mảng numpy, dùng cho
+# simulated_annealing (di chuyển đơn) và simulated_annealing_ANDOR (di chuyển kép).
+# K chuỗi cùng bắt đầu từ start và tiến cùng nhịp với chung một lịch nhiệt độ:
+# - boards: mảng (K, số ô) các giá trị ô, blanks: vị trí ô trống của từng chuỗi, h: Manhattan của từng chuỗi;
+# - mỗi bước chọn ngẫu nhiên một nước đi cho mọi chuỗi (chỉ số trong bảng macro theo vị trí ô trống),
+#   tính delta Manhattan từ bảng dist[ô, vị trí] (chỉ các ô bị di chuyển), rồi chấp nhận theo Metropolis.
+# Số bước bị chặn bởi lịch nhiệt độ (nhiệt độ giảm từ initial_temperature xuống min_temperature).
+# Không ghi nhật ký nước đi (nhật ký K x số bước có thể lên hàng chục MB): trạng thái bộ sinh số ngẫu nhiên
+# được lưu lúc bắt đầu, và khi chuỗi đầu tiên chạm đích (h = 0), đường đi của nó được dựng lại bằng cách
+# phát lại đúng các lần rút số ngẫu nhiên đó (mỗi bước vẫn rút K số) nhưng chỉ áp dụng cho chuỗi thắng.
+# Hai lần chạy dùng chung _step nên chuỗi phát lại đi đúng các nước của chuỗi thắng; bộ nhớ là O(K).
+
+BATCH_CHAINS = 4096
+HAVE_NUMPY = np is not None
+
+# (mids, targets, counts): mids / targets [blank, k] là ô thứ hai / thứ ba của chuỗi ô mà ô trống
+# đi qua (targets = -1 với di chuyển đơn), counts[blank] = số nước đi
+_STEP_TABLES: Dict[Tuple[int, bool], Tuple] = {}
+
+
+def _step_table(size: int, double: bool) -> Tuple:
+    """Bảng nước đi dạng mảng numpy từ macro_tables (double=False: chỉ các di chuyển đơn)."""
+    key = (size, double)
+    table = _STEP_TABLES.get(key)
+    if table is not None:
+        return table
+    chains = [[chain for _, cost, _, chain, _, _, _ in entries if double or cost == 1]
+              for entries in get_macro_table(size)]
+    width = max(len(row) for row in chains)
+    cells = size * size
+    mids = np.zeros((cells, width), np.intp)
+    targets = np.full((cells, width), -1, np.intp)
+    for blank, row in enumerate(chains):
+        for k, chain in enumerate(row):
+            mids[blank, k] = chain[1]
+            if len(chain) == 3:
+                targets[blank, k] = chain[2]
+    counts = np.array([len(row) for row in chains], np.intp)
+    table = (mids, targets, counts)
+    _STEP_TABLES[key] = table
+    return table
+
+
+def _distance_table(goal: Tuple[int, ...], size: int):
+    """dist[v, p] = khoảng cách Manhattan từ vị trí p đến vị trí đích của ô v (0 với ô trống)."""
+    cells = size * size
+    dist = np.zeros((cells + 1, cells), np.int32)
+    for goal_index, value in enumerate(goal):
+        if value == cells:
+            continue
+        goal_row, goal_col = divmod(goal_index, size)
+        for position in range(cells):
+            row, col = divmod(position, size)
+            dist[value, position] = abs(row - goal_row) + abs(col - goal_col)
+    return dist
+
+
+def _step(boards, blanks, h, rows, choice_draw, accept_draw, temperature: float, tables: Tuple, dist,
+          double: bool):
+    """
+    Một bước SA cho các chuỗi rows (cập nhật boards, blanks, h tại chỗ) với các số ngẫu nhiên choice_draw,
+    accept_draw trong [0, 1). Trả về chỉ số các chuỗi đã nhận nước đi.
+    """
+    mids, targets, counts = tables
+    cells = boards.shape[1]
+    # Chọn ngẫu nhiên một nước đi cho mỗi chuỗi
+    choice = (choice_draw * counts[blanks]).astype(np.intp)
+    mid = mids[blanks, choice]
+    moved = boards[rows, mid]  # Ô đi từ mid vào vị trí ô trống
+    delta = dist[moved, blanks] - dist[moved, mid]
+    if double:
+        is_double = targets[blanks, choice] >= 0
+        target = np.where(is_double, targets[blanks, choice], mid)
+        second = boards[rows, target]  # Ô đi từ target vào mid (di chuyển kép)
+        delta += np.where(is_double, dist[second, mid] - dist[second, target], 0)
+
+    # Metropolis: luôn nhận nước đi không làm tăng h, còn lại với xác suất exp(-delta / T)
+    accept = accept_draw < np.exp(np.minimum(-delta / temperature, 0.0))
+    index = np.flatnonzero(accept)
+    if index.size:
+        boards[index, blanks[index]] = moved[index]
+        if double:
+            two = is_double[index]
+            boards[index, mid[index]] = np.where(two, second[index], cells)
+            boards[index[two], target[index[two]]] = cells
+            blanks[index] = np.where(two, target[index], mid[index])
+        else:
+            boards[index, mid[index]] = cells
+            blanks[index] = mid[index]
+        h[index] += delta[index]
+    return index
+
+
+def _replay(start: Tuple[int, ...], winner: int, steps: int, rng_state: Dict, chains: int,
+            initial_temperature: float, cooling_rate: float, tables: Tuple, dist,
+            double: bool) -> List[Tuple[int, ...]]:
+    """
+    Đường đi của chuỗi winner trong steps bước đầu: phát lại bộ sinh số ngẫu nhiên từ rng_state
+    (vẫn rút chains số mỗi lần như anneal_batch) và chỉ chạy _step cho chuỗi đó.
+    """
+    rng = np.random.default_rng()
+    rng.bit_generator.state = rng_state
+    cells = len(start)
+    boards = np.array([start], np.intp)
+    blanks = np.array([start.index(cells)], np.intp)
+    h = np.zeros(1, np.int32)  # h của chuỗi không ảnh hưởng đến nước đi, chỉ cần đủ chỗ cho _step
+    rows = np.arange(1)
+    pick = slice(winner, winner + 1)
+    path = [start]
+    temperature = initial_temperature
+    for _ in range(steps):
+        choice_draw = rng.random(chains)[pick]
+        accept_draw = rng.random(chains)[pick]
+        if _step(boards, blanks, h, rows, choice_draw, accept_draw, temperature, tables, dist, double).size:
+            path.append(tuple(boards[0].tolist()))
+        temperature *= 1 - cooling_rate
+    return path
+
+
+def anneal_batch(start: Tuple[int, ...], goal: Tuple[int, ...], size: int = 3, chains: int = BATCH_CHAINS,
+                 initial_temperature: float = 100.0, cooling_rate: float = 0.003,
+                 min_temperature: float = 0.0001, max_iterations: Optional[int] = None,
+                 double: bool = False, seed: Optional[int] = None) -> Optional[List[Tuple[int, ...]]]:
+    """
+    Chạy chains chuỗi SA cùng lúc từ start (tuple, ô trống = size * size).
+    Trả về đường đi (list tuple) của chuỗi đầu tiên đến goal, hoặc None nếu hết lịch nhiệt độ.
+    """
+    cells = size * size
+    if start == goal:
+        return [start]
+    steps = math.ceil(math.log(min_temperature / initial_temperature) / math.log(1 - cooling_rate))
+    if max_iterations is not None:
+        steps = min(steps, max_iterations)
+    tables = _step_table(size, double)
+    dist = _distance_table(goal, size)
+    rng = np.random.default_rng(seed)
+    rng_state = rng.bit_generator.state  # Để phát lại đường đi của chuỗi thắng
+
+    boards = np.tile(np.array(start, np.intp), (chains, 1))
+    blanks = np.full(chains, start.index(cells), np.intp)
+    h = np.full(chains, int(dist[np.array(start), np.arange(cells)].sum()), np.int32)
+    rows = np.arange(chains)
+    temperature = initial_temperature
+
+    for step in range(steps):
+        choice_draw = rng.random(chains)
+        accept_draw = rng.random(chains)
+        index = _step(boards, blanks, h, rows, choice_draw, accept_draw, temperature, tables, dist, double)
+        if index.size:
+            solved = index[h[index] == 0]
+            if solved.size:
+                return _replay(start, int(solved[0]), step + 1, rng_state, chains, initial_temperature,
+                               cooling_rate, tables, dist, double)
+        temperature *= 1 - cooling_rate
+    return None
@@ -0,0 +1,179 @@
+import time
+from heapq import nsmallest
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .node_pool import NodePool
+
+# Hai biến thể đầy đủ (complete) của beam search, dùng chung cho beam_search (di chuyển đơn) và
+# beam_search_ANDOR (di chuyển kép). Beam search thường bỏ hẳn các trạng thái bị cắt khỏi beam nên có thể
+# trả về None dù bài toán có lời giải.
+# - Beam-stack search (Zhou & Hansen): mỗi lớp d giữ tối đa beam_width nút, và một ngăn xếp beam-stack
+#   ghi cho mỗi lớp khoảng khóa [low, high) của các con đã được đưa vào lớp d + 1 (khóa = (f, mã), f = g + h).
+#   Khi phải cắt, high = khóa của con tốt nhất bị cắt. Khi một lớp rỗng (hoặc mọi nút có f >= cận trên U),
+#   tìm kiếm quay lui: bỏ các mục đã xét hết (high >= U), rồi dịch khoảng của mục trên cùng sang
+#   [high, vô cùng) và sinh lại lớp kế tiếp từ lớp đang lưu. Mỗi lời giải tìm được hạ U.
+#   Ngăn xếp rỗng nghĩa là mọi khoảng đã được xét: lời giải tốt nhất là tối ưu (h chấp nhận được).
+#   Bộ nhớ: beam_width x độ sâu nút. Trùng lặp: con bị bỏ nếu trạng thái đang nằm trong một lớp đã lưu
+#   với g nhỏ hơn hoặc bằng.
+#   deadline chỉ có hiệu lực khi đã có lời giải: trước đó tìm kiếm chạy tiếp (luôn tìm thấy nếu có lời giải),
+#   sau đó hết giờ thì trả về lời giải hiện có, chưa được chứng minh là tối ưu (exhausted = False).
+# - Anytime beam: chạy beam search với beam_width, 2 * beam_width, 4 * beam_width, ... đến khi một vòng
+#   không phải cắt con nào (vòng đó đã xét hết, tương đương BFS theo lớp) hoặc hết deadline. Các vòng sau
+#   chỉ tìm lời giải tốt hơn (bỏ con có f >= U). Ngoài U, các vòng độc lập với nhau: mỗi vòng bắt đầu lại
+#   từ start. Thông tin đã gặp của vòng trước không được dùng để cắt tỉa vòng sau (một trạng thái bị bỏ ở
+#   vòng hẹp có thể nằm trên đường đi mà chỉ vòng rộng hơn mới đi hết, nên cắt theo nó sẽ mất tính đầy đủ).
+#   Bảng seen (mã -> số vòng) chỉ được dùng lại như vùng nhớ, tránh xóa / cấp phát lại mỗi vòng:
+#   một trạng thái đã gặp trong vòng hiện tại khi seen[mã] == số vòng.
+
+# expand(code, h) -> các (con, chi phí hành động, h_con)
+Expand = Callable[[int, int], List[Tuple[int, int, int]]]
+# on_improve(đường đi, chi phí) được gọi mỗi khi có lời giải tốt hơn
+Report = Callable[[List[int], int], None]
+# Một nút trong lớp: (f, mã, g, h, chỉ số nút cha trong lớp trước)
+Node = Tuple[int, int, int, int, int]
+
+INFINITY = float('inf')
+DEFAULT_DEADLINE = 2.0  # Giới hạn thời gian (giây) mặc định của beam_stack / beam_stack_ANDOR (sau khi đã có lời giải)
+LOWEST = (-INFINITY, -1)  # Khóa nhỏ hơn mọi (f, mã)
+HIGHEST = (INFINITY, -1)  # Khóa lớn hơn mọi (f, mã)
+
+
+def _layer_path(layers: List[List[Node]], index: int) -> List[int]:
+    """Đường đi từ gốc đến nút index của lớp cuối cùng trong layers."""
+    path = []
+    for layer in reversed(layers):
+        _, code, _, _, index = layer[index]
+        path.append(code)
+    path.reverse()
+    return path
+
+
+def _next_layer(layer: List[Node], expand: Expand, low: Tuple, high: Tuple, upper: float,
+                stored: Dict[int, int], beam_width: int) -> Tuple[List[Node], Optional[Tuple]]:
+    """
+    Các con của layer có khóa (f, mã) trong [low, high), f < upper và không bị trùng với các lớp đang lưu
+    (stored: mã -> g); giữ beam_width con có khóa nhỏ nhất.
+    Trả về (lớp mới đã sắp xếp theo khóa, khóa của con tốt nhất bị cắt hoặc None nếu không cắt).
+    """
+    best: Dict[int, Node] = {}
+    for index, (_, code, g, h, _) in enumerate(layer):
+        for child, cost, child_h in expand(code, h):
+            child_g = g + cost
+            child_f = child_g + child_h
+            if child_f >= upper:
+                continue
+            known = stored.get(child)
+            if known is not None and known <= child_g:
+                continue
+            current = best.get(child)
+            if current is None or child_g < current[2]:
+                best[child] = (child_f, child, child_g, child_h, index)
+    candidates = [node for node in best.values() if low <= node[:2] < high]
+    selected = nsmallest(beam_width + 1, candidates)
+    if len(selected) > beam_width:
+        return selected[:beam_width], selected[beam_width][:2]
+    return selected, None
+
+
+def beam_stack_search(start: int, goal: int, start_h: int, expand: Expand, beam_width: int,
+                      deadline: Optional[float] = None,
+                      on_improve: Optional[Report] = None) -> Tuple[Optional[List[int]], bool]:
+    """
+    Beam-stack search từ start đến goal, tối đa beam_width nút mỗi lớp.
+    Trả về (đường đi tốt nhất tìm được hoặc None, True nếu đã xét hết: đường đi là tối ưu, hoặc không có
+    lời giải). deadline (giây): hết giờ và đã có lời giải thì trả về lời giải tốt nhất hiện có cùng False;
+    chưa có lời giải thì chạy tiếp đến lời giải đầu tiên.
+    """
+    if start == goal:
+        return [start], True
+    stop_at = None if deadline is None else time.perf_counter() + deadline
+    upper = INFINITY
+    best_path: Optional[List[int]] = None
+    layers: List[List[Node]] = [[(start_h, start, 0, start_h, -1)]]
+    stored: Dict[int, int] = {start: 0}
+    # stack[d] = [low, high]: khoảng khóa các con của layers[d] được đưa vào layers[d + 1]
+    stack: List[List[Tuple]] = [[LOWEST, HIGHEST]]
+
+    while stack:
+        if stop_at is not None and best_path is not None and time.perf_counter() >= stop_at:
+            return best_path, False
+        item = stack[-1]
+        layer, cut = _next_layer(layers[-1], expand, item[0], item[1], upper, stored, beam_width)
+        if cut is not None:
+            item[1] = cut
+        for index, (_, code, g, _, _) in enumerate(layer):
+            if code == goal and g < upper:
+                upper = g
+                best_path = _layer_path(layers + [layer], index)
+                if on_improve is not None:
+                    on_improve(best_path, upper)
+        layer = [node for node in layer if node[0] < upper]
+        if layer:
+            # Đi xuống: lưu lớp mới, các con của nó bắt đầu với khoảng đầy đủ
+            for _, code, g, _, _ in layer:
+                stored[code] = g
+            layers.append(layer)
+            stack.append([LOWEST, HIGHEST])
+            continue
+
+        # Quay lui: bỏ các lớp mà mọi con có f < U đã được xét
+        while stack and stack[-1][1][0] >= upper:
+            stack.pop()
+            for _, code, g, _, _ in layers.pop():
+                if stored.get(code) == g:
+                    del stored[code]
+        if stack:
+            # Xét tiếp các con bị cắt của lớp trên cùng
+            stack[-1][0], stack[-1][1] = stack[-1][1], HIGHEST
+    return best_path, True
+
+
+def anytime_beam_search(start: int, goal: int, start_h: int, expand: Expand, beam_width: int,
+                        deadline: Optional[float] = None,
+                        on_improve: Optional[Report] = None) -> Tuple[Optional[List[int]], bool]:
+    """
+    Beam search lặp lại với độ rộng gấp đôi sau mỗi vòng (beam xếp theo h như beam_search).
+    Trả về (đường đi tốt nhất tìm được hoặc None, True nếu vòng cuối không cắt con nào: khi đó None nghĩa
+    là không có lời giải, và với chi phí đơn vị đường đi là ngắn nhất). deadline (giây): hết giờ thì trả
+    về lời giải tốt nhất hiện có cùng False.
+    """
+    if start == goal:
+        return [start], True
+    stop_at = None if deadline is None else time.perf_counter() + deadline
+    upper = INFINITY
+    best_path: Optional[List[int]] = None
+    seen: Dict[int, int] = {}  # mã -> số vòng gần nhất đã gặp (chỉ dùng lại vùng nhớ, không mang thông tin)
+    width = max(1, beam_width)
+    round_number = 0
+
+    while True:
+        round_number += 1
+        seen[start] = round_number
+        pool = NodePool()
+        beam = [(start_h, 0, pool.add(start))]  # (h, g, chỉ số nút)
+        pruned = False
+        while beam:
+            if stop_at is not None and time.perf_counter() >= stop_at:
+                return best_path, False
+            candidates = []
+            for h, g, index in beam:
+                for child, cost, child_h in expand(pool.states[index], h):
+                    child_g = g + cost
+                    if child_g + child_h >= upper or seen.get(child) == round_number:
+                        continue
+                    seen[child] = round_number
+                    if child == goal:
+                        upper = child_g
+                        best_path = pool.path(index) + [child]
+                        if on_improve is not None:
+                            on_improve(best_path, upper)
+                        continue
+                    # (h, số thứ tự phá hòa, g, trạng thái, chỉ số cha)
+                    candidates.append((child_h, len(candidates), child_g, child, index))
+            if len(candidates) > width:
+                pruned = True
+            beam = [(child_h, child_g, pool.add(child, parent))
+                    for child_h, _, child_g, child, parent in nsmallest(width, candidates)]
+        if not pruned:
+            return best_path, True
+        width *= 2
@@ -1,8 +1,12 @@
 # algorithms/beam_search.py
 import heapq
-from copy import deepcopy
+from .state_kernel import pack, unpack, board_size
+from .heuristics import get_heuristic
+from .node_pool import NodePool
+from .ranking import StateRanking
+from .beam_engine import beam_stack_search, anytime_beam_search
 
-def solve(start, goal, beam_width=5):  # Thêm beam_width làm tham số
+def solve(start, goal, beam_width=5, mode="beam", deadline=None):  # Thêm beam_width làm tham số
     """
     Giải 8-Puzzle sử dụng thuật toán Beam Search.
 
@@ -10,62 +14,62 @@ def solve(start, goal, beam_width=5):  # Thêm beam_width làm tham số
         start (tuple): Trạng thái ban đầu của puzzle.
         goal (tuple): Trạng thái đích của puzzle.
         beam_width (int): Độ rộng của beam (số lượng trạng thái tốt nhất được giữ lại).
+        mode (str): "beam" (beam search thường, có thể không tìm thấy), "stack" (beam-stack search:
+              quay lui qua các lớp bị cắt, luôn tìm thấy và cho đường đi ngắn nhất) hoặc "anytime"
+              (gấp đôi beam_width sau mỗi vòng đến khi không phải cắt), xem beam_engine.py.
+        deadline (float): Giới hạn thời gian (giây) cho "stack" / "anytime"; hết giờ thì trả về
+              lời giải tốt nhất hiện có (chưa chứng minh tối ưu). "stack" chỉ dừng khi đã có lời giải.
 
     Returns:
         list: Danh sách các trạng thái từ trạng thái ban đầu đến trạng thái đích (nếu tìm thấy),
               hoặc None nếu không tìm thấy giải pháp.
     """
 
-    def get_neighbors(state):
-        """Tìm các trạng thái kế cận của một trạng thái."""
-        empty_index = state.index(9)  # Tìm vị trí của ô trống
-        row, col = empty_index // 3, empty_index % 3
-        neighbors = []
+    # Heuristic Manhattan đã biên dịch theo đích: tính đầy đủ một lần cho trạng thái bắt đầu,
+    # sau đó h của hàng xóm được cập nhật từ h hiện tại bằng bảng delta
+    size = board_size(start)
+    start_code = pack(start)
+    goal_code = pack(goal)
+    heuristic = get_heuristic(goal_code, size)
 
-        moves = [(0, 1), (0, -1), (1, 0), (-1, 0)]  # Phải, Trái, Xuống, Lên
-        for dr, dc in moves:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 3 and 0 <= new_col < 3:
-                new_index = new_row * 3 + new_col
-                new_state = list(state)
-                new_state[empty_index], new_state[new_index] = new_state[new_index], new_state[empty_index]
-                neighbors.append(tuple(new_state))
-        return neighbors
+    if mode != "beam":
+        if not StateRanking(goal_code, size).reachable(start_code):
+            return None
+        search = beam_stack_search if mode == "stack" else anytime_beam_search
 
-    def heuristic(state):
-        """Tính heuristic (Manhattan distance) từ trạng thái hiện tại đến trạng thái đích."""
-        distance = 0
-        for i in range(9):
-            if state[i] != 9:  # Không tính ô trống
-                goal_index = goal.index(state[i])
-                row1, col1 = i // 3, i % 3
-                row2, col2 = goal_index // 3, goal_index % 3
-                distance += abs(row1 - row2) + abs(col1 - col2)
-        return distance
+        def expand(code, h):
+            return [(next_state, 1, h_value) for next_state, h_value in heuristic.successors(code, h)]
 
-    # Initialize the beam with the starting state
-    beam = [(heuristic(start), start, [start])]
+        path, exhausted = search(start_code, goal_code, heuristic(start_code), expand, beam_width, deadline)
+        if path is None:
+            return None
+        if not exhausted:
+            print(f"Beam search ({mode}): hết giờ, đường đi {len(path) - 1} bước chưa được chứng minh là tối ưu.")
+        return [unpack(s, size) for s in path]
 
-    visited = {start}
+    # Beam chỉ giữ (h, chỉ số nút); trạng thái và cha nằm trong kho nút dùng chung (node_pool.py)
+    pool = NodePool()
+    beam = [(heuristic(start_code), pool.add(start_code))]
+
+    visited = {start_code}
 
     while beam:
-        new_beam = []
-        for h, state, path in beam:
-            if state == goal:
-                return path  # Solution found
+        candidates = []
+        for h, index in beam:
+            state = pool.states[index]
+            if state == goal_code:
+                return [unpack(s, size) for s in pool.path(index)]  # Solution found
 
-            neighbors = get_neighbors(state)
-            for neighbor in neighbors:
+            neighbors = heuristic.successors(state, h)
+            for neighbor, new_h in neighbors:
                 if neighbor not in visited:
                     visited.add(neighbor)
-                    new_path = path + [neighbor]
-                    new_h = heuristic(neighbor)
-                    heapq.heappush(new_beam, (new_h, neighbor, new_path))
-                    # if len(new_beam) > beam_width:
-                    #     heapq.heappop(new_beam) #keep the size of the beam
+                    # (h, số thứ tự phá hòa, trạng thái, chỉ số cha): không bao giờ so sánh quá số thứ tự
+                    candidates.append((new_h, len(candidates), neighbor, index))
 
-        #keep the size of the beam
-        beam = heapq.nsmallest(beam_width, new_beam)
+        #keep the size of the beam; chỉ các ứng viên được chọn mới vào kho nút
+        beam = [(new_h, pool.add(neighbor, parent))
+                for new_h, _, neighbor, parent in heapq.nsmallest(beam_width, candidates)]
 
 
-    return None  # No solution found
\ No newline at end of file
+    return None  # No solution found
@@ -0,0 +1,9 @@
+from . import beam_search
+from .beam_engine import DEFAULT_DEADLINE
+
+def solve(start_state, goal_state, beam_width=5, deadline=DEFAULT_DEADLINE):
+    # Beam-stack search (beam_engine.py): beam search có quay lui qua các lớp bị cắt,
+    # luôn tìm thấy lời giải và cho đường đi ngắn nhất, bộ nhớ beam_width x độ sâu.
+    # Mặc định dừng sau DEFAULT_DEADLINE giây nếu đã có lời giải và trả về lời giải tốt nhất hiện có (chưa chứng
+    # minh tối ưu); chưa có lời giải thì chạy tiếp đến lời giải đầu tiên. deadline=None: chạy đến khi xét hết
+    return beam_search.solve(start_state, goal_state, beam_width, mode="stack", deadline=deadline)
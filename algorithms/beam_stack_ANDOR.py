@@ -0,0 +1,25 @@
+from typing import List, Optional, Tuple
+from . import beam_search_ANDOR
+from .beam_engine import DEFAULT_DEADLINE
+
+# Định nghĩa kiểu dữ liệu cho trạng thái (một tuple các số nguyên)
+State = Tuple[int, ...]
+
+def solve(start_state: State, goal_state: State, beam_width: int = 10,
+          deadline: Optional[float] = DEFAULT_DEADLINE) -> Optional[List[State]]:
+    """
+    Beam-stack search với di chuyển kép (beam_search_ANDOR với mode="stack").
+
+    Args:
+        start_state (tuple): Trạng thái ban đầu của puzzle.
+        goal_state (tuple): Trạng thái đích của puzzle.
+        beam_width (int): Số nút tối đa mỗi lớp.
+        deadline (float): Giới hạn thời gian (giây); hết giờ và đã có lời giải thì trả về lời giải tốt nhất
+            hiện có, chưa có thì chạy tiếp đến lời giải đầu tiên (mặc định DEFAULT_DEADLINE;
+            None: chạy đến khi xét hết).
+
+    Returns:
+        list: Đường đi có chi phí tối ưu (di chuyển kép tính chi phí 2) nếu xét hết trước deadline,
+              lời giải tốt nhất hiện có (chưa chứng minh tối ưu) nếu hết giờ, hoặc None nếu không có lời giải.
+    """
+    return beam_search_ANDOR.solve(start_state, goal_state, beam_width, mode="stack", deadline=deadline)
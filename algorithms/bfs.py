@@ -1,41 +1,34 @@
 from collections import deque
+from .state_kernel import pack, unpack, board_size
+from .move_tables import successors
+from .ranking import closed_table
+from .bidirectional import bidirectional_bfs
+from .frontier_search import frontier_path
 
-def get_neighbors(state):
-    neighbors = []
-    s = list(state)
-    blank_index = s.index(9)
-    row, col = divmod(blank_index, 3)
-    moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for dr, dc in moves:
-        new_row = row + dr
-        new_col = col + dc
-        if 0 <= new_row < 3 and 0 <= new_col < 3:
-            new_index = new_row * 3 + new_col
-            new_s = s[:]
-            new_s[blank_index], new_s[new_index] = new_s[new_index], new_s[blank_index]
-            neighbors.append(tuple(new_s))
-    return neighbors
-
-def reconstruct_path(state, parent):
-    path = []
-    while state is not None:
-        path.append(state)
-        state = parent[state]
-    path.reverse()
-    return path
-
-def solve(start_state, goal_state):
-    queue = deque([start_state])
-    visited = set([start_state])
-    parent = {start_state: None}
+def solve(start_state, goal_state, bidirectional=False, frontier=False):
+    size = board_size(start_state)
+    start = pack(start_state)
+    goal = pack(goal_state)
+    if frontier:
+        # Chỉ giữ lớp biên (không có visited / parent), đường đi dựng lại bằng chia để trị (frontier_search.py)
+        path = frontier_path(start, goal, size)
+        return None if path is None else [unpack(state, size) for state in path]
+    if bidirectional:
+        # Mở rộng từ cả hai đầu (xem bidirectional.py), vẫn cho đường đi ngắn nhất
+        path = bidirectional_bfs(start, goal, lambda code: successors(code, size))
+        return None if path is None else [unpack(state, size) for state in path]
+    # visited là bitset và parent là mảng int32 theo hạng trạng thái (xem ranking.py)
+    table = closed_table(start, size)
+    queue = deque([(start, table.add(start), -1)])
     
     while queue:
-        current = queue.popleft()
-        if current == goal_state:
-            return reconstruct_path(current, parent)
-        for next_state in get_neighbors(current):
-            if next_state not in visited:
-                visited.add(next_state)
-                parent[next_state] = current
-                queue.append(next_state)
-    return None
\ No newline at end of file
+        current, key, previous = queue.popleft()
+        if current == goal:
+            return [unpack(state, size) for state in table.path(key)]
+        for next_state in successors(current, size):
+            if next_state == previous:
+                continue  # Quay lại trạng thái cha: chắc chắn đã được đánh dấu, bỏ qua để khỏi tính hạng
+            next_key = table.add(next_state, key, current)
+            if next_key >= 0:
+                queue.append((next_state, next_key, current))
+    return None
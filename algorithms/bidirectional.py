@@ -0,0 +1,67 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# BFS hai chiều: mở rộng xen kẽ từ start và từ goal, luôn mở rộng nguyên một lớp của phía có
+# biên nhỏ hơn. Đồ thị trượt ô là vô hướng (nước đi nào cũng đảo ngược được, kể cả di chuyển kép),
+# nên phía goal dùng cùng hàm sinh hàng xóm.
+# Mỗi phía có một bảng visited: mã trạng thái -> (cha, độ sâu). Khi một trạng thái mới sinh ra đã có
+# trong bảng của phía kia thì hai biên gặp nhau; cả lớp hiện tại được mở rộng xong rồi mới chọn
+# điểm gặp có tổng độ sâu nhỏ nhất, nên độ dài đường đi vẫn tối ưu.
+# Với độ sâu d và hệ số nhánh b, số trạng thái đụng tới giảm từ ~b^d xuống ~2 * b^(d/2).
+
+Visited = Dict[int, Tuple[Optional[int], int]]
+
+
+def _chain(state: Optional[int], visited: Visited) -> List[int]:
+    """Chuỗi trạng thái từ state ngược về gốc của phía có bảng visited."""
+    chain = []
+    while state is not None:
+        chain.append(state)
+        state = visited[state][0]
+    return chain
+
+
+def bidirectional_bfs(start: int, goal: int, neighbors: Callable[[int], Iterable[int]]) -> Optional[List[int]]:
+    """
+    Đường đi ít cạnh nhất (list mã trạng thái) từ start đến goal, hoặc None nếu không tới được.
+    neighbors(code) trả về các hàng xóm của code; mỗi hàng xóm tính là một cạnh.
+    """
+    if start == goal:
+        return [start]
+
+    forward: Visited = {start: (None, 0)}
+    backward: Visited = {goal: (None, 0)}
+    forward_frontier = [start]
+    backward_frontier = [goal]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, visited, other = forward_frontier, forward, backward
+        else:
+            frontier, visited, other = backward_frontier, backward, forward
+
+        best_meet: Optional[Tuple[int, int]] = None  # (tổng độ sâu, trạng thái gặp)
+        next_frontier = []
+        for current in frontier:
+            depth = visited[current][1] + 1
+            for next_state in neighbors(current):
+                if next_state in visited:
+                    continue
+                visited[next_state] = (current, depth)
+                next_frontier.append(next_state)
+                meet = other.get(next_state)
+                if meet is not None and (best_meet is None or depth + meet[1] < best_meet[0]):
+                    best_meet = (depth + meet[1], next_state)
+
+        if best_meet is not None:
+            meet_state = best_meet[1]
+            path = _chain(meet_state, forward)
+            path.reverse()
+            path.extend(_chain(backward[meet_state][0], backward))
+            return path
+
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
@@ -5,6 +5,8 @@ import random
 from collections import deque
 import time
 import copy # For deep copying states if necessary
+from .state_kernel import pack
+from .move_tables import move_by_label
 
 # --- Constants and Colors ---
 DARK_BG = (18, 27, 18)
@@ -160,8 +162,9 @@ def find_common_path(initial_belief_states, target_goals):
         print("Error: find_common_path requires exactly 2 states.")
         return None
 
-    initial_belief_tuple = tuple(initial_belief_states)
-    target_goals_set = set(target_goals)
+    # Belief states are kept as pairs of bit-packed codes; tuples only appear at the API boundary.
+    initial_belief_tuple = tuple(pack(state) for state in initial_belief_states)
+    target_goals_set = set(pack(goal) for goal in target_goals)
 
     if all(state in target_goals_set for state in initial_belief_tuple):
         return [] # Already solved
@@ -183,8 +186,8 @@ def find_common_path(initial_belief_states, target_goals):
 
         for move in move_directions:
             state1, state2 = current_belief_tuple
-            next_state1 = apply_move(state1, move)
-            next_state2 = apply_move(state2, move)
+            next_state1 = move_by_label(state1, move)
+            next_state2 = move_by_label(state2, move)
 
             if next_state1 is not None and next_state2 is not None:
                 next_belief_tuple = (next_state1, next_state2)
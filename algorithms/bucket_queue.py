@@ -0,0 +1,87 @@
+from heapq import heappush, heappop
+from typing import Any, Dict, List, Tuple, Type, Union
+
+# Hàng đợi ưu tiên cho các tìm kiếm có chi phí nguyên nhỏ (A*, UCS và các biến thể _ANDOR).
+# f và g của 8-Puzzle chỉ vài chục, nên thay heap O(log n) bằng mảng xô:
+#   buckets[f][g] = danh sách các phần tử có cùng (f, g)
+# - pop() lấy f nhỏ nhất; cùng f thì lấy g lớn nhất (nút sâu hơn, gần đích hơn),
+#   trong cùng (f, g) thì lấy phần tử vào sau cùng (LIFO)
+# - push()/pop() là O(1) khấu hao: con trỏ min_f chỉ lùi khi có phần tử f nhỏ hơn được đẩy vào,
+#   và mỗi hàng buckets[f] luôn kết thúc bằng một xô không rỗng nên g lớn nhất là xô cuối.
+# Không có thao tác giảm khóa: khi tìm được đường tốt hơn, thuật toán đẩy thêm một mục mới và
+# bỏ qua mục cũ (lỗi thời) khi lấy ra, giống cách dùng heapq trước đây.
+
+
+class BucketQueue:
+    """Hàng đợi xô theo (f, g) với f, g là số nguyên không âm."""
+
+    def __init__(self):
+        self.buckets: List[List[List[Any]]] = []
+        self.min_f = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, f: int, g: int, item: Any) -> None:
+        buckets = self.buckets
+        while len(buckets) <= f:
+            buckets.append([])
+        row = buckets[f]
+        while len(row) <= g:
+            row.append([])
+        row[g].append(item)
+        self.size += 1
+        if f < self.min_f:
+            self.min_f = f
+
+    def pop(self) -> Tuple[int, int, Any]:
+        """Lấy ra (f, g, item) với f nhỏ nhất, rồi g lớn nhất; raise IndexError nếu hàng đợi rỗng."""
+        if not self.size:
+            raise IndexError("pop from empty BucketQueue")
+        buckets = self.buckets
+        f = self.min_f
+        while not buckets[f]:
+            f += 1
+        self.min_f = f
+        row = buckets[f]
+        g = len(row) - 1
+        bucket = row[g]
+        item = bucket.pop()
+        if not bucket:
+            # Giữ bất biến: xô cuối của mỗi hàng không rỗng
+            row.pop()
+            while row and not row[-1]:
+                row.pop()
+        self.size -= 1
+        return f, g, item
+
+
+class HeapQueue:
+    """Cùng giao diện với BucketQueue nhưng dùng heapq (thứ tự (f, g, item) như trước); dùng để so sánh."""
+
+    def __init__(self):
+        self.heap: List[Tuple[int, int, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def push(self, f: int, g: int, item: Any) -> None:
+        heappush(self.heap, (f, g, item))
+
+    def pop(self) -> Tuple[int, int, Any]:
+        return heappop(self.heap)
+
+
+PriorityQueue = Union[BucketQueue, HeapQueue]
+
+# Các hàng đợi có thể chọn theo tên (tham số queue= của A*/UCS)
+QUEUES: Dict[str, Type[PriorityQueue]] = {'bucket': BucketQueue, 'heap': HeapQueue}
+
+
+def make_queue(name: str = 'bucket') -> PriorityQueue:
+    """Tạo hàng đợi ưu tiên theo tên; raise ValueError nếu tên không có trong QUEUES."""
+    factory = QUEUES.get(name)
+    if factory is None:
+        raise ValueError(f"Hàng đợi không hợp lệ: {name!r} (chọn một trong {sorted(QUEUES)})")
+    return factory()
@@ -0,0 +1,130 @@
+import mmap
+import os
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from .state_kernel import State, pack, board_size
+from .move_tables import successors
+from .ranking import StateRanking, RANKED_LIMIT
+from .relabel import get_relabeling
+
+# Bảng khoảng cách chính xác cho toàn bộ không gian trạng thái (chỉ dùng được với 3x3):
+#   distances[rank(state)] = số bước tối ưu từ state đến goal
+# Bảng được dựng bằng BFS ngược từ goal (đồ thị vô hướng nên BFS ngược = BFS xuôi),
+# mỗi trạng thái chiếm 1 byte (181440 byte cho 3x3), lưu xuống file và nạp lại bằng mmap.
+# Giải tối ưu chỉ còn là đi "xuống dốc": mỗi bước chọn hàng xóm có khoảng cách nhỏ hơn 1.
+# Bảng chỉ được dựng cho các đích chuẩn (relabel.py); đích khác được đổi nhãn về đích chuẩn.
+
+UNKNOWN = 0xFF
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_cache")
+
+Distances = Union[bytearray, mmap.mmap]
+
+_TABLES: Dict[Tuple[int, int], "ExactTable"] = {}
+
+
+def build_distances(goal_code: int, size: int = 3) -> bytearray:
+    """BFS ngược từ goal_code theo từng lớp, ghi khoảng cách vào mảng byte đánh chỉ số theo hạng."""
+    ranking = StateRanking(goal_code, size)
+    distances = bytearray([UNKNOWN]) * ranking.count
+    goal_rank = ranking.rank(goal_code)
+    distances[goal_rank] = 0
+    frontier = [(goal_code, goal_rank)]
+    depth = 0
+    while frontier:
+        depth += 1
+        if depth >= UNKNOWN:
+            raise ValueError(f"Khoảng cách vượt quá {UNKNOWN - 1}, không lưu được trong 1 byte")
+        next_frontier = []
+        for code, code_rank in frontier:
+            for child in successors(code, size):
+                child_rank = ranking.child_rank(child, code, code_rank)
+                if distances[child_rank] == UNKNOWN:
+                    distances[child_rank] = depth
+                    next_frontier.append((child, child_rank))
+        frontier = next_frontier
+    return distances
+
+
+def cache_path(goal_code: int, size: int = 3, kind: str = "exact") -> str:
+    """Đường dẫn file bảng cho một trạng thái đích (tên file chứa loại bảng và mã đích dạng hex)."""
+    return os.path.join(CACHE_DIR, f"{kind}_{size}x{size}_{goal_code:x}.bin")
+
+
+def load_distances(path: str, count: int, build: Callable[[], bytearray]) -> Distances:
+    """Nạp bảng bằng mmap nếu file hợp lệ; nếu không thì gọi build() và ghi file (ghi lỗi thì giữ trong bộ nhớ)."""
+    try:
+        if os.path.getsize(path) == count:
+            with open(path, "rb") as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+        pass
+
+    distances = build()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(distances)
+        os.replace(tmp_path, path)  # Ghi nguyên tử: tiến trình khác không đọc phải file dở dang
+    except OSError as e:
+        print(f"Không ghi được bảng khoảng cách vào {path}: {e}")
+    return distances
+
+
+class ExactTable:
+    """Bảng khoảng cách chính xác đến một trạng thái đích cố định."""
+
+    def __init__(self, goal_code: int, size: int = 3):
+        self.goal_code = goal_code
+        self.size = size
+        self.ranking = StateRanking(goal_code, size)
+        if self.ranking.count > RANKED_LIMIT:
+            raise ValueError(f"Bảng {size}x{size} quá lớn để lập bảng khoảng cách đầy đủ")
+        self.distances: Distances = load_distances(cache_path(goal_code, size), self.ranking.count,
+                                                   lambda: build_distances(goal_code, size))
+
+    def distance(self, code: int) -> Optional[int]:
+        """Số bước tối ưu từ code đến đích, hoặc None nếu code không giải được."""
+        if not self.ranking.reachable(code):
+            return None
+        return self.distances[self.ranking.rank(code)]
+
+    def solve_code(self, code: int) -> Optional[List[int]]:
+        """Đi xuống dốc theo khoảng cách: O(độ dài đường đi) lần tra bảng."""
+        if not self.ranking.reachable(code):
+            return None
+        ranking = self.ranking
+        distances = self.distances
+        size = self.size
+        code_rank = ranking.rank(code)
+        remaining = distances[code_rank]
+        path = [code]
+        while remaining:
+            for child in successors(code, size):
+                child_rank = ranking.child_rank(child, code, code_rank)
+                if distances[child_rank] == remaining - 1:
+                    code, code_rank = child, child_rank
+                    break
+            remaining -= 1
+            path.append(code)
+        return path
+
+
+def get_exact_table(goal_code: int, size: int = 3) -> ExactTable:
+    """Bảng cho goal_code, được nạp một lần cho mỗi tiến trình (lần đầu có thể phải dựng và ghi file)."""
+    key = (goal_code, size)
+    table = _TABLES.get(key)
+    if table is None:
+        table = ExactTable(goal_code, size)
+        _TABLES[key] = table
+    return table
+
+
+def solve(start_state: State, goal_state: State) -> Optional[List[State]]:
+    size = board_size(start_state)
+    relabeling = get_relabeling(pack(goal_state), size)
+    path = get_exact_table(relabeling.goal, size).solve_code(relabeling.to_canonical(pack(start_state)))
+    if path is None:
+        return None
+    return [relabeling.unpack(code) for code in path]
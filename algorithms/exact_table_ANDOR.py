@@ -0,0 +1,146 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .state_kernel import State, pack, board_size
+from .macro_tables import macro_successors
+from .ranking import StateRanking, RANKED_LIMIT
+from .exact_table import UNKNOWN, Distances, cache_path, load_distances
+from .relabel import get_relabeling
+
+# Bảng chi phí chính xác cho mô hình Di chuyển kép (đơn: 1, kép: 2) trên toàn bộ không gian 3x3:
+#   costs[rank(state)] = chi phí tối ưu từ state đến goal (như ucs_ANDOR / a_star_ANDOR)
+# Chi phí cạnh chỉ là 1 hoặc 2 nên Dijkstra dùng hàng đợi xô (Dial): xô thứ c chứa các trạng thái
+# có chi phí tạm thời c, không cần heap. Mọi macro đều đảo ngược được với cùng chi phí
+# nên Dijkstra ngược từ goal cho đúng chi phí từ mỗi trạng thái đến goal.
+# Bảng được lưu cạnh bảng di chuyển đơn trong cùng thư mục cache (tiền tố "macro"),
+# và cũng chỉ được dựng cho các đích chuẩn (relabel.py).
+
+_TABLES: Dict[Tuple[int, int], "ExactMacroTable"] = {}
+
+
+def build_costs(goal_code: int, size: int = 3) -> bytearray:
+    """Dijkstra ngược từ goal_code bằng hàng đợi xô; trả về mảng byte chi phí đánh chỉ số theo hạng."""
+    ranking = StateRanking(goal_code, size)
+    costs = bytearray([UNKNOWN]) * ranking.count
+    goal_rank = ranking.rank(goal_code)
+    costs[goal_rank] = 0
+    buckets: List[List[Tuple[int, int]]] = [[(goal_code, goal_rank)]]
+    cost = 0
+    while cost < len(buckets):
+        for code, code_rank in buckets[cost]:
+            if costs[code_rank] != cost:
+                continue  # Mục cũ: đã được lấy ra với chi phí nhỏ hơn
+            for child, move_cost in macro_successors(code, size):
+                new_cost = cost + move_cost
+                child_rank = ranking.child_rank(child, code, code_rank)
+                if new_cost < costs[child_rank]:
+                    if new_cost >= UNKNOWN:
+                        raise ValueError(f"Chi phí vượt quá {UNKNOWN - 1}, không lưu được trong 1 byte")
+                    costs[child_rank] = new_cost
+                    while len(buckets) <= new_cost:
+                        buckets.append([])
+                    buckets[new_cost].append((child, child_rank))
+        buckets[cost] = []  # Giải phóng xô đã xử lý
+        cost += 1
+    return costs
+
+
+class ExactMacroTable:
+    """Bảng chi phí Di chuyển kép chính xác đến một trạng thái đích cố định."""
+
+    def __init__(self, goal_code: int, size: int = 3):
+        self.goal_code = goal_code
+        self.size = size
+        self.ranking = StateRanking(goal_code, size)
+        if self.ranking.count > RANKED_LIMIT:
+            raise ValueError(f"Bảng {size}x{size} quá lớn để lập bảng chi phí đầy đủ")
+        self.costs: Distances = load_distances(cache_path(goal_code, size, "macro"), self.ranking.count,
+                                               lambda: build_costs(goal_code, size))
+
+    def cost(self, code: int) -> Optional[int]:
+        """Chi phí tối ưu từ code đến đích, hoặc None nếu code không giải được."""
+        if not self.ranking.reachable(code):
+            return None
+        return self.costs[self.ranking.rank(code)]
+
+    def solve_code(self, code: int) -> Optional[List[int]]:
+        """Đi xuống dốc: mỗi bước chọn macro có chi phí c sao cho chi phí còn lại giảm đúng c."""
+        if not self.ranking.reachable(code):
+            return None
+        ranking = self.ranking
+        costs = self.costs
+        size = self.size
+        code_rank = ranking.rank(code)
+        remaining = costs[code_rank]
+        path = [code]
+        while remaining:
+            for child, move_cost in macro_successors(code, size):
+                child_rank = ranking.child_rank(child, code, code_rank)
+                if costs[child_rank] == remaining - move_cost:
+                    code, code_rank = child, child_rank
+                    remaining -= move_cost
+                    break
+            path.append(code)
+        return path
+
+
+def get_exact_macro_table(goal_code: int, size: int = 3) -> ExactMacroTable:
+    """Bảng cho goal_code, được nạp một lần cho mỗi tiến trình (lần đầu có thể phải dựng và ghi file)."""
+    key = (goal_code, size)
+    table = _TABLES.get(key)
+    if table is None:
+        table = ExactMacroTable(goal_code, size)
+        _TABLES[key] = table
+    return table
+
+
+def path_cost(path: Sequence[State]) -> Optional[int]:
+    """
+    Tổng chi phí Di chuyển kép của một đường đi (list các tuple trạng thái).
+    Trả về None nếu có hai trạng thái liên tiếp không nối với nhau bằng một macro.
+    """
+    if not path:
+        return None
+    size = board_size(path[0])
+    total = 0
+    code = pack(path[0])
+    for state in path[1:]:
+        next_code = pack(state)
+        move_costs = [move_cost for child, move_cost in macro_successors(code, size) if child == next_code]
+        if not move_costs:
+            return None
+        total += move_costs[0]
+        code = next_code
+    return total
+
+
+def optimality_gap(path: Optional[Sequence[State]], start_state: State, goal_state: State) -> Optional[int]:
+    """
+    Chênh lệch giữa chi phí của path và chi phí tối ưu (0 nghĩa là tối ưu).
+    Trả về None nếu path không hợp lệ: không bắt đầu ở start_state, không kết thúc ở goal_state,
+    hoặc có bước không phải macro. Dùng để đánh giá kết quả của greedy_ANDOR, beam_search_ANDOR...
+    """
+    if not path or tuple(path[0]) != tuple(start_state) or tuple(path[-1]) != tuple(goal_state):
+        return None
+    cost = path_cost(path)
+    if cost is None:
+        return None
+    relabeling = get_relabeling(pack(goal_state), board_size(goal_state))
+    table = get_exact_macro_table(relabeling.goal, relabeling.size)
+    optimal = table.cost(relabeling.to_canonical(pack(start_state)))
+    if optimal is None:
+        return None
+    return cost - optimal
+
+
+def is_optimal_path(path: Optional[Sequence[State]], start_state: State, goal_state: State) -> bool:
+    """True nếu path là một đường đi hợp lệ từ start_state đến goal_state với chi phí Di chuyển kép tối ưu."""
+    return optimality_gap(path, start_state, goal_state) == 0
+
+
+def solve(start_state: State, goal_state: State) -> Optional[List[State]]:
+    size = board_size(start_state)
+    relabeling = get_relabeling(pack(goal_state), size)
+    path = get_exact_macro_table(relabeling.goal, size).solve_code(relabeling.to_canonical(pack(start_state)))
+    if path is None:
+        return None
+    return [relabeling.unpack(code) for code in path]
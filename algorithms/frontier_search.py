@@ -0,0 +1,105 @@
+from typing import Dict, List, Optional, Tuple
+
+from .state_kernel import CELL_MASK, blank_shift
+from .move_tables import get_move_table
+
+# Tìm kiếm biên (frontier search, Korf) cho BFS / UCS di chuyển đơn: không có bảng visited / parent,
+# chỉ giữ lớp biên hiện tại của mỗi phía. Mỗi trạng thái trên biên kèm các bit toán tử đã dùng:
+# bit của hướng dẫn về một trạng thái đã sinh ra ở lớp trước. Đồ thị trượt ô với di chuyển đơn là
+# đồ thị hai phía (ô trống đổi màu ô cờ sau mỗi bước) nên không có cạnh trong cùng một lớp, và mọi
+# hàng xóm ở lớp trước đều đã sinh ra trạng thái (và đánh dấu bit ngược lại): bỏ các hướng đã đánh dấu
+# là đủ để không bao giờ sinh lại lớp trước.
+# Dựng lại đường đi bằng chia để trị: tìm kiếm biên hai chiều từ start và goal (mở rộng nguyên lớp
+# của phía có biên nhỏ hơn) cho một trạng thái giữa m trên một đường đi ngắn nhất, rồi giải đệ quy
+# hai nửa start -> m và m -> goal. Bộ nhớ đỉnh ~ độ rộng biên thay vì số trạng thái đã duyệt, đổi lại
+# mỗi cấp đệ quy duyệt lại một phần không gian (tổng thời gian tăng khoảng một hệ số log(độ sâu)).
+
+# Bit của từng hướng di chuyển ô trống (move_tables.MOVE_DIRECTIONS) và hướng ngược lại
+OPPOSITE = {'Up': 'Down', 'Down': 'Up', 'Left': 'Right', 'Right': 'Left'}
+BITS = {'Up': 1, 'Down': 2, 'Left': 4, 'Right': 8}
+
+# Một toán tử: (bit của hướng, bit của hướng ngược, target_shift, cell_mask, blank_delta)
+Operator = Tuple[int, int, int, int, int]
+# Một lớp biên: mã trạng thái -> các bit toán tử đã dùng
+Frontier = Dict[int, int]
+
+_OPERATOR_TABLES: Dict[int, Tuple[Tuple[Operator, ...], ...]] = {}
+
+
+def get_operator_table(size: int = 3) -> Tuple[Tuple[Operator, ...], ...]:
+    """table[blank_index] = các Operator hợp lệ (dựng từ move_tables, một lần cho mỗi kích thước)."""
+    table = _OPERATOR_TABLES.get(size)
+    if table is None:
+        table = tuple(tuple((BITS[label], BITS[OPPOSITE[label]], target_shift, cell_mask, blank_delta)
+                            for _, label, target_shift, cell_mask, blank_delta in moves)
+                      for moves in get_move_table(size))
+        _OPERATOR_TABLES[size] = table
+    return table
+
+
+def expand_layer(frontier: Frontier, size: int = 3) -> Frontier:
+    """Lớp kế tiếp của frontier, bỏ các hướng đã dùng; lớp cũ không cần giữ lại."""
+    table = _OPERATOR_TABLES.get(size) or get_operator_table(size)
+    shift = blank_shift(size)
+    blank_value = size * size - 1
+    layer: Frontier = {}
+    get = layer.get
+    for code, used in frontier.items():
+        for bit, inverse, target_shift, cell_mask, blank_delta in table[code >> shift]:
+            if used & bit:
+                continue
+            child = code ^ ((((code >> target_shift) & CELL_MASK) ^ blank_value) * cell_mask) ^ blank_delta
+            layer[child] = get(child, 0) | inverse
+    return layer
+
+
+def find_midpoint(start: int, goal: int, size: int = 3) -> Optional[Tuple[int, int, int]]:
+    """
+    Tìm kiếm biên hai chiều. Trả về (m, d1, d2): m nằm trên một đường đi ngắn nhất, cách start d1 bước
+    và cách goal d2 bước; None nếu goal không đến được.
+    """
+    forward: Frontier = {start: 0}
+    backward: Frontier = {goal: 0}
+    forward_depth = backward_depth = 0
+    while forward and backward:
+        # Lớp gặp nhau đầu tiên cho tổng độ sâu nhỏ nhất (mọi cặp lớp có tổng nhỏ hơn đã được so)
+        if len(forward) <= len(backward):
+            forward = expand_layer(forward, size)
+            forward_depth += 1
+            layer, other = forward, backward
+        else:
+            backward = expand_layer(backward, size)
+            backward_depth += 1
+            layer, other = backward, forward
+        if len(other) < len(layer):
+            layer, other = other, layer
+        for code in layer:
+            if code in other:
+                return code, forward_depth, backward_depth
+    return None
+
+
+def _extend_path(first: int, last: int, steps: int, size: int, path: List[int]) -> None:
+    """Nối vào path các trạng thái sau first đến last (cách nhau steps bước) bằng chia đôi đệ quy (độ sâu ~log2)."""
+    if steps == 0:
+        return
+    if steps == 1:
+        path.append(last)
+        return
+    middle, first_steps, last_steps = find_midpoint(first, last, size)
+    _extend_path(first, middle, first_steps, size, path)
+    _extend_path(middle, last, last_steps, size, path)
+
+
+def frontier_path(start: int, goal: int, size: int = 3) -> Optional[List[int]]:
+    """Đường đi ngắn nhất (list mã trạng thái) từ start đến goal bằng tìm kiếm biên chia để trị, hoặc None."""
+    if start == goal:
+        return [start]
+    midpoint = find_midpoint(start, goal, size)
+    if midpoint is None:
+        return None
+    middle, first_steps, last_steps = midpoint
+    path = [start]
+    _extend_path(start, middle, first_steps, size, path)
+    _extend_path(middle, goal, last_steps, size, path)
+    return path
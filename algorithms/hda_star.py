@@ -0,0 +1,209 @@
+import os
+from multiprocessing import Process, Queue
+from queue import Empty
+from typing import Dict, List, Optional, Tuple
+
+from .state_kernel import pack, unpack, board_size
+from .heuristics import get_heuristic
+from .ranking import StateRanking
+from .bucket_queue import BucketQueue
+
+# HDA* (Hash Distributed A*): mỗi trạng thái thuộc về đúng một tiến trình, chọn bằng hàm băm của mã
+# trạng thái. Mỗi tiến trình có open (BucketQueue) / g / cha riêng; con thuộc tiến trình khác được gom
+# thành lô và gửi qua hàng đợi của tiến trình đó. Do thứ tự mở rộng giữa các tiến trình không đồng bộ,
+# một trạng thái có thể được mở lại khi nhận được g nhỏ hơn.
+# Tối ưu và kết thúc:
+# - Tiến trình nào lấy ra đích với g nhỏ hơn cận trên U thì báo cho tiến trình điều phối, U được
+#   phát lại cho mọi tiến trình; các nút có f >= U bị bỏ (h chấp nhận được nên không thể tốt hơn).
+# - Điều phối phát các đợt thăm dò (probe); mỗi tiến trình trả lời (rảnh?, số nút đã gửi, đã nhận).
+#   Khi hai đợt liên tiếp đều báo mọi tiến trình rảnh với cùng tổng gửi = tổng nhận (đếm kép kiểu
+#   Mattern), không còn nút nào đang trên đường truyền: U là tối ưu (hoặc không có lời giải nếu U = ∞).
+# - Đường đi được dựng lại bằng cách hỏi cha của từng trạng thái từ tiến trình sở hữu nó.
+
+# Bảng nhỏ hơn (8-puzzle: 181440 trạng thái) được A* tuần tự giải trong vài mili giây, nhanh hơn nhiều so với
+# chi phí khởi động tiến trình và truyền nút; khi đó solve / a_star.solve dùng A* tuần tự dù workers != 1
+PARALLEL_MIN_CELLS = 16
+BATCH_SIZE = 64            # Số nút tối đa mỗi lô gửi sang một tiến trình
+EXPANSIONS_PER_ROUND = 256  # Số nút mở rộng giữa hai lần đọc hộp thư
+
+INFINITY = float('inf')
+
+
+def owner_of(code: int, workers: int) -> int:
+    """Tiến trình sở hữu code: trộn bit trước khi chia lấy dư (các bit thấp của mã có cấu trúc)."""
+    mixed = (code ^ (code >> 17) ^ (code >> 31)) * 0x9E3779B97F4A7C15
+    return ((mixed >> 32) & 0xFFFFFFFF) % workers
+
+
+def _worker(index: int, workers: int, inboxes: List[Queue], reports: Queue,
+            start: int, goal: int, size: int, heuristic: str) -> None:
+    estimator = get_heuristic(goal, size, heuristic)
+    inbox = inboxes[index]
+    open_list = BucketQueue()
+    best_g: Dict[int, int] = {}
+    parent: Dict[int, Optional[int]] = {}
+    upper = INFINITY
+    sent = received = 0
+    outboxes: List[List[Tuple[int, int, int, int]]] = [[] for _ in range(workers)]
+
+    def insert(code: int, g: int, h: int, from_code: Optional[int]) -> None:
+        if g < best_g.get(code, INFINITY) and g + h < upper:
+            best_g[code] = g
+            parent[code] = from_code
+            open_list.push(g + h, g, code)
+
+    def flush() -> None:
+        nonlocal sent
+        for target, box in enumerate(outboxes):
+            if box:
+                inboxes[target].put(('nodes', box))
+                sent += len(box)
+                outboxes[target] = []
+
+    if owner_of(start, workers) == index:
+        insert(start, 0, estimator(start), None)
+
+    while True:
+        # Đọc hết hộp thư; chỉ chờ (chặn) khi không còn nút nào để mở rộng
+        while True:
+            try:
+                message = inbox.get_nowait() if open_list else inbox.get()
+            except Empty:
+                break
+            kind = message[0]
+            if kind == 'nodes':
+                received += len(message[1])
+                for code, g, h, from_code in message[1]:
+                    insert(code, g, h, from_code)
+            elif kind == 'bound':
+                upper = min(upper, message[1])
+            elif kind == 'probe':
+                reports.put(('probe', message[1], index, not open_list, sent, received))
+            elif kind == 'parent':
+                reports.put(('parent', message[1], parent.get(message[1])))
+            elif kind == 'stop':
+                for queue in inboxes:
+                    queue.cancel_join_thread()  # Các lô chưa ai đọc không được giữ tiến trình lại
+                return
+
+        for _ in range(EXPANSIONS_PER_ROUND):
+            if not open_list:
+                break
+            f, g, code = open_list.pop()
+            if f >= upper:
+                open_list = BucketQueue()  # Mọi nút còn lại đều có f >= U
+                break
+            if g != best_g[code]:
+                continue  # Mục lỗi thời: đã có đường tốt hơn đến code
+            if code == goal:
+                upper = g
+                reports.put(('solution', g))
+                continue
+            for child, child_h in estimator.successors(code, f - g):
+                child_g = g + 1
+                if child_g + child_h >= upper:
+                    continue
+                target = owner_of(child, workers)
+                if target == index:
+                    insert(child, child_g, child_h, code)
+                else:
+                    box = outboxes[target]
+                    box.append((child, child_g, child_h, code))
+                    if len(box) >= BATCH_SIZE:
+                        inboxes[target].put(('nodes', box))
+                        sent += len(box)
+                        outboxes[target] = []
+        flush()
+
+
+def _terminated(replies: List[Tuple[bool, int, int]]) -> Optional[Tuple[int, int]]:
+    """(tổng gửi, tổng nhận) nếu một đợt thăm dò báo mọi tiến trình rảnh và gửi = nhận, ngược lại None."""
+    if not all(idle for idle, _, _ in replies):
+        return None
+    sent = sum(count for _, count, _ in replies)
+    received = sum(count for _, _, count in replies)
+    return (sent, received) if sent == received else None
+
+
+def hda_star(start: int, goal: int, size: int, heuristic: str = 'manhattan',
+             workers: Optional[int] = None) -> Optional[List[int]]:
+    """
+    A* phân tán theo băm trên workers tiến trình (None = số lõi CPU).
+    Trả về đường đi ngắn nhất (list mã trạng thái) hoặc None nếu không có lời giải.
+    """
+    if start == goal:
+        return [start]
+    workers = workers or os.cpu_count() or 1
+    inboxes: List[Queue] = [Queue() for _ in range(workers)]
+    reports: Queue = Queue()
+    processes = [Process(target=_worker, args=(index, workers, inboxes, reports, start, goal, size, heuristic),
+                         daemon=True)
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+
+    def broadcast(message: tuple) -> None:
+        for inbox in inboxes:
+            inbox.put(message)
+
+    try:
+        upper = INFINITY
+        wave = 0
+        replies: Dict[int, Tuple[bool, int, int]] = {}
+        previous: Optional[Tuple[int, int]] = None
+        broadcast(('probe', wave))
+        while True:
+            message = reports.get()
+            if message[0] == 'solution':
+                if message[1] < upper:
+                    upper = message[1]
+                    broadcast(('bound', upper))
+                continue
+            if message[0] != 'probe' or message[1] != wave:
+                continue
+            replies[message[2]] = message[3:]
+            if len(replies) < workers:
+                continue
+            snapshot = _terminated(list(replies.values()))
+            if snapshot is not None and snapshot == previous:
+                break  # Hai đợt liên tiếp giống nhau: không còn nút nào đang xử lý hay trên đường truyền
+            previous = snapshot
+            wave += 1
+            replies = {}
+            broadcast(('probe', wave))
+
+        if upper == INFINITY:
+            return None
+        # Dựng lại đường đi: hỏi cha của từng trạng thái từ tiến trình sở hữu nó
+        path = [goal]
+        code = goal
+        while code != start:
+            inboxes[owner_of(code, workers)].put(('parent', code))
+            while True:
+                message = reports.get()
+                if message[0] == 'parent' and message[1] == code:
+                    break
+            code = message[2]
+            path.append(code)
+        path.reverse()
+        return path
+    finally:
+        broadcast(('stop',))
+        for process in processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+
+
+def solve(start_state, goal_state, heuristic: str = 'manhattan', workers: Optional[int] = None):
+    size = board_size(start_state)
+    start = pack(start_state)
+    goal = pack(goal_state)
+    # Kiểm tra tính chẵn lẻ trước: không có lời giải thì không cần khởi động tiến trình
+    if not StateRanking(goal, size).reachable(start):
+        return None
+    if size * size < PARALLEL_MIN_CELLS:
+        from . import a_star  # Nhập khi gọi: a_star cũng nhập hda_star
+        return a_star.solve(start_state, goal_state, heuristic)
+    path = hda_star(start, goal, size, heuristic, workers)
+    return None if path is None else [unpack(state, size) for state in path]
@@ -0,0 +1,504 @@
+from itertools import product
+from typing import Dict, List, Sequence, Tuple
+
+from .state_kernel import CELL_BITS, CELL_MASK, blank_shift, goal_positions
+from .move_tables import get_move_table, successors as plain_successors
+from .macro_tables import get_macro_table, macro_successors as plain_macro_successors
+
+# Bảng heuristic Manhattan theo từng trạng thái đích (mọi chỉ số là mảng phẳng):
+# - distance[v * cells + i]: khoảng cách Manhattan của ô có giá trị lưu v khi nằm ở vị trí i
+# - delta[(v * cells + frm) * cells + to]: thay đổi của h khi ô v trượt từ frm sang to
+# Mỗi nước đi chỉ làm một ô đổi chỗ, nên h của con = h của cha + delta (O(1) thay vì quét 9 ô).
+# Ô trống luôn có distance = 0 và delta = 0.
+
+
+def manhattan_tables(goal_code: int, size: int = 3) -> Tuple[List[int], List[int]]:
+    """Dựng bảng (distance, delta) cho một trạng thái đích đã mã hóa."""
+    cells = size * size
+    blank_value = cells - 1
+    goal_pos = goal_positions(goal_code, size)
+
+    distance = [0] * (cells * cells)
+    for tile in range(cells):
+        if tile == blank_value:
+            continue
+        goal_row, goal_col = divmod(goal_pos[tile], size)
+        for i in range(cells):
+            row, col = divmod(i, size)
+            distance[tile * cells + i] = abs(row - goal_row) + abs(col - goal_col)
+
+    delta = [0] * (cells * cells * cells)
+    for tile in range(cells):
+        base = tile * cells
+        for frm in range(cells):
+            for to in range(cells):
+                delta[(base + frm) * cells + to] = distance[base + to] - distance[base + frm]
+    return distance, delta
+
+
+def manhattan(code: int, distance: List[int], size: int = 3) -> int:
+    """Tính đầy đủ h của một trạng thái (chỉ dùng cho trạng thái bắt đầu hoặc khi cần kiểm tra)."""
+    cells = size * size
+    total = 0
+    for i in range(cells):
+        total += distance[((code >> (CELL_BITS * i)) & CELL_MASK) * cells + i]
+    return total
+
+
+def macro_successors_with_h(code: int, h: int, delta: List[int], size: int = 3) -> List[Tuple[int, int, int]]:
+    """
+    Các hàng xóm (mã trạng thái, chi phí, h) gồm cả di chuyển đơn và kép (xem macro_tables).
+    Di chuyển kép làm hai ô trượt: ô ở mid về blank, rồi ô ở target về mid, nên cộng hai delta.
+    """
+    table = get_macro_table(size)
+    cells = size * size
+    blank_value = cells - 1
+    result = []
+    for _, cost, _, chain, shifts, blank_delta, _ in table[code >> (CELL_BITS * cells)]:
+        if cost == 1:
+            b, t = chain
+            sb, st = shifts
+            moved = (code >> st) & CELL_MASK
+            child = code ^ ((moved ^ blank_value) << sb) ^ ((moved ^ blank_value) << st)
+            child_h = h + delta[(moved * cells + t) * cells + b]
+        else:
+            b, m, t = chain
+            sb, sm, st = shifts
+            first = (code >> sm) & CELL_MASK
+            second = (code >> st) & CELL_MASK
+            child = (code ^ ((first ^ blank_value) << sb) ^ ((second ^ first) << sm)
+                     ^ ((blank_value ^ second) << st))
+            child_h = h + delta[(first * cells + m) * cells + b] + delta[(second * cells + t) * cells + m]
+        result.append((child ^ blank_delta, cost, child_h))
+    return result
+
+
+class CompiledHeuristic:
+    """
+    Heuristic đã biên dịch cho một trạng thái đích cố định (mọi bảng được dựng một lần trong __init__).
+
+    Giao diện chung cho các thuật toán:
+    - heuristic(code): tính đầy đủ h của một trạng thái
+    - successors(code, h) -> [(con, h_con)]: hàng xóm di chuyển đơn kèm h
+    - macro_successors(code, h) -> [(con, chi_phí, h_con)]: hàng xóm di chuyển đơn và kép kèm h
+    - incremental: True nếu h của con được cập nhật từ h của cha mà không quét lại cả bảng
+
+    Mọi heuristic đều chấp nhận được (admissible) cho di chuyển đơn. Một di chuyển kép chi phí 2
+    bằng đúng hai di chuyển đơn, nên h vẫn là cận dưới của chi phí khi cho phép di chuyển kép.
+    Nếu mỗi hành động (đơn hoặc kép) được tính là 1 thì cận dưới tương ứng là (h + 1) // 2.
+    """
+
+    name = ''
+    incremental = False
+
+    def __init__(self, goal_code: int, size: int = 3):
+        self.goal_code = goal_code
+        self.size = size
+        self.cells = size * size
+        self.goal_rowcol = [divmod(pos, size) for pos in goal_positions(goal_code, size)]
+
+    def __call__(self, code: int) -> int:
+        raise NotImplementedError
+
+    def successors(self, code: int, h: int) -> List[Tuple[int, int]]:
+        return [(child, self(child)) for child in plain_successors(code, self.size)]
+
+    def macro_successors(self, code: int, h: int) -> List[Tuple[int, int, int]]:
+        return [(child, cost, self(child)) for child, cost in plain_macro_successors(code, self.size)]
+
+
+class ManhattanHeuristic(CompiledHeuristic):
+    """
+    Khoảng cách Manhattan.
+    Bảng distance, delta (xem manhattan_tables) cho phép cập nhật h của con trong O(1).
+    """
+
+    name = 'manhattan'
+    incremental = True
+
+    def __init__(self, goal_code: int, size: int = 3):
+        super().__init__(goal_code, size)
+        self.distance, self.delta = manhattan_tables(goal_code, size)
+        # moves[blank] = [(target_shift, cell_mask, blank_delta, target * cells + blank)]:
+        # chỉ số delta của ô v trượt từ target về blank là v * cells^2 + phần đã cộng sẵn
+        cells = self.cells
+        self.blank_shift = blank_shift(self.size)
+        self.moves = [[(target_shift, cell_mask, blank_delta, target * cells + blank)
+                       for target, _, target_shift, cell_mask, blank_delta in row]
+                      for blank, row in enumerate(get_move_table(size))]
+
+    def __call__(self, code: int) -> int:
+        return manhattan(code, self.distance, self.size)
+
+    def successors(self, code: int, h: int) -> List[Tuple[int, int]]:
+        # Các hàng xóm (mã trạng thái, h) theo thứ tự Lên, Xuống, Trái, Phải; ô bị di chuyển trượt từ target về
+        # ô trống, h cập nhật bằng một lần tra bảng delta (self.moves tra sẵn theo ô trống, đường nóng của IDA*/A*)
+        delta = self.delta
+        stride = self.cells * self.cells
+        blank_value = self.cells - 1
+        result = []
+        for target_shift, cell_mask, blank_delta, offset in self.moves[code >> self.blank_shift]:
+            moved = (code >> target_shift) & CELL_MASK
+            result.append((code ^ ((moved ^ blank_value) * cell_mask) ^ blank_delta,
+                           h + delta[moved * stride + offset]))
+        return result
+
+    def macro_successors(self, code: int, h: int) -> List[Tuple[int, int, int]]:
+        return macro_successors_with_h(code, h, self.delta, self.size)
+
+
+class _ManhattanPlus(ManhattanHeuristic):
+    """
+    Manhattan cộng thêm một phần phạt extra(code) >= 0.
+    Phần Manhattan của con vẫn được cập nhật qua bảng delta, chỉ phần phạt được tính lại.
+    """
+
+    def extra(self, code: int) -> int:
+        raise NotImplementedError
+
+    def __call__(self, code: int) -> int:
+        return manhattan(code, self.distance, self.size) + self.extra(code)
+
+    def successors(self, code: int, h: int) -> List[Tuple[int, int]]:
+        extra = self.extra
+        md = h - extra(code)
+        return [(child, child_md + extra(child))
+                for child, child_md in ManhattanHeuristic.successors(self, code, md)]
+
+    def macro_successors(self, code: int, h: int) -> List[Tuple[int, int, int]]:
+        extra = self.extra
+        md = h - extra(code)
+        return [(child, cost, child_md + extra(child))
+                for child, cost, child_md in macro_successors_with_h(code, md, self.delta, self.size)]
+
+
+def _spread_tables(size: int) -> List[List[int]]:
+    """
+    Bảng chuyển vị theo hàng: spread[r][khóa hàng r] đặt ô ở cột c của hàng r vào vị trí
+    (c * size + r) của mã chuyển vị. OR các spread của mọi hàng cho mã trạng thái chuyển vị,
+    trong đó cột c nằm liền nhau và được đọc như một hàng (một phép dịch và mask).
+    """
+    line_bits = CELL_BITS * size
+    tables = []
+    for row in range(size):
+        table = [0] * (1 << line_bits)
+        for key in range(len(table)):
+            spread = 0
+            for col in range(size):
+                spread |= ((key >> (CELL_BITS * col)) & CELL_MASK) << (CELL_BITS * (col * size + row))
+            table[key] = spread
+        tables.append(table)
+    return tables
+
+
+def _line_tables(size: int, score) -> List[List[int]]:
+    """
+    Bảng tra theo đường: tables[line][key] = score(line, tiles), với tiles là các giá trị lưu
+    của đường theo thứ tự (trái sang phải hoặc trên xuống dưới).
+    Khóa không hợp lệ (giá trị >= số ô) giữ giá trị 0.
+    """
+    cells = size * size
+    tables = []
+    for line in range(size):
+        table = [0] * (1 << (CELL_BITS * size))
+        for tiles in product(range(cells), repeat=size):
+            key = 0
+            for k, tile in enumerate(tiles):
+                key |= tile << (CELL_BITS * k)
+            table[key] = score(line, tiles)
+        tables.append(table)
+    return tables
+
+
+def _longest_increasing(values: Sequence[int]) -> int:
+    """Độ dài dãy con tăng dài nhất (dãy rất ngắn: tối đa size phần tử)."""
+    best = [1] * len(values)
+    for i in range(len(values)):
+        for j in range(i):
+            if values[j] < values[i] and best[j] + 1 > best[i]:
+                best[i] = best[j] + 1
+    return max(best, default=0)
+
+
+class LinearConflictHeuristic(CompiledHeuristic):
+    """
+    Manhattan + xung đột tuyến tính: hai ô cùng nằm trên hàng (cột) đích của chúng nhưng theo
+    thứ tự ngược nhau thì một ô phải rời khỏi hàng (cột) rồi quay lại, thêm ít nhất 2 bước.
+    Mỗi hàng/cột bị phạt 2 * (số ô phải rời đi) = 2 * (số ô thuộc đường - dãy con tăng dài nhất).
+
+    Toàn bộ h được tra theo đường: bảng hàng = Manhattan của các ô trong hàng + phạt của hàng,
+    bảng cột = phạt của cột. Mỗi trạng thái chỉ cần size lần tra hàng, size lần chuyển vị
+    và size lần tra cột.
+    """
+
+    name = 'linear_conflict'
+    incremental = False
+
+    def __init__(self, goal_code: int, size: int = 3):
+        super().__init__(goal_code, size)
+        blank_value = self.cells - 1
+        goal_rowcol = self.goal_rowcol
+
+        def row_score(row, tiles):
+            distance = sum(abs(row - goal_rowcol[t][0]) + abs(k - goal_rowcol[t][1])
+                           for k, t in enumerate(tiles) if t != blank_value)
+            cols = [goal_rowcol[t][1] for t in tiles if t != blank_value and goal_rowcol[t][0] == row]
+            return distance + 2 * (len(cols) - _longest_increasing(cols))
+
+        def col_conflicts(col, tiles):
+            rows = [goal_rowcol[t][0] for t in tiles if t != blank_value and goal_rowcol[t][1] == col]
+            return 2 * (len(rows) - _longest_increasing(rows))
+
+        shifts = [CELL_BITS * size * line for line in range(size)]
+        self.line_mask = (1 << (CELL_BITS * size)) - 1
+        self.row_parts = list(zip(_line_tables(size, row_score), _spread_tables(size), shifts))
+        self.col_parts = list(zip(_line_tables(size, col_conflicts), shifts))
+
+    def __call__(self, code: int) -> int:
+        mask = self.line_mask
+        total = 0
+        transposed = 0
+        for table, spread, shift in self.row_parts:
+            key = (code >> shift) & mask
+            total += table[key]
+            transposed |= spread[key]
+        for table, shift in self.col_parts:
+            total += table[(transposed >> shift) & mask]
+        return total
+
+
+class CornerTilesHeuristic(_ManhattanPlus):
+    """
+    Manhattan + suy luận góc: nếu ô thuộc một góc chưa nằm ở góc đó nhưng cả hai ô kề góc đều
+    đang đúng vị trí, thì một trong hai ô kề phải rời chỗ (để ô góc đi vào) rồi quay lại: thêm 2 bước.
+    Các góc có thể dùng chung ô kề, nên phần phạt là 2 * số ô kề tối thiểu phải di chuyển
+    (tra bảng tính sẵn theo tập các góc bị kích hoạt), để không đếm một ô hai lần.
+    Góc mà chính nó hoặc ô kề là vị trí đích của ô trống được bỏ qua.
+    """
+
+    name = 'corner_tiles'
+    incremental = True
+
+    def __init__(self, goal_code: int, size: int = 3):
+        super().__init__(goal_code, size)
+        cells = self.cells
+        blank_goal = goal_positions(goal_code, size)[cells - 1]
+        cell_mask = lambda i: CELL_MASK << (CELL_BITS * i)
+
+        self.triggers = []  # (mask ô góc, mask hai ô kề)
+        neighbor_sets = []
+        for corner in (0, size - 1, cells - size, cells - 1):
+            row, col = divmod(corner, size)
+            neighbors = [(row + dr) * size + (col + dc) for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                         if 0 <= row + dr < size and 0 <= col + dc < size]
+            if blank_goal == corner or blank_goal in neighbors:
+                continue
+            self.triggers.append((cell_mask(corner), cell_mask(neighbors[0]) | cell_mask(neighbors[1])))
+            neighbor_sets.append(set(neighbors))
+
+        # cover[mask] = số ô kề tối thiểu chạm tới mọi góc trong mask (bài toán phủ rất nhỏ, vét cạn)
+        candidates = sorted(set().union(*neighbor_sets))
+        self.cover = [0] * (1 << len(self.triggers))
+        for mask in range(1, len(self.cover)):
+            needed = [neighbor_sets[k] for k in range(len(self.triggers)) if mask >> k & 1]
+            best = len(needed)
+            for pick in range(1 << len(candidates)):
+                chosen = {candidates[k] for k in range(len(candidates)) if pick >> k & 1}
+                if len(chosen) < best and all(chosen & group for group in needed):
+                    best = len(chosen)
+            self.cover[mask] = best
+
+    def extra(self, code: int) -> int:
+        diff = code ^ self.goal_code
+        mask = 0
+        bit = 1
+        for corner_mask, neighbor_mask in self.triggers:
+            if diff & corner_mask and not diff & neighbor_mask:
+                mask |= bit
+            bit <<= 1
+        return 2 * self.cover[mask]
+
+
+_WD_TABLES: Dict[Tuple[int, int], Dict[int, int]] = {}
+
+
+def walking_distance_table(size: int = 3, blank_line: int = 2) -> Dict[int, int]:
+    """
+    Bảng Walking Distance theo một chiều (hàng; cột dùng cùng bảng với vai trò đổi chỗ).
+
+    Trạng thái là ma trận đếm M[i][j] = số ô đang ở hàng i có hàng đích j (không tính ô trống),
+    mã hóa thành khóa sum(M[i][j] * (size + 1) ** (i * size + j)). Hàng chứa ô trống là hàng chỉ có
+    size - 1 ô. Mỗi bước, một ô ở hàng kề đi vào hàng của ô trống. BFS từ ma trận đích (ô trống ở
+    hàng blank_line) cho số bước tối thiểu theo chiều dọc: một cận dưới của số bước đi dọc thực tế.
+    """
+    key = (size, blank_line)
+    table = _WD_TABLES.get(key)
+    if table is not None:
+        return table
+
+    base = size + 1
+    weights = [base ** k for k in range(size * size)]
+    start = sum((size - (i == blank_line)) * weights[i * size + i] for i in range(size))
+    table = {start: 0}
+    frontier = [start]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for state in frontier:
+            counts = []
+            rest = state
+            for _ in range(size * size):
+                rest, count = divmod(rest, base)
+                counts.append(count)
+            blank_row = next(i for i in range(size) if sum(counts[i * size:(i + 1) * size]) == size - 1)
+            for row in (blank_row - 1, blank_row + 1):
+                if 0 <= row < size:
+                    for j in range(size):
+                        if counts[row * size + j]:
+                            child = state - weights[row * size + j] + weights[blank_row * size + j]
+                            if child not in table:
+                                table[child] = depth
+                                next_frontier.append(child)
+        frontier = next_frontier
+    _WD_TABLES[key] = table
+    return table
+
+
+class WalkingDistanceHeuristic(CompiledHeuristic):
+    """
+    Walking Distance: WD(hàng) + WD(cột), mỗi phần tra từ walking_distance_table.
+    Luôn >= Manhattan và vẫn chấp nhận được (bước dọc và bước ngang được đếm riêng).
+
+    Khóa ma trận đếm của trạng thái được tính bằng tra bảng theo hàng/cột (như LinearConflict).
+    Một nước đi chỉ đổi chỗ một ô, nên khóa của con = khóa của cha + delta[(ô, từ, đến)];
+    successors() chỉ tính khóa của cha một lần rồi cập nhật cho từng con.
+    """
+
+    name = 'walking_distance'
+    incremental = True
+
+    def __init__(self, goal_code: int, size: int = 3):
+        super().__init__(goal_code, size)
+        cells = self.cells
+        blank_value = cells - 1
+        goal_rowcol = self.goal_rowcol
+        blank_row, blank_col = goal_rowcol[blank_value]
+        self.row_wd = walking_distance_table(size, blank_row)
+        self.col_wd = walking_distance_table(size, blank_col)
+
+        weights = [(size + 1) ** k for k in range(cells)]
+        row_weight = [0] * (cells * cells)
+        col_weight = [0] * (cells * cells)
+        for tile in range(cells):
+            if tile == blank_value:
+                continue
+            goal_row, goal_col = goal_rowcol[tile]
+            for i in range(cells):
+                row, col = divmod(i, size)
+                row_weight[tile * cells + i] = weights[row * size + goal_row]
+                col_weight[tile * cells + i] = weights[col * size + goal_col]
+
+        self.row_delta = [0] * (cells * cells * cells)
+        self.col_delta = [0] * (cells * cells * cells)
+        for tile in range(cells):
+            base = tile * cells
+            for frm in range(cells):
+                for to in range(cells):
+                    index = (base + frm) * cells + to
+                    self.row_delta[index] = row_weight[base + to] - row_weight[base + frm]
+                    self.col_delta[index] = col_weight[base + to] - col_weight[base + frm]
+
+        shifts = [CELL_BITS * size * line for line in range(size)]
+        self.line_mask = (1 << (CELL_BITS * size)) - 1
+        row_tables = _line_tables(
+            size, lambda row, tiles: sum(row_weight[t * cells + row * size + k] for k, t in enumerate(tiles)))
+        col_tables = _line_tables(
+            size, lambda col, tiles: sum(col_weight[t * cells + k * size + col] for k, t in enumerate(tiles)))
+        self.row_parts = list(zip(row_tables, _spread_tables(size), shifts))
+        self.col_parts = list(zip(col_tables, shifts))
+
+    def keys(self, code: int) -> Tuple[int, int]:
+        """Khóa ma trận đếm (theo hàng, theo cột) của một trạng thái."""
+        mask = self.line_mask
+        row_key = 0
+        transposed = 0
+        for table, spread, shift in self.row_parts:
+            key = (code >> shift) & mask
+            row_key += table[key]
+            transposed |= spread[key]
+        col_key = 0
+        for table, shift in self.col_parts:
+            col_key += table[(transposed >> shift) & mask]
+        return row_key, col_key
+
+    def __call__(self, code: int) -> int:
+        row_key, col_key = self.keys(code)
+        return self.row_wd[row_key] + self.col_wd[col_key]
+
+    def successors(self, code: int, h: int) -> List[Tuple[int, int]]:
+        cells = self.cells
+        blank_value = cells - 1
+        blank = code >> (CELL_BITS * cells)
+        row_key, col_key = self.keys(code)
+        row_wd, col_wd, row_delta, col_delta = self.row_wd, self.col_wd, self.row_delta, self.col_delta
+        result = []
+        for target, _, target_shift, cell_mask, blank_delta in get_move_table(self.size)[blank]:
+            moved = (code >> target_shift) & CELL_MASK
+            index = (moved * cells + target) * cells + blank
+            result.append((code ^ ((moved ^ blank_value) * cell_mask) ^ blank_delta,
+                           row_wd[row_key + row_delta[index]] + col_wd[col_key + col_delta[index]]))
+        return result
+
+    def macro_successors(self, code: int, h: int) -> List[Tuple[int, int, int]]:
+        cells = self.cells
+        blank_value = cells - 1
+        row_key, col_key = self.keys(code)
+        row_wd, col_wd, row_delta, col_delta = self.row_wd, self.col_wd, self.row_delta, self.col_delta
+        result = []
+        for _, cost, _, chain, shifts, blank_delta, _ in get_macro_table(self.size)[code >> (CELL_BITS * cells)]:
+            if cost == 1:
+                b, t = chain
+                sb, st = shifts
+                moved = (code >> st) & CELL_MASK
+                child = code ^ ((moved ^ blank_value) << sb) ^ ((moved ^ blank_value) << st)
+                index = (moved * cells + t) * cells + b
+                child_row, child_col = row_key + row_delta[index], col_key + col_delta[index]
+            else:
+                b, m, t = chain
+                sb, sm, st = shifts
+                first = (code >> sm) & CELL_MASK
+                second = (code >> st) & CELL_MASK
+                child = (code ^ ((first ^ blank_value) << sb) ^ ((second ^ first) << sm)
+                         ^ ((blank_value ^ second) << st))
+                index1 = (first * cells + m) * cells + b
+                index2 = (second * cells + t) * cells + m
+                child_row = row_key + row_delta[index1] + row_delta[index2]
+                child_col = col_key + col_delta[index1] + col_delta[index2]
+            result.append((child ^ blank_delta, cost, row_wd[child_row] + col_wd[child_col]))
+        return result
+
+
+# Các heuristic có thể chọn theo tên (tham số heuristic= của A*/IDA*)
+HEURISTICS = {cls.name: cls for cls in (ManhattanHeuristic, LinearConflictHeuristic,
+                                        WalkingDistanceHeuristic, CornerTilesHeuristic)}
+
+# Bộ nhớ đệm theo (tên, đích, kích thước): giải nhiều bài toán với cùng đích (ví dụ các lần
+# bấm Solve liên tiếp trong main.py) không phải dựng lại bảng.
+_COMPILED: Dict[Tuple[str, int, int], CompiledHeuristic] = {}
+
+
+def get_heuristic(goal_code: int, size: int = 3, name: str = 'manhattan') -> CompiledHeuristic:
+    """
+    Trả về heuristic đã biên dịch cho đích goal_code, dựng mới nếu chưa có trong bộ nhớ đệm.
+    Raise ValueError nếu tên heuristic không có trong HEURISTICS.
+    """
+    key = (name, goal_code, size)
+    heuristic = _COMPILED.get(key)
+    if heuristic is None:
+        factory = HEURISTICS.get(name)
+        if factory is None:
+            raise ValueError(f"Heuristic không hợp lệ: {name!r} (chọn một trong {sorted(HEURISTICS)})")
+        heuristic = factory(goal_code, size)
+        _COMPILED[key] = heuristic
+    return heuristic
@@ -1,30 +1,7 @@
 import random
-
-def manhattan_distance(state, goal_state):
-    total = 0
-    for i in range(9):
-        if state[i] != 9:
-            curr_row, curr_col = divmod(i, 3)
-            goal_pos = goal_state.index(state[i])
-            goal_row, goal_col = divmod(goal_pos, 3)
-            total += abs(curr_row - goal_row) + abs(curr_col - goal_col)
-    return total
-
-def get_neighbors(state):
-    neighbors = []
-    s = list(state)
-    blank_index = s.index(9)
-    row, col = divmod(blank_index, 3)
-    moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for dr, dc in moves:
-        new_row = row + dr
-        new_col = col + dc
-        if 0 <= new_row < 3 and 0 <= new_col < 3:
-            new_index = new_row * 3 + new_col
-            new_s = s[:]
-            new_s[blank_index], new_s[new_index] = new_s[new_index], new_s[blank_index]
-            neighbors.append(tuple(new_s))
-    return neighbors
+from .state_kernel import pack, unpack, board_size
+from .heuristics import get_heuristic
+from .restart_portfolio import run_portfolio
 
 def is_solvable(state, goal_state=(1, 2, 3, 4, 5, 6, 7, 8, 9)):
     state_list = [x for x in state if x != 9]
@@ -39,75 +16,98 @@ def is_solvable(state, goal_state=(1, 2, 3, 4, 5, 6, 7, 8, 9)):
     parity_blank = (blank_row_state - blank_row_goal) % 2
     return parity_state == parity_blank
 
-def solve(start_state, goal_state, max_iterations=1000, max_restarts=50):
+RESTART_FROM_BEST = 0.7  # Xác suất bắt đầu lần leo từ trạng thái tốt nhất đã biết
+
+def climb(heuristic, goal, current_state, current_score, max_iterations, rng=random):
+    # Một lần leo từ current_state; trả về (đường đi, điểm cuối, trạng thái tốt nhất, điểm tốt nhất).
+    # Dùng chung cho solve tuần tự và restart_portfolio.py (rng riêng cho mỗi tiến trình)
+    path = [current_state]
+    local_visited = set([current_state])
+    best_state, best_score = current_state, current_score
+    
+    iterations = 0
+    stuck_counter = 0
+    
+    while current_state != goal and iterations < max_iterations:
+        iterations += 1
+        neighbors = heuristic.successors(current_state, current_score)
+        best_neighbor = None
+        best_neighbor_score = float('inf')
+        
+        for neighbor, score in neighbors:
+            if score < best_neighbor_score and neighbor not in local_visited:
+                best_neighbor = neighbor
+                best_neighbor_score = score
+        
+        if best_neighbor is None or best_neighbor_score >= current_score:
+            stuck_counter += 1
+            if stuck_counter >= 3:
+                break
+            unvisited_neighbors = [(n, s) for n, s in neighbors if n not in local_visited]
+            if unvisited_neighbors:
+                best_neighbor, best_neighbor_score = rng.choice(unvisited_neighbors)
+            else:
+                break
+        else:
+            stuck_counter = 0
+        
+        current_state = best_neighbor
+        current_score = best_neighbor_score
+        path.append(current_state)
+        local_visited.add(current_state)
+        
+        if current_score < best_score:
+            best_state = current_state
+            best_score = current_score
+    
+    return path, current_score, best_state, best_score
+
+def solve(start_state, goal_state, max_iterations=1000, max_restarts=50, workers=1, seed=None):
     if not is_solvable(start_state, goal_state):
         return None
     
-    best_state_overall = start_state
-    best_score_overall = manhattan_distance(start_state, goal_state)
+    size = board_size(start_state)
+    start = pack(start_state)
+    goal = pack(goal_state)
+    if workers != 1:
+        # Các lần khởi động lại chạy song song trên nhiều tiến trình (restart_portfolio.py);
+        # workers=None dùng mọi lõi CPU, seed cố định bộ sinh số ngẫu nhiên của từng tiến trình
+        found, overall_path = run_portfolio("hill_climbing", start, goal, size, max_iterations, max_restarts,
+                                            workers, seed)
+        path = found or overall_path
+        return None if path is None else [unpack(state, size) for state in path]
+    heuristic = get_heuristic(goal, size)
+    start_score = heuristic(start)
+    rng = random.Random(seed)  # seed cũng cố định bản tuần tự
+
+    best_state_overall = start
+    best_score_overall = start_score
     overall_path = []
-    visited_states = set()
     
     for restart in range(max_restarts):
         if restart == 0:
-            current_state = start_state
+            current_state, current_score = start, start_score
         else:
-            if random.random() < 0.7 and best_score_overall < manhattan_distance(start_state, goal_state):
-                current_state = best_state_overall
+            if rng.random() < RESTART_FROM_BEST and best_score_overall < start_score:
+                current_state, current_score = best_state_overall, best_score_overall
             else:
-                current_state = start_state
+                current_state, current_score = start, start_score
         
-        current_score = manhattan_distance(current_state, goal_state)
-        path = [current_state]
-        local_visited = set([current_state])
+        path, current_score, run_best_state, run_best_score = climb(heuristic, goal, current_state,
+                                                                    current_score, max_iterations, rng)
+        if run_best_score < best_score_overall:
+            best_state_overall = run_best_state
+            best_score_overall = run_best_score
         
-        iterations = 0
-        stuck_counter = 0
-        
-        while current_state != goal_state and iterations < max_iterations:
-            iterations += 1
-            neighbors = get_neighbors(current_state)
-            best_neighbor = None
-            best_neighbor_score = float('inf')
-            
-            for neighbor in neighbors:
-                score = manhattan_distance(neighbor, goal_state)
-                if score < best_neighbor_score and neighbor not in local_visited:
-                    best_neighbor = neighbor
-                    best_neighbor_score = score
-            
-            if best_neighbor is None or best_neighbor_score >= current_score:
-                stuck_counter += 1
-                if stuck_counter >= 3:
-                    break
-                unvisited_neighbors = [n for n in neighbors if n not in local_visited]
-                if unvisited_neighbors:
-                    best_neighbor = random.choice(unvisited_neighbors)
-                    best_neighbor_score = manhattan_distance(best_neighbor, goal_state)
-                else:
-                    break
-            else:
-                stuck_counter = 0
-            
-            current_state = best_neighbor
-            current_score = best_neighbor_score
-            path.append(current_state)
-            local_visited.add(current_state)
-            
-            if current_score < best_score_overall:
-                best_state_overall = current_state
-                best_score_overall = current_score
-            
-            if current_state == goal_state:
-                return path
+        if path[-1] == goal:
+            return [unpack(state, size) for state in path]
         
         if path[-1] != path[0]:
             if not overall_path:
                 overall_path = path
-            elif manhattan_distance(path[-1], goal_state) < manhattan_distance(overall_path[-1], goal_state):
+            elif current_score < heuristic(overall_path[-1]):
                 overall_path = path
-        visited_states.update(local_visited)
     
     if overall_path and len(overall_path) > 1:
-        return overall_path
+        return [unpack(state, size) for state in overall_path]
     return None
\ No newline at end of file
@@ -0,0 +1,251 @@
+from typing import AbstractSet, Callable, FrozenSet, List, Optional, Set, Tuple
+
+from .transposition import TranspositionTable
+
+# Lõi IDA* không đệ quy, dùng chung cho ida_star (di chuyển đơn) và ida_star_ANDOR (di chuyển kép).
+# - Ngăn xếp tường minh: path[d] là trạng thái ở độ sâu d (g = d), frames[d] là danh sách các con
+#   (con, h_con) của path[d] còn phải thử. Không có giới hạn đệ quy.
+# - Con được lọc ngay khi sinh: bỏ nước đi ngược (quay về trạng thái cha, thay cho tập visited:
+#   một phép so sánh số nguyên) và các con có f vượt ngưỡng (ghi lại f nhỏ nhất cho lần lặp sau).
+#   h của con được cập nhật tăng dần bởi expand, không tính lại từ đầu.
+# - Đường đi chính là ngăn xếp path khi gặp đích, không cần dict parent.
+# Mỗi hành động có chi phí 1. Cận dưới số hành động còn lại là h (di chuyển đơn), hoặc
+# (h + 1) // 2 nếu halve=True (một hành động có thể là di chuyển kép, đi được 2 bước đơn).
+# prune_siblings=True: bỏ các con mà cha của nút hiện tại đi tới được bằng một hành động
+# (ví dụ Lên rồi Trái = di chuyển kép Lên-Trái). Hai hành động thay được bằng một nên không
+# đường đi tối ưu nào chứa cặp đó; cắt bỏ vẫn giữ tính tối ưu. Vô ích với di chuyển đơn
+# (ô trống đổi màu ô cờ sau mỗi bước nên cháu không bao giờ là con của ông).
+# table (transposition.py, tùy chọn): cắt các trạng thái đã gặp ở độ sâu nhỏ hơn (hoặc bằng, nếu
+# cây con đã được duyệt xong trong cùng lần lặp), và nâng cận dưới của trạng thái bằng cận học được:
+# khi cây con của n thất bại, mọi đường từ n đến đích đi qua một nút lá có f >= f_min nên
+# f_min - g(n) là cận dưới hợp lệ. Các con bị cắt (nước ngược, cắt anh em, bảng) cũng được tính
+# vào f_min bằng f của chính chúng, để cận học được vẫn chấp nhận được.
+# cycle_check=True: bỏ thêm các con đang nằm trên đường đi hiện tại (chu trình dài hơn nước ngược).
+# on_iteration(threshold, next_threshold, expanded) được gọi sau mỗi lần lặp thất bại với số nút đã
+# mở rộng trong lần lặp đó; trả về False để dừng tìm kiếm (ví dụ khi dự đoán lần lặp sau quá tốn).
+
+Expand = Callable[[int, int], List[Tuple[int, int]]]
+IterationHook = Callable[[float, float, int], bool]
+
+INFINITY = float('inf')
+# Mặc định của iddfs / iddfs_ANDOR (IDA* với h = 0, không có giới hạn độ sâu): bảng chuyển vị và ngân sách nút
+# để lời gọi không tham số từ giao diện dừng sau vài giây (khoảng 100k - 150k nút mỗi giây khi có bảng)
+IDDFS_TABLE_MB = 4.0
+IDDFS_MAX_NODES = 300_000
+
+
+def ida_star_search(start: int, goal: int, start_h: int, expand: Expand, halve: bool = False,
+                    prune_siblings: bool = False, max_threshold: float = INFINITY,
+                    table: Optional[TranspositionTable] = None, cycle_check: bool = False,
+                    on_iteration: Optional[IterationHook] = None) -> Optional[List[int]]:
+    """
+    IDA* từ start đến goal; trả về đường đi (list mã trạng thái) ít hành động nhất hoặc None.
+    expand(code, h) -> các (con, h_con) theo thứ tự muốn thử; h phải chấp nhận được để đường đi tối ưu.
+    Trả về None nếu không còn nút nào vượt ngưỡng (không có lời giải) hoặc ngưỡng vượt max_threshold.
+    """
+    if start == goal:
+        return [start]
+    expanded = [0]
+    if on_iteration is not None:
+        counted = expand
+
+        def expand(code: int, h: int) -> List[Tuple[int, int]]:
+            expanded[0] += 1
+            return counted(code, h)
+
+    if table is not None:
+        return _search_with_table(start, goal, start_h, expand, halve, prune_siblings, max_threshold, table,
+                                  cycle_check, on_iteration, expanded)
+
+    threshold = (start_h + 1) >> 1 if halve else start_h
+    while threshold <= max_threshold:
+        path, next_threshold = search_iteration(start, goal, start_h, expand, threshold, halve, prune_siblings,
+                                                cycle_check=cycle_check)
+        if path is not None:
+            return path
+        if next_threshold == INFINITY:
+            return None
+        if on_iteration is not None:
+            if not on_iteration(threshold, next_threshold, expanded[0]):
+                return None
+            expanded[0] = 0
+        threshold = next_threshold
+    return None
+
+
+class NodeBudget:
+    """
+    on_iteration giới hạn tổng số nút mở rộng bằng max_nodes (None = không giới hạn).
+    Số nút của lần lặp kế tiếp được dự đoán từ hai lần lặp gần nhất (hệ số nhánh hiệu dụng
+    b = N_k / N_(k-1), dự đoán N_(k+1) = N_k * b); dừng trước lần lặp dự đoán vượt ngân sách.
+    """
+
+    def __init__(self, max_nodes: Optional[int] = None):
+        self.max_nodes = max_nodes
+        self.counts: List[int] = []
+        self.total = 0
+
+    def predicted_next(self) -> int:
+        """Số nút dự đoán cho lần lặp kế tiếp (0 nếu chưa có lần lặp nào)."""
+        counts = self.counts
+        if not counts:
+            return 0
+        if len(counts) < 2 or counts[-2] == 0:
+            return counts[-1]
+        return int(counts[-1] * counts[-1] / counts[-2]) + 1
+
+    def __call__(self, threshold: float, next_threshold: float, expanded: int) -> bool:
+        self.counts.append(expanded)
+        self.total += expanded
+        return self.max_nodes is None or self.total + self.predicted_next() <= self.max_nodes
+
+
+def search_iteration(root: int, goal: int, root_h: int, expand: Expand, threshold: float,
+                     halve: bool = False, prune_siblings: bool = False, root_depth: int = 0,
+                     root_parent: int = -1, root_siblings: FrozenSet[int] = frozenset(),
+                     cycle_check: bool = False) -> Tuple[Optional[List[int]], float]:
+    """
+    Một lần lặp IDA* (duyệt sâu giới hạn bởi threshold) trên cây con gốc root ở độ sâu root_depth.
+    root_parent, root_siblings: cha của root và các con của cha (để cắt tỉa giống như khi duyệt
+    từ gốc thật, dùng cho IDA* song song, xem parallel_ida.py).
+    Trả về (đường đi từ root đến goal hoặc None, f nhỏ nhất vượt threshold).
+    """
+    next_threshold = INFINITY
+    path: List[int] = []
+    frames = [[(root, root_h)]]  # Khung chỉ chứa gốc: luôn có len(path) == len(frames) - 1
+    reached: List[AbstractSet[int]] = [root_siblings]  # reached[d]: các con của cha path[d] (khi prune_siblings)
+    on_path: Set[int] = set()  # Các trạng thái trên path (khi cycle_check)
+    while frames:
+        frame = frames[-1]
+        if not frame:
+            frames.pop()
+            if path:
+                if cycle_check:
+                    on_path.discard(path[-1])
+                path.pop()
+                if prune_siblings:
+                    reached.pop()
+            continue
+        code, h = frame.pop()
+        path.append(code)
+        if cycle_check:
+            on_path.add(code)
+        depth = root_depth + len(path)  # Độ sâu (g) của các con
+        parent = path[-2] if len(path) >= 2 else root_parent
+        expanded = expand(code, h)
+        if prune_siblings:
+            siblings = reached[-1]
+            reached.append({child for child, _ in expanded})
+        children = []
+        for child, child_h in expanded:
+            if child == parent:
+                continue  # Hoàn tác nước vừa đi
+            if prune_siblings and child in siblings:
+                continue  # Cha đi tới được bằng một hành động
+            if cycle_check and child in on_path:
+                continue  # Chu trình trên đường đi hiện tại
+            f = depth + ((child_h + 1) >> 1 if halve else child_h)
+            if f > threshold:
+                if f < next_threshold:
+                    next_threshold = f
+                continue
+            if child == goal:
+                path.append(child)
+                return path, threshold
+            children.append((child, child_h))
+        if children:
+            children.reverse()  # pop() từ cuối: giữ thứ tự thử của expand
+            frames.append(children)
+        else:
+            if cycle_check:
+                on_path.discard(code)
+            path.pop()
+            if prune_siblings:
+                reached.pop()
+    return None, next_threshold
+
+
+def _search_with_table(start: int, goal: int, start_h: int, expand: Expand, halve: bool,
+                       prune_siblings: bool, max_threshold: float, table: TranspositionTable,
+                       cycle_check: bool = False, on_iteration: Optional[IterationHook] = None,
+                       counter: Optional[List[int]] = None) -> Optional[List[int]]:
+    """Như ida_star_search nhưng có bảng chuyển vị và ngăn xếp lows để học cận dưới."""
+    probe = table.probe
+    table_g, table_bound, table_stamp = table.g, table.bound, table.stamp
+    threshold = (start_h + 1) >> 1 if halve else start_h
+    iteration = 0
+    while threshold <= max_threshold:
+        iteration += 1
+        next_threshold = INFINITY
+        path: List[int] = []
+        lows: List[float] = []  # lows[d]: f nhỏ nhất của các nút bị cắt trong cây con của path[d]
+        frames = [[(start, start_h)]]
+        reached: List[Set[int]] = [set()]
+        on_path: Set[int] = set()
+        while frames:
+            frame = frames[-1]
+            if not frame:
+                frames.pop()
+                if path:
+                    # Duyệt xong cây con của path[-1]: ghi g và cận học được, chuyển f_min lên cha
+                    code = path.pop()
+                    if cycle_check:
+                        on_path.discard(code)
+                    low = lows.pop()
+                    if low != INFINITY:
+                        table.store(code, len(path), int(low) - len(path), iteration)
+                    if lows and low < lows[-1]:
+                        lows[-1] = low
+                    if prune_siblings:
+                        reached.pop()
+                continue
+            code, h = frame.pop()
+            path.append(code)
+            if cycle_check:
+                on_path.add(code)
+            depth = len(path)
+            parent = path[-2] if depth >= 2 else -1
+            expanded = expand(code, h)
+            if prune_siblings:
+                siblings = reached[-1]
+                reached.append({child for child, _ in expanded})
+            low = INFINITY
+            children = []
+            for child, child_h in expanded:
+                child_bound = (child_h + 1) >> 1 if halve else child_h
+                if (child == parent or (prune_siblings and child in siblings)
+                        or (cycle_check and child in on_path)):
+                    if depth + child_bound < low:
+                        low = depth + child_bound
+                    continue
+                slot = probe(child)
+                if slot >= 0:
+                    if table_bound[slot] > child_bound:
+                        child_bound = table_bound[slot]
+                    seen_g = table_g[slot]
+                    if seen_g < depth or (seen_g == depth and table_stamp[slot] == iteration):
+                        if depth + child_bound < low:
+                            low = depth + child_bound
+                        continue  # Đã (hoặc sẽ) được duyệt từ độ sâu nhỏ hơn
+                f = depth + child_bound
+                if f > threshold:
+                    if f < next_threshold:
+                        next_threshold = f
+                    if f < low:
+                        low = f
+                    continue
+                if child == goal:
+                    path.append(child)
+                    return path
+                children.append((child, child_h))
+            lows.append(low)
+            children.reverse()
+            frames.append(children)  # Khung rỗng: nút được ghi vào bảng ở vòng kế tiếp
+        if next_threshold == INFINITY:
+            return None
+        if on_iteration is not None:
+            if not on_iteration(threshold, next_threshold, counter[0]):
+                return None
+            counter[0] = 0
+        threshold = next_threshold
+    return None
@@ -1,73 +1,34 @@
-def manhattan_distance(state, goal_state):
-    total = 0
-    for i in range(9):
-        if state[i] != 9:
-            curr_row, curr_col = divmod(i, 3)
-            goal_pos = goal_state.index(state[i])
-            goal_row, goal_col = divmod(goal_pos, 3)
-            total += abs(curr_row - goal_row) + abs(curr_col - goal_col)
-    return total
+from .state_kernel import pack, unpack, board_size
+from .heuristics import get_heuristic
+from .ranking import StateRanking
+from .ida_engine import ida_star_search
+from .transposition import TranspositionTable
+from .parallel_ida import parallel_ida_star
+from .perimeter import get_perimeter
 
-def get_neighbors(state):
-    neighbors = []
-    s = list(state)
-    blank_index = s.index(9)
-    row, col = divmod(blank_index, 3)
-    moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for dr, dc in moves:
-        new_row = row + dr
-        new_col = col + dc
-        if 0 <= new_row < 3 and 0 <= new_col < 3:
-            new_index = new_row * 3 + new_col
-            new_s = s[:]
-            new_s[blank_index], new_s[new_index] = new_s[new_index], new_s[blank_index]
-            neighbors.append(tuple(new_s))
-    return neighbors
-
-def is_solvable(state, goal_state):
-    state_list = [num for num in state if num != 9]
-    goal_list = [num for num in goal_state if num != 9]
-    state_inversions = sum(1 for i in range(len(state_list)) for j in range(i + 1, len(state_list)) if state_list[i] > state_list[j])
-    goal_inversions = sum(1 for i in range(len(goal_list)) for j in range(i + 1, len(goal_list)) if goal_list[i] > goal_list[j])
-    return state_inversions % 2 == goal_inversions % 2
-
-def reconstruct_path(state, parent):
-    path = []
-    while state is not None:
-        path.append(state)
-        state = parent[state]
-    path.reverse()
-    return path
-
-def search(state, goal_state, g_value, threshold, parent, visited, min_f_value):
-    f_value = g_value + manhattan_distance(state, goal_state)
-    if f_value > threshold:
-        min_f_value[0] = min(min_f_value[0], f_value)
+def solve(start_state, goal_state, heuristic="manhattan", table_mb=None, workers=1, perimeter_depth=None):
+    size = board_size(start_state)
+    start = pack(start_state)
+    goal = pack(goal_state)
+    # Kiểm tra tính chẵn lẻ (đúng cho cả cạnh lẻ 3x3 và cạnh chẵn 4x4) trước khi tìm kiếm
+    if not StateRanking(goal, size).reachable(start):
         return None
-    if state == goal_state:
-        return state
-    visited.add(state)
-    for next_state in get_neighbors(state):
-        if next_state not in visited:
-            parent[next_state] = state
-            result = search(next_state, goal_state, g_value + 1, threshold, parent, visited, min_f_value)
-            if result is not None:
-                return result
-    visited.remove(state)
-    return None
-
-def solve(start_state, goal_state):
-    if not is_solvable(start_state, goal_state):
+    if workers != 1:
+        # Chia cây con tại gốc cho nhiều tiến trình (parallel_ida.py); workers=None dùng mọi lõi CPU
+        path = parallel_ida_star(start, goal, size, heuristic, double=False, workers=workers)
+        return None if path is None else [unpack(state, size) for state in path]
+    estimator = get_heuristic(goal, size, heuristic)
+    # Lõi IDA* không đệ quy (ida_engine.py), h của con được cập nhật tăng dần khi sinh hàng xóm.
+    # table_mb: dung lượng bảng chuyển vị (MB); None = bộ nhớ tuyến tính như IDA* thuần
+    table = None if table_mb is None else TranspositionTable(table_mb, size * size)
+    start_h = estimator(start)
+    expand = estimator.successors
+    if perimeter_depth is not None:
+        # Chu vi quanh goal (perimeter.py): h chính xác gần goal, nên lần lặp cuối đi thẳng xuống goal
+        perimeter = get_perimeter(goal, size, perimeter_depth)
+        start_h = perimeter.estimate(start, start_h)
+        expand = perimeter.wrap_heuristic(estimator)
+    path = ida_star_search(start, goal, start_h, expand, table=table)
+    if path is None:
         return None
-    threshold = manhattan_distance(start_state, goal_state)
-    parent = {start_state: None}
-    while threshold < 100:
-        min_f_value = [float('inf')]
-        visited = set()
-        result = search(start_state, goal_state, 0, threshold, parent, visited, min_f_value)
-        if result is not None:
-            return reconstruct_path(result, parent)
-        if min_f_value[0] == float('inf'):
-            return None
-        threshold = min_f_value[0]
-    return None
\ No newline at end of file
+    return [unpack(state, size) for state in path]
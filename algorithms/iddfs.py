@@ -1,48 +1,28 @@
-def get_neighbors(state):
-    neighbors = []
-    s = list(state)
-    blank_index = s.index(9)
-    row, col = divmod(blank_index, 3)
-    moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for dr, dc in moves:
-        new_row = row + dr
-        new_col = col + dc
-        if 0 <= new_row < 3 and 0 <= new_col < 3:
-            new_index = new_row * 3 + new_col
-            new_s = s[:]
-            new_s[blank_index], new_s[new_index] = new_s[new_index], new_s[blank_index]
-            neighbors.append(tuple(new_s))
-    return neighbors
+from .state_kernel import pack, unpack, board_size
+from .move_tables import successors
+from .ranking import StateRanking
+from .ida_engine import INFINITY, IDDFS_MAX_NODES, IDDFS_TABLE_MB, NodeBudget, ida_star_search
+from .transposition import TranspositionTable
 
-def reconstruct_path(state, parent):
-    path = []
-    while state is not None:
-        path.append(state)
-        state = parent[state]
-    path.reverse()
-    return path
+def solve(start_state, goal_state, max_depth=None, table_mb=IDDFS_TABLE_MB, max_nodes=IDDFS_MAX_NODES):
+    size = board_size(start_state)
+    start = pack(start_state)
+    goal = pack(goal_state)
+    # Không có giới hạn độ sâu mặc định: kiểm tra tính chẵn lẻ trước để không lặp đến hết ngân sách khi không giải được
+    if not StateRanking(goal, size).reachable(start):
+        return None
 
-def depth_limited_dfs(start_state, goal_state, max_depth, visited, parent, depth):
-    stack = [(start_state, 0)]
-    while stack:
-        current, curr_depth = stack.pop()
-        if curr_depth > max_depth:
-            continue
-        if current == goal_state:
-            return reconstruct_path(current, parent)
-        if current not in visited:
-            visited.add(current)
-            for next_state in get_neighbors(current):
-                if next_state not in visited:
-                    parent[next_state] = current
-                    stack.append((next_state, curr_depth + 1))
-    return None
+    def expand(code, h):
+        return [(next_state, 0) for next_state in successors(code, size)]
 
-def solve(start_state, goal_state, max_depth=20):
-    for depth in range(max_depth + 1):
-        visited = set()
-        parent = {start_state: None}
-        result = depth_limited_dfs(start_state, goal_state, depth, visited, parent, 0)
-        if result is not None:
-            return result
-    return None
\ No newline at end of file
+    # IDDFS = IDA* với h = 0 (ida_engine.py): không có visited / parent cho từng độ sâu, bỏ nước ngược và
+    # các trạng thái đang nằm trên đường đi; table_mb: bảng chuyển vị (MB) để cắt các trạng thái đã gặp
+    # ở độ sâu nhỏ hơn; max_nodes: dừng trước độ sâu mà số nút dự đoán vượt ngân sách (NodeBudget), trả về None.
+    # Mặc định có cả hai (IDDFS_TABLE_MB, IDDFS_MAX_NODES) để giao diện không chạy vô hạn; truyền None để bỏ
+    table = None if table_mb is None else TranspositionTable(table_mb, size * size)
+    path = ida_star_search(start, goal, 0, expand, table=table, cycle_check=True,
+                           max_threshold=INFINITY if max_depth is None else max_depth,
+                           on_iteration=NodeBudget(max_nodes))
+    if path is None:
+        return None
+    return [unpack(state, size) for state in path]
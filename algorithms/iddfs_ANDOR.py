@@ -1,109 +1,53 @@
-from collections import deque
-from typing import List, Tuple, Optional, Set, Dict
+from typing import List, Tuple, Optional
+from .state_kernel import pack, unpack, board_size
+from .macro_tables import macro_successors
+from .ranking import StateRanking
+from .ida_engine import INFINITY, IDDFS_MAX_NODES, IDDFS_TABLE_MB, NodeBudget, ida_star_search
+from .transposition import TranspositionTable
 
 State = Tuple[int, ...]
 
-# --- Dán hàm get_neighbors_with_double_moves vào đây ---
-def get_neighbors_with_double_moves(state: State) -> List[State]:
-    neighbors: Set[State] = set(); s_list = list(state)
-    try:
-        size = int(len(state)**0.5);
-        if size * size != len(state): return []
-        blank_tile = size * size; blank_index = s_list.index(blank_tile)
-    except (ValueError, TypeError): return []
-    row, col = divmod(blank_index, size); moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    single_move_intermediates: List[Tuple[State, int]] = []
-    for dr, dc in moves:
-        new_row, new_col = row + dr, col + dc
-        if 0 <= new_row < size and 0 <= new_col < size:
-            new_index = new_row * size + new_col; new_s = s_list[:]; new_s[blank_index], new_s[new_index] = new_s[new_index], new_s[blank_index]
-            neighbor_state = tuple(new_s); neighbors.add(neighbor_state); single_move_intermediates.append((neighbor_state, new_index))
-    for intermediate_state, intermediate_blank_index in single_move_intermediates:
-        s_intermediate = list(intermediate_state); row1, col1 = divmod(intermediate_blank_index, size)
-        for dr, dc in moves:
-            new_row2, new_col2 = row1 + dr, col1 + dc
-            if 0 <= new_row2 < size and 0 <= new_col2 < size:
-                new_index2 = new_row2 * size + new_col2
-                if new_index2 == blank_index: continue
-                new_s2 = s_intermediate[:]; new_s2[intermediate_blank_index], new_s2[new_index2] = new_s2[new_index2], new_s2[intermediate_blank_index]
-                neighbor2_state = tuple(new_s2); neighbors.add(neighbor2_state)
-    return list(neighbors)
-# --- Kết thúc hàm get_neighbors_with_double_moves ---
-
-
-def reconstruct_path(state: State, parent: Dict[State, Optional[State]]) -> List[State]:
-    # ... (Giữ nguyên hàm reconstruct_path) ...
-    path: List[State] = []
-    current: Optional[State] = state
-    while current is not None:
-        path.append(current)
-        current = parent.get(current)
-    path.reverse()
-    return path
-
-# Hàm Depth-Limited Search (DLS) - Phiên bản lặp (không đệ quy)
-def depth_limited_search(start_state: State, goal_state: State, depth_limit: int) -> Optional[List[State]]:
-    """
-    Thực hiện DLS lặp, trả về đường đi nếu tìm thấy trong giới hạn độ sâu.
-    """
-    # Stack lưu (state, path_list_to_state)
-    stack: List[Tuple[State, List[State]]] = [(start_state, [start_state])]
-    # Visited set để tránh chu trình TRONG một lần DLS ở độ sâu cụ thể
-    visited_at_depth: Dict[State, int] = {start_state: 0} # Lưu state và độ sâu nhỏ nhất tìm thấy nó
-
-    while stack:
-        current_state, current_path = stack.pop()
-        current_depth = len(current_path) - 1
-
-        if current_state == goal_state:
-            return current_path # Tìm thấy đích
-
-        if current_depth >= depth_limit:
-            continue # Đạt giới hạn độ sâu, không mở rộng nữa
-
-        # Mở rộng hàng xóm (bao gồm di chuyển kép)
-        neighbors = get_neighbors_with_double_moves(current_state)
-        # Duyệt ngược để thêm vào stack theo thứ tự DFS "tự nhiên" hơn
-        for next_state in reversed(neighbors):
-            new_depth = current_depth + 1
-            # Chỉ thêm vào stack nếu chưa thăm hoặc tìm thấy đường ngắn hơn đến nó ở độ sâu này
-            if next_state not in visited_at_depth or new_depth < visited_at_depth[next_state]:
-                 visited_at_depth[next_state] = new_depth
-                 new_path = current_path + [next_state]
-                 stack.append((next_state, new_path))
-
-    return None # Không tìm thấy trong giới hạn độ sâu này
-
-def solve(start_state: State, goal_state: State, max_depth: int = 30) -> Optional[List[State]]:
+def solve(start_state: State, goal_state: State, max_depth: Optional[int] = None,
+          table_mb: Optional[float] = IDDFS_TABLE_MB,
+          max_nodes: Optional[int] = IDDFS_MAX_NODES) -> Optional[List[State]]:
     """
     Giải 8-Puzzle bằng IDDFS với di chuyển kép.
 
     Args:
         start_state (tuple): Trạng thái bắt đầu.
         goal_state (tuple): Trạng thái đích.
-        max_depth (int): Độ sâu tối đa để tìm kiếm.
+        max_depth (int): Độ sâu (số hành động) tối đa; None (mặc định) = không giới hạn.
+        table_mb (float): Dung lượng bảng chuyển vị (MB, xem transposition.py); mặc định IDDFS_TABLE_MB,
+            None = không dùng.
+        max_nodes (int): Ngân sách tổng số nút mở rộng; dừng trước độ sâu mà số nút dự đoán
+            (từ số nút của các độ sâu trước, xem ida_engine.NodeBudget) vượt ngân sách.
+            Mặc định IDDFS_MAX_NODES để lời gọi từ giao diện dừng sau vài giây; None = không giới hạn.
 
     Returns:
-        list: Đường đi tối ưu về số hành động (list các tuple trạng thái) nếu tìm thấy, None nếu không.
+        list: Đường đi tối ưu về số hành động (list các tuple trạng thái) nếu tìm thấy, None nếu không
+              (không có lời giải, vượt max_depth hoặc hết ngân sách nút).
     """
-    start_state = tuple(start_state)
-    goal_state = tuple(goal_state)
-
-    if start_state == goal_state:
-        return [start_state]
-
-    # Lặp qua các giới hạn độ sâu từ 0 đến max_depth
-    for depth in range(max_depth + 1):
-        # print(f"IDDFS (Double): Trying depth {depth}...")
-        # Thực hiện DLS với giới hạn độ sâu hiện tại
-        result_path = depth_limited_search(start_state, goal_state, depth)
-
-        # Nếu DLS tìm thấy giải pháp, trả về ngay lập tức
-        if result_path:
-            # print(f"IDDFS (Double): Found solution at depth {depth}.")
-            return result_path
-
-    # Nếu không tìm thấy giải pháp trong vòng lặp độ sâu
-    # print(f"IDDFS (Double): No solution found within max depth {max_depth}.")
-    return None
-
+    try:
+        size = board_size(start_state)
+        start = pack(start_state)
+        goal = pack(goal_state)
+    except (ValueError, TypeError):
+        return None
+
+    # Kiểm tra tính chẵn lẻ trước: không có giới hạn độ sâu mặc định nên không được lặp vô hạn
+    if not StateRanking(goal, size).reachable(start):
+        return None
+
+    def expand(code: int, h: int) -> List[Tuple[int, int]]:
+        # Hàng xóm (gồm di chuyển kép) từ bảng macro tính sẵn; mỗi hành động tính là một bước, h = 0
+        return [(next_state, 0) for next_state, _ in macro_successors(code, size)]
+
+    # IDDFS = IDA* với h = 0 (ida_engine.py): bỏ nước ngược, các cặp hành động thay được bằng một
+    # hành động (prune_siblings) và các trạng thái đang nằm trên đường đi (cycle_check)
+    table = None if table_mb is None else TranspositionTable(table_mb, size * size)
+    found_path = ida_star_search(start, goal, 0, expand, prune_siblings=True, table=table, cycle_check=True,
+                                 max_threshold=INFINITY if max_depth is None else max_depth,
+                                 on_iteration=NodeBudget(max_nodes))
+    if found_path is None:
+        return None
+    return [unpack(state, size) for state in found_path]
@@ -0,0 +1,85 @@
+from typing import Dict, List, Tuple
+
+from .state_kernel import CELL_BITS, CELL_MASK
+from .move_tables import get_move_table
+
+# Một macro (toán tử di chuyển đơn hoặc kép) đã được biên dịch sẵn:
+#   (final_blank, cost, label, chain, shifts, blank_delta, perm)
+# - final_blank: vị trí ô trống sau khi thực hiện
+# - cost: 1 cho di chuyển đơn, 2 cho di chuyển kép
+# - label: ví dụ 'Up' hoặc 'Up-Left' (hướng đi của ô trống)
+# - chain: chuỗi ô (blank, [mid,] target) mà ô trống đi qua
+# - shifts: CELL_BITS * vị trí của từng ô trong chain
+# - blank_delta: XOR cập nhật trường vị trí ô trống trong mã trạng thái
+# - perm: hoán vị tương ứng, new_state[i] = state[perm[i]] (dùng để kiểm tra trùng lặp khi dựng bảng)
+MacroMove = Tuple[int, int, str, Tuple[int, ...], Tuple[int, ...], int, Tuple[int, ...]]
+
+_MACRO_TABLES: Dict[int, Tuple[Tuple[MacroMove, ...], ...]] = {}
+
+
+def get_macro_table(size: int = 3) -> Tuple[Tuple[MacroMove, ...], ...]:
+    """
+    Bảng macro theo vị trí ô trống: table[blank_index] = các di chuyển đơn (chi phí 1)
+    rồi các di chuyển kép (chi phí 2).
+
+    Bước thứ hai của di chuyển kép không được quay lại vị trí ban đầu của ô trống.
+    Mỗi hoán vị chỉ xuất hiện một lần cho mỗi vị trí ô trống (được kiểm tra khi dựng bảng),
+    nên các thuật toán không cần loại trùng lặp khi sinh hàng xóm.
+    """
+    table = _MACRO_TABLES.get(size)
+    if table is not None:
+        return table
+
+    cells = size * size
+    moves = get_move_table(size)
+    rows = []
+    for blank_index in range(cells):
+        chains = []
+        for mid, label, _, _, _ in moves[blank_index]:
+            chains.append(((blank_index, mid), 1, label))
+        for mid, label, _, _, _ in moves[blank_index]:
+            for target, label2, _, _, _ in moves[mid]:
+                if target == blank_index:
+                    continue  # Quay lại vị trí ban đầu: không phải một nước đi
+                chains.append(((blank_index, mid, target), 2, f"{label}-{label2}"))
+
+        entries = []
+        seen_perms = set()
+        for chain, cost, label in chains:
+            perm = list(range(cells))
+            for i in range(len(chain) - 1):
+                perm[chain[i]] = chain[i + 1]
+            perm[chain[-1]] = blank_index
+            perm = tuple(perm)
+            if perm in seen_perms:
+                raise ValueError(f"Macro trùng lặp cho ô trống {blank_index}: {label}")
+            seen_perms.add(perm)
+            shifts = tuple(CELL_BITS * cell for cell in chain)
+            blank_delta = (blank_index ^ chain[-1]) << (CELL_BITS * cells)
+            entries.append((chain[-1], cost, label, chain, shifts, blank_delta, perm))
+        rows.append(tuple(entries))
+
+    table = tuple(rows)
+    _MACRO_TABLES[size] = table
+    return table
+
+
+def macro_successors(code: int, size: int = 3) -> List[Tuple[int, int]]:
+    """Các hàng xóm (mã trạng thái, chi phí) gồm cả di chuyển đơn và kép, không trùng lặp."""
+    table = _MACRO_TABLES.get(size) or get_macro_table(size)
+    blank_value = size * size - 1
+    result = []
+    for _, cost, _, _, shifts, blank_delta, _ in table[code >> (CELL_BITS * size * size)]:
+        if cost == 1:
+            sb, st = shifts
+            moved = (code >> st) & CELL_MASK
+            child = code ^ ((moved ^ blank_value) << sb) ^ ((moved ^ blank_value) << st)
+        else:
+            sb, sm, st = shifts
+            first = (code >> sm) & CELL_MASK
+            second = (code >> st) & CELL_MASK
+            child = (code ^ ((first ^ blank_value) << sb) ^ ((second ^ first) << sm)
+                     ^ ((blank_value ^ second) << st))
+        result.append((child ^ blank_delta, cost))
+    return result
+
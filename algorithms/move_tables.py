@@ -0,0 +1,77 @@
+from typing import Dict, List, Optional, Tuple
+
+from .state_kernel import CELL_BITS, CELL_MASK
+
+# Thứ tự di chuyển ô trống giống các get_neighbors() cũ: Lên, Xuống, Trái, Phải
+MOVE_DIRECTIONS = (('Up', -1, 0), ('Down', 1, 0), ('Left', 0, -1), ('Right', 0, 1))
+
+# Một nước đi đã được biên dịch sẵn:
+#   (target, label, target_shift, cell_mask, blank_delta)
+# - target: vị trí ô sẽ đổi chỗ với ô trống
+# - label: tên hướng di chuyển của ô trống ('Up', 'Down', 'Left', 'Right')
+# - target_shift: CELL_BITS * target, để đọc giá trị ô bị di chuyển
+# - cell_mask: bit thấp nhất của 2 ô (blank, target), nhân với (tile ^ ô trống) để XOR cả hai ô một lần
+# - blank_delta: XOR cập nhật trường vị trí ô trống trong mã trạng thái
+Move = Tuple[int, str, int, int, int]
+
+_MOVE_TABLES: Dict[int, Tuple[Tuple[Move, ...], ...]] = {}
+_LABEL_TABLES: Dict[int, Tuple[Dict[str, Move], ...]] = {}
+
+
+def get_move_table(size: int = 3) -> Tuple[Tuple[Move, ...], ...]:
+    """
+    Bảng nước đi theo vị trí ô trống: table[blank_index] = các Move hợp lệ.
+    Bảng được dựng một lần cho mỗi kích thước bảng và dùng lại cho mọi lần gọi.
+    """
+    table = _MOVE_TABLES.get(size)
+    if table is not None:
+        return table
+
+    cells = size * size
+    rows = []
+    for blank_index in range(cells):
+        row, col = divmod(blank_index, size)
+        entries = []
+        for label, dr, dc in MOVE_DIRECTIONS:
+            new_row, new_col = row + dr, col + dc
+            if 0 <= new_row < size and 0 <= new_col < size:
+                target = new_row * size + new_col
+                cell_mask = (1 << (CELL_BITS * target)) | (1 << (CELL_BITS * blank_index))
+                blank_delta = (blank_index ^ target) << (CELL_BITS * cells)
+                entries.append((target, label, CELL_BITS * target, cell_mask, blank_delta))
+        rows.append(tuple(entries))
+    table = tuple(rows)
+    _MOVE_TABLES[size] = table
+    return table
+
+
+def get_label_table(size: int = 3) -> Tuple[Dict[str, Move], ...]:
+    """labels[blank_index][label] = Move, dùng khi nước đi được cho bằng tên hướng (ví dụ: Tìm kiếm mù)."""
+    labels = _LABEL_TABLES.get(size)
+    if labels is None:
+        labels = tuple({move[1]: move for move in moves} for moves in get_move_table(size))
+        _LABEL_TABLES[size] = labels
+    return labels
+
+
+def apply_move(code: int, move: Move, size: int = 3) -> int:
+    """Áp dụng một Move lên mã trạng thái: một lần tra bảng và một phép đổi chỗ bằng XOR."""
+    _, _, target_shift, cell_mask, blank_delta = move
+    moved = (code >> target_shift) & CELL_MASK
+    return code ^ ((moved ^ (size * size - 1)) * cell_mask) ^ blank_delta
+
+
+def successors(code: int, size: int = 3) -> List[int]:
+    """Các trạng thái kế cận của một mã trạng thái (thứ tự Lên, Xuống, Trái, Phải)."""
+    table = _MOVE_TABLES.get(size) or get_move_table(size)
+    blank_value = size * size - 1
+    return [code ^ ((((code >> target_shift) & CELL_MASK) ^ blank_value) * cell_mask) ^ blank_delta
+            for _, _, target_shift, cell_mask, blank_delta in table[code >> (CELL_BITS * size * size)]]
+
+
+def move_by_label(code: int, label: str, size: int = 3) -> Optional[int]:
+    """Di chuyển ô trống theo tên hướng; trả về None nếu nước đi ra ngoài bảng."""
+    move = get_label_table(size)[code >> (CELL_BITS * size * size)].get(label)
+    if move is None:
+        return None
+    return apply_move(code, move, size)
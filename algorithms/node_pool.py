@@ -0,0 +1,36 @@
+from array import array
+from typing import List
+
+# Kho nút dùng chung cho các tìm kiếm theo lớp (beam search): mỗi nút chỉ là một chỉ số vào hai mảng
+#   states[i] = mã trạng thái, parents[i] = chỉ số nút cha (-1 với nút gốc)
+# Ứng viên trong beam là các bộ nhỏ (h, chỉ số) thay vì mang theo cả danh sách đường đi;
+# chỉ số tăng dần theo thứ tự thêm nên cũng là khóa phá hòa, heap không bao giờ phải so sánh sâu hơn.
+# Đường đi được dựng lại một lần, khi tìm thấy đích.
+
+NO_PARENT = -1
+
+
+class NodePool:
+    """Các nút (trạng thái, cha) được thêm dần, truy cập bằng chỉ số."""
+
+    def __init__(self):
+        self.states: List[int] = []
+        self.parents = array('i')
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def add(self, state: int, parent: int = NO_PARENT) -> int:
+        """Thêm nút và trả về chỉ số của nó."""
+        self.states.append(state)
+        self.parents.append(parent)
+        return len(self.states) - 1
+
+    def path(self, index: int) -> List[int]:
+        """Đường đi (list mã trạng thái) từ gốc đến nút index."""
+        path = []
+        while index != NO_PARENT:
+            path.append(self.states[index])
+            index = self.parents[index]
+        path.reverse()
+        return path
@@ -0,0 +1,116 @@
+import os
+from multiprocessing import Pool
+from typing import FrozenSet, List, Optional, Tuple
+
+from .heuristics import CompiledHeuristic, get_heuristic
+from .ida_engine import Expand, INFINITY, search_iteration
+
+# IDA* song song chia tại gốc (root split) trên một pool tiến trình.
+# Với mỗi ngưỡng, cây được mở rộng theo chiều rộng từ gốc (cùng các quy tắc cắt tỉa của ida_engine)
+# đến khi có đủ cây con (khoảng SUBTREES_PER_WORKER cây con mỗi tiến trình), rồi mỗi cây con được
+# duyệt bởi ida_engine.search_iteration trong một tiến trình con. Mọi đường đi tìm thấy ở ngưỡng
+# hiện tại đều tối ưu (ngưỡng là cận dưới nhỏ nhất chưa bị loại), nên tiến trình đầu tiên tìm thấy
+# đích kết thúc lần lặp: pool bị dừng ngay, các cây con còn lại bị hủy.
+# Mỗi tiến trình con tự dựng heuristic một lần (get_heuristic có bộ nhớ đệm theo tiến trình);
+# chỉ mã trạng thái và các số nguyên được gửi qua lại.
+
+SUBTREES_PER_WORKER = 8
+
+# Một cây con: (tiền tố đường đi từ gốc, mã gốc cây con, h, cha, các con của cha)
+Subtree = Tuple[List[int], int, int, int, FrozenSet[int]]
+
+_worker_goal = 0
+_worker_expand: Optional[Expand] = None
+_worker_double = False
+
+
+def make_expand(estimator: CompiledHeuristic, double: bool) -> Expand:
+    """Hàm sinh con (con, h) như ida_star (di chuyển đơn) hoặc ida_star_ANDOR (macro, h nhỏ trước)."""
+    if not double:
+        return estimator.successors
+
+    def expand(code: int, h: int) -> List[Tuple[int, int]]:
+        neighbors = [(next_state, next_h) for next_state, _, next_h in estimator.macro_successors(code, h)]
+        neighbors.sort(key=lambda item: item[1])
+        return neighbors
+
+    return expand
+
+
+def _init_worker(goal: int, size: int, heuristic: str, double: bool) -> None:
+    global _worker_goal, _worker_expand, _worker_double
+    _worker_goal = goal
+    _worker_expand = make_expand(get_heuristic(goal, size, heuristic), double)
+    _worker_double = double
+
+
+def _search_subtree(task: Tuple[Subtree, float]) -> Tuple[Optional[List[int]], float]:
+    (prefix, root, h, parent, siblings), threshold = task
+    path, next_threshold = search_iteration(root, _worker_goal, h, _worker_expand, threshold,
+                                            halve=_worker_double, prune_siblings=_worker_double,
+                                            root_depth=len(prefix), root_parent=parent,
+                                            root_siblings=siblings)
+    if path is not None:
+        return prefix + path, next_threshold
+    return None, next_threshold
+
+
+def split_root(start: int, goal: int, start_h: int, expand: Expand, threshold: float, double: bool,
+               wanted: int) -> Tuple[Optional[List[int]], List[Subtree], float]:
+    """
+    Mở rộng theo lớp từ gốc đến khi có ít nhất wanted cây con (hoặc hết nút).
+    Trả về (đường đi nếu gặp đích khi mở rộng, danh sách cây con, f nhỏ nhất vượt threshold).
+    """
+    next_threshold = INFINITY
+    layer: List[Subtree] = [([], start, start_h, -1, frozenset())]
+    while layer and len(layer) < wanted:
+        next_layer: List[Subtree] = []
+        for prefix, code, h, parent, siblings in layer:
+            path = prefix + [code]
+            depth = len(path)
+            expanded = expand(code, h)
+            reached = frozenset(child for child, _ in expanded) if double else frozenset()
+            for child, child_h in expanded:
+                if child == parent or (double and child in siblings):
+                    continue
+                f = depth + ((child_h + 1) >> 1 if double else child_h)
+                if f > threshold:
+                    if f < next_threshold:
+                        next_threshold = f
+                    continue
+                if child == goal:
+                    return path + [child], [], threshold
+                next_layer.append((path, child, child_h, code, reached))
+        layer = next_layer
+    return None, layer, next_threshold
+
+
+def parallel_ida_star(start: int, goal: int, size: int, heuristic: str = 'manhattan', double: bool = False,
+                      workers: Optional[int] = None) -> Optional[List[int]]:
+    """
+    IDA* (double=False: như ida_star; double=True: như ida_star_ANDOR) chia cây con tại gốc cho
+    workers tiến trình (None = số lõi CPU). Trả về đường đi (list mã trạng thái) hoặc None.
+    """
+    if start == goal:
+        return [start]
+    workers = workers or os.cpu_count() or 1
+    estimator = get_heuristic(goal, size, heuristic)
+    expand = make_expand(estimator, double)
+    start_h = estimator(start)
+    threshold = (start_h + 1) >> 1 if double else start_h
+
+    with Pool(workers, initializer=_init_worker, initargs=(goal, size, heuristic, double)) as pool:
+        while True:
+            path, subtrees, next_threshold = split_root(start, goal, start_h, expand, threshold, double,
+                                                        workers * SUBTREES_PER_WORKER)
+            if path is not None:
+                return path
+            tasks = [(subtree, threshold) for subtree in subtrees]
+            for found, subtree_next in pool.imap_unordered(_search_subtree, tasks):
+                if found is not None:
+                    return found  # Thoát khỏi with: pool.terminate() hủy các cây con còn lại
+                if subtree_next < next_threshold:
+                    next_threshold = subtree_next
+            if next_threshold == INFINITY:
+                return None
+            threshold = next_threshold
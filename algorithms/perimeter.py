@@ -0,0 +1,168 @@
+import os
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .state_kernel import blank_shift
+from .move_tables import successors
+from .exact_table import CACHE_DIR, cache_path
+
+# Cơ sở dữ liệu chu vi (perimeter / endgame database): mọi trạng thái cách goal không quá depth bước,
+# kèm khoảng cách chính xác. Dựng bằng BFS ngược từ goal, lưu gọn dưới dạng hai mảng song song:
+#   keys (array 'Q', phần dữ liệu ô của mã trạng thái đã sắp xếp; vị trí ô trống suy ra được, như
+#   transposition.py) và distances (bytearray), tra bằng tìm kiếm nhị phân.
+# Dùng được cho cả 4x4 (chỉ phần gần goal, không cần xếp hạng toàn bộ không gian), 9 byte mỗi trạng thái.
+# File cache: keys rồi distances, trong CACHE_DIR (như exact_table), dựng một lần cho mỗi (goal, depth).
+# Heuristic chặt hơn (xem wrap_heuristic): trong chu vi là khoảng cách chính xác; trạng thái có
+# h <= depth nhưng không nằm trong chu vi thì cách goal ít nhất depth + 1, làm tròn lên theo tính
+# chẵn lẻ của khoảng cách (mỗi bước ô trống đi một ô, nên khoảng cách cùng tính chẵn lẻ với độ lệch
+# hàng + cột của ô trống so với goal; giữ nguyên tính chẵn lẻ để IDA* không thêm lần lặp ở ngưỡng lẻ).
+# Vẫn chấp nhận được; IDA* / A* đi thẳng xuống goal khi chạm chu vi.
+
+DEFAULT_DEPTH = 10
+RAW_CACHE = 1 << 16
+
+Expand = Callable[[int, int], List[Tuple[int, int]]]
+
+_PERIMETERS: Dict[Tuple[int, int, int], "Perimeter"] = {}
+
+
+def build_perimeter(goal_code: int, size: int = 3, depth: int = DEFAULT_DEPTH) -> Tuple[array, bytearray]:
+    """BFS ngược từ goal_code đến độ sâu depth; trả về (mã đã sắp xếp, khoảng cách tương ứng)."""
+    found = {goal_code: 0}
+    frontier = [goal_code]
+    for level in range(1, depth + 1):
+        next_frontier = []
+        for code in frontier:
+            for child in successors(code, size):
+                if child not in found:
+                    found[child] = level
+                    next_frontier.append(child)
+        frontier = next_frontier
+    key_mask = (1 << blank_shift(size)) - 1
+    codes = sorted(found, key=lambda code: code & key_mask)
+    return array('Q', [code & key_mask for code in codes]), bytearray(found[code] for code in codes)
+
+
+class Perimeter:
+    """Các trạng thái trong vòng depth bước quanh một trạng thái đích, kèm khoảng cách chính xác."""
+
+    def __init__(self, goal_code: int, size: int = 3, depth: int = DEFAULT_DEPTH):
+        self.goal_code = goal_code
+        self.size = size
+        self.depth = depth
+        self.blank_shift = blank_shift(size)
+        self.key_mask = (1 << self.blank_shift) - 1
+        # outside[blank]: cận dưới cho trạng thái ngoài chu vi có ô trống ở blank (depth + 1 hoặc depth + 2)
+        goal_row, goal_col = divmod(goal_code >> self.blank_shift, size)
+        self.outside = []
+        for blank in range(size * size):
+            row, col = divmod(blank, size)
+            parity = (abs(row - goal_row) + abs(col - goal_col)) & 1
+            self.outside.append(depth + 1 + ((depth + 1 + parity) & 1))
+        path = cache_path(goal_code, size, f"perimeter{depth}")
+        loaded = self._load(path)
+        if loaded is None:
+            loaded = build_perimeter(goal_code, size, depth)
+            self._save(path, *loaded)
+        self.keys, self.distances = loaded
+
+    @staticmethod
+    def _load(path: str) -> Optional[Tuple[array, bytearray]]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if not data or len(data) % 9:
+            return None
+        count = len(data) // 9
+        keys = array('Q')
+        keys.frombytes(data[:8 * count])
+        return keys, bytearray(data[8 * count:])
+
+    @staticmethod
+    def _save(path: str, keys: array, distances: bytearray) -> None:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(keys.tobytes())
+                f.write(distances)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Không ghi được cơ sở dữ liệu chu vi vào {path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def distance(self, code: int) -> Optional[int]:
+        """Khoảng cách chính xác đến goal nếu code nằm trong chu vi, ngược lại None."""
+        keys = self.keys
+        code &= self.key_mask
+        index = bisect_left(keys, code)
+        if index < len(keys) and keys[index] == code:
+            return self.distances[index]
+        return None
+
+    def path_from(self, code: int) -> List[int]:
+        """Đường đi tối ưu từ code (phải nằm trong chu vi) đến goal: mỗi bước giảm khoảng cách đi 1."""
+        remaining = self.distance(code)
+        path = [code]
+        while remaining:
+            for child in successors(code, self.size):
+                if self.distance(child) == remaining - 1:
+                    code = child
+                    break
+            remaining -= 1
+            path.append(code)
+        return path
+
+    def estimate(self, code: int, h: int) -> int:
+        """h chặt hơn từ h chấp nhận được: chính xác trong chu vi, >= depth + 1 ngay ngoài chu vi."""
+        if h > self.depth:
+            return h
+        exact = self.distance(code)
+        return self.outside[code >> self.blank_shift] if exact is None else exact
+
+    def wrap_heuristic(self, estimator) -> Expand:
+        """
+        Hàm sinh con (con, h) như estimator.successors nhưng dùng estimate() cho h của con.
+        h đã được nâng chỉ khi h gốc <= depth (giá trị mới <= depth + 2), nên khi h nhận vào <= depth + 2
+        thì cần h gốc trước khi cập nhật tăng dần: lấy từ bộ nhớ đệm các h gốc vừa bị nâng (giới hạn
+        RAW_CACHE mục, xóa khi đầy), nếu không có thì tính lại từ đầu (chỉ xảy ra gần goal).
+        """
+        depth = self.depth
+        limit = depth + 2
+        outside = self.outside
+        blank_shift = self.blank_shift
+        lookup = self.distance
+        raw_successors = estimator.successors
+        raw_cache: Dict[int, int] = {}
+
+        def expand(code: int, h: int) -> List[Tuple[int, int]]:
+            if h <= limit:
+                raw = raw_cache.get(code)
+                h = estimator(code) if raw is None else raw
+            children = []
+            for child, child_h in raw_successors(code, h):
+                if child_h <= depth:
+                    if len(raw_cache) >= RAW_CACHE:
+                        raw_cache.clear()
+                    raw_cache[child] = child_h
+                    exact = lookup(child)
+                    child_h = outside[child >> blank_shift] if exact is None else exact
+                children.append((child, child_h))
+            return children
+
+        return expand
+
+
+def get_perimeter(goal_code: int, size: int = 3, depth: int = DEFAULT_DEPTH) -> Perimeter:
+    """Chu vi cho (goal_code, depth), được nạp một lần cho mỗi tiến trình (lần đầu có thể phải dựng và ghi file)."""
+    key = (goal_code, size, depth)
+    perimeter = _PERIMETERS.get(key)
+    if perimeter is None:
+        perimeter = Perimeter(goal_code, size, depth)
+        _PERIMETERS[key] = perimeter
+    return perimeter
@@ -1,6 +1,9 @@
 # algorithms/q_learning.py
 import random
 import time
+from .move_tables import successors
+from .state_kernel import pack, board_size
+from .relabel import get_relabeling
 
 # --- Q-Learning Parameters (Example, adjust as needed) ---
 ALPHA = 0.1  # Learning rate
@@ -10,58 +13,42 @@ NUM_EPISODES = 1000 # Number of training episodes
 MAX_STEPS_PER_EPISODE = 200 # Max steps per episode to avoid infinite loops
 
 # --- Helper Functions (Specific to 8-Puzzle for Q-Learning) ---
-def get_valid_actions(state_tuple):
+def get_valid_actions(state, size=3):
     """
     Returns a list of possible actions (neighboring states) from the current state.
-    Action itself could be the resulting state_tuple.
+    States are packed integer codes (state_kernel); the action itself is the resulting state.
     """
-    state = list(state_tuple)
-    try:
-        blank_index = state.index(9) # Assuming 9 is the blank tile
-    except ValueError:
-        return [] # Should not happen in a valid puzzle state
+    return successors(state, size) # Precomputed move table
 
-    row, col = divmod(blank_index, 3)
-    possible_new_states = []
-    moves = [(-1, 0, 'UP'), (1, 0, 'DOWN'), (0, -1, 'LEFT'), (0, 1, 'RIGHT')] # dr, dc, action_name
-
-    for dr, dc, _ in moves:
-        new_row, new_col = row + dr, col + dc
-        if 0 <= new_row < 3 and 0 <= new_col < 3:
-            new_s = state[:]
-            new_index = new_row * 3 + new_col
-            new_s[blank_index], new_s[new_index] = new_s[new_index], new_s[blank_index]
-            possible_new_states.append(tuple(new_s))
-    return possible_new_states
-
-def get_reward(state_tuple, goal_state_tuple):
+def get_reward(state, goal_state):
     """
     Calculates the reward for reaching a state.
     """
-    if state_tuple == goal_state_tuple:
+    if state == goal_state:
         return 100  # Large positive reward for reaching the goal
-    # elif is_stuck_or_bad_state(state_tuple): # Optional: penalize bad states
+    # elif is_stuck_or_bad_state(state): # Optional: penalize bad states
     #     return -10
     else:
         return -1   # Small negative reward for each step (encourages shorter paths)
 
 class QLearningAgent:
-    def __init__(self, goal_state, alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON):
-        self.q_table = {}  # Q-table: state_tuple -> {action_state_tuple: q_value}
+    def __init__(self, goal_state, alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON, size=3):
+        self.q_table = {}  # Q-table: state code -> {action state code: q_value}
         self.goal_state = goal_state
+        self.size = size
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon
         self.training_episodes = 0
         self.nodes_expanded_during_training = 0
 
-    def get_q_value(self, state_tuple, action_state_tuple):
+    def get_q_value(self, state, action_state):
         """Gets Q-value for a state-action pair, defaults to 0 if not seen."""
-        return self.q_table.get(state_tuple, {}).get(action_state_tuple, 0.0)
+        return self.q_table.get(state, {}).get(action_state, 0.0)
 
-    def choose_action(self, state_tuple):
+    def choose_action(self, state):
         """Chooses an action using epsilon-greedy strategy."""
-        possible_actions = get_valid_actions(state_tuple)
+        possible_actions = get_valid_actions(state, self.size)
         if not possible_actions:
             return None # No valid actions from this state
 
@@ -70,7 +57,7 @@ class QLearningAgent:
             return random.choice(possible_actions)
         else:
             # Exploit: choose the best action based on Q-values
-            q_values = {action: self.get_q_value(state_tuple, action) for action in possible_actions}
+            q_values = {action: self.get_q_value(state, action) for action in possible_actions}
             max_q = -float('inf')
             # Handle ties by choosing randomly among best actions
             best_actions = []
@@ -83,23 +70,23 @@ class QLearningAgent:
             return random.choice(best_actions) if best_actions else None
 
 
-    def learn(self, state_tuple, action_state_tuple, reward, next_state_tuple):
+    def learn(self, state, action_state, reward, next_state):
         """Updates Q-value for a state-action pair."""
         self.nodes_expanded_during_training +=1
-        old_q_value = self.get_q_value(state_tuple, action_state_tuple)
+        old_q_value = self.get_q_value(state, action_state)
 
         # Find max Q-value for the next state
-        next_possible_actions = get_valid_actions(next_state_tuple)
+        next_possible_actions = get_valid_actions(next_state, self.size)
         max_future_q = 0.0
         if next_possible_actions:
-            max_future_q = max([self.get_q_value(next_state_tuple, future_action) for future_action in next_possible_actions], default=0.0)
+            max_future_q = max([self.get_q_value(next_state, future_action) for future_action in next_possible_actions], default=0.0)
         
         # Q-learning update rule
         new_q_value = old_q_value + self.alpha * (reward + self.gamma * max_future_q - old_q_value)
 
-        if state_tuple not in self.q_table:
-            self.q_table[state_tuple] = {}
-        self.q_table[state_tuple][action_state_tuple] = new_q_value
+        if state not in self.q_table:
+            self.q_table[state] = {}
+        self.q_table[state][action_state] = new_q_value
 
     def train(self, start_state_initial, num_episodes=NUM_EPISODES, max_steps_per_episode=MAX_STEPS_PER_EPISODE):
         print(f"Starting Q-Learning training for {num_episodes} episodes...")
@@ -136,19 +123,19 @@ class QLearningAgent:
         print(f"Total nodes expanded during training: {self.nodes_expanded_during_training}")
 
 
-    def get_policy_path(self, start_state_tuple, max_path_length=50):
+    def get_policy_path(self, start_state, max_path_length=50):
         """
         Extracts the learned policy (path) from start_state to goal_state.
         """
-        path = [start_state_tuple]
-        current_state = start_state_tuple
-        visited_in_path = {start_state_tuple} # To avoid cycles during path reconstruction
+        path = [start_state]
+        current_state = start_state
+        visited_in_path = {start_state} # To avoid cycles during path reconstruction
 
         for _ in range(max_path_length):
             if current_state == self.goal_state:
                 break
 
-            possible_actions = get_valid_actions(current_state)
+            possible_actions = get_valid_actions(current_state, self.size)
             if not possible_actions:
                 print("Warning: No possible actions from state in policy path reconstruction.")
                 return None # Stuck
@@ -212,12 +199,20 @@ def solve(start_state, goal_state):
     
     print(f"Q-Learning: Attempting to solve from {start_state} to {goal_state}")
 
+    # Relabel tiles so every goal with the same blank position shares one canonical goal
+    # (and therefore one Q-table); the path is mapped back to the original labels at the end.
+    # The agent works on packed integer codes (state_kernel), not tuples.
+    size = board_size(goal_state)
+    relabeling = get_relabeling(pack(goal_state), size)
+    start_state = relabeling.to_canonical(pack(start_state))
+    goal_state = relabeling.goal
+
     # Initialize or re-initialize the agent
     # For a real application, you might want to save/load the Q-table
     # or have a more sophisticated training strategy.
-    if q_agent is None or q_agent.goal_state != goal_state: # Re-init if goal changed
+    if q_agent is None or q_agent.goal_state != goal_state or q_agent.size != size: # Re-init if goal changed
         print("Initializing Q-Learning agent.")
-        q_agent = QLearningAgent(goal_state=goal_state)
+        q_agent = QLearningAgent(goal_state=goal_state, size=size)
         is_trained = False # Needs retraining if goal changed or first time
 
     if not is_trained:
@@ -236,6 +231,7 @@ def solve(start_state, goal_state):
     path = q_agent.get_policy_path(start_state, max_path_length=100) # Adjust max_path_length as needed
 
     if path:
+        path = [relabeling.unpack(state) for state in path]
         print(f"Q-Learning: Path found with {len(path)-1} steps.")
         # The 'nodes_expanded' for Q-learning is tricky.
         # We can report nodes expanded during training or during policy extraction.
@@ -0,0 +1,184 @@
+from array import array
+from math import factorial
+from typing import Dict, List, Optional, Set, Union
+
+from .state_kernel import CELL_BITS, CELL_MASK, blank_shift
+
+# Xếp hạng hoàn hảo (perfect hash) các trạng thái đạt được:
+#   rank = blank_index * (n! / 2) + lehmer(dãy ô, bỏ ô trống) // 2,   n = số ô - 1
+# Với mỗi vị trí ô trống, chỉ một nửa các hoán vị của dãy ô (cùng tính chẵn lẻ) là đạt được,
+# và hai hạng Lehmer 2k, 2k + 1 luôn khác tính chẵn lẻ (chỉ khác ở hai ô cuối),
+# nên lehmer // 2 đánh số liên tục các hoán vị đạt được trong [0, n! / 2).
+# Toàn bộ không gian 3x3 được đánh số trong [0, 9! / 2) = [0, 181440).
+# Di chuyển ngang (đơn hoặc kép) không đổi thứ tự dãy ô (bỏ ô trống), nên hạng của con chỉ khác hạng của cha
+# ở phần blank_index: rank_child = rank_cha + (blank_con - blank_cha) * (n! / 2).
+
+# Giới hạn số hạng để dùng bảng mảng; lớn hơn (ví dụ 4x4) thì dùng dict/set như trước
+RANKED_LIMIT = 1 << 24
+
+NO_PARENT = -1
+
+
+def _lehmer_parity(code: int, cells: int) -> int:
+    """Tính chẵn lẻ của dãy ô (bỏ ô trống) theo thứ tự vị trí."""
+    blank_value = cells - 1
+    tiles = [(code >> (CELL_BITS * i)) & CELL_MASK for i in range(cells)]
+    tiles = [t for t in tiles if t != blank_value]
+    inversions = sum(1 for i in range(len(tiles)) for j in range(i + 1, len(tiles)) if tiles[i] > tiles[j])
+    return inversions & 1
+
+
+class StateRanking:
+    """
+    Xếp hạng/giải hạng các trạng thái cùng thành phần liên thông với reference_code.
+
+    rank() không phụ thuộc thành phần; unrank() cần biết tính chẵn lẻ của dãy ô ứng với từng vị
+    trí ô trống (bất biến của bài toán trượt ô), được suy ra từ reference_code:
+    - cạnh lẻ (3x3): tính chẵn lẻ của dãy ô không đổi khi di chuyển
+    - cạnh chẵn (4x4): tính chẵn lẻ của dãy ô + hàng của ô trống không đổi
+    """
+
+    def __init__(self, reference_code: int, size: int = 3):
+        self.size = size
+        self.cells = size * size
+        self.tiles = self.cells - 1
+        self.blank_shift = blank_shift(size)
+        self.half = factorial(self.tiles) // 2
+        self.count = self.cells * self.half
+        # Giá trị vị trí của từng chữ số Lehmer (hệ cơ số giai thừa)
+        self.place = [factorial(self.tiles - 1 - i) for i in range(self.tiles)]
+        # terms[blank] = [(vị trí bit của ô, giá trị vị trí Lehmer)] theo thứ tự đọc, bỏ ô trống;
+        # ô cuối cùng luôn có chữ số 0 nên được bỏ qua
+        self.terms = []
+        for blank in range(self.cells):
+            shifts = [CELL_BITS * cell for cell in range(self.cells) if cell != blank]
+            self.terms.append(list(zip(shifts, self.place))[:-1])
+        self.below = [(1 << tile) - 1 for tile in range(1 << CELL_BITS)]
+        self.row = [cell // size for cell in range(self.cells)]
+
+        reference_parity = _lehmer_parity(reference_code, self.cells)
+        reference_row = (reference_code >> self.blank_shift) // size
+        self.parity = [(reference_parity + (size % 2 == 0) * (blank // size - reference_row)) & 1
+                       for blank in range(self.cells)]
+
+    def rank(self, code: int) -> int:
+        blank = code >> self.blank_shift
+        below = self.below
+        seen = 0
+        lehmer = 0
+        for shift, place in self.terms[blank]:
+            tile = (code >> shift) & CELL_MASK
+            # Chữ số Lehmer = tile - số ô nhỏ hơn tile đã xuất hiện ở bên trái
+            lehmer += (tile - (seen & below[tile]).bit_count()) * place
+            seen |= 1 << tile
+        return blank * self.half + (lehmer >> 1)
+
+    def child_rank(self, code: int, parent_code: int, parent_rank: int) -> int:
+        """
+        Hạng của code khi nó là hàng xóm (di chuyển đơn hoặc kép) của parent_code có hạng parent_rank.
+        Ô trống ở lại cùng hàng (di chuyển ngang) thì thứ tự dãy ô không đổi: O(1).
+        """
+        blank = code >> self.blank_shift
+        parent_blank = parent_code >> self.blank_shift
+        if self.row[blank] == self.row[parent_blank]:
+            return parent_rank + (blank - parent_blank) * self.half
+        return self.rank(code)
+
+    def unrank(self, index: int) -> int:
+        blank, half_rank = divmod(index, self.half)
+        lehmer = half_rank << 1
+        digits = []
+        for value in self.place:
+            digit, lehmer = divmod(lehmer, value)
+            digits.append(digit)
+        if self.tiles >= 2 and (sum(digits) & 1) != self.parity[blank]:
+            digits[-2] = 1  # Hạng lẻ 2k + 1: đổi chỗ hai ô cuối để có đúng tính chẵn lẻ
+
+        remaining = list(range(self.tiles))
+        code = blank << self.blank_shift
+        i = 0
+        for cell in range(self.cells):
+            if cell == blank:
+                tile = self.tiles
+            else:
+                tile = remaining.pop(digits[i])
+                i += 1
+            code |= tile << (CELL_BITS * cell)
+        return code
+
+    def reachable(self, code: int) -> bool:
+        """True nếu code cùng thành phần liên thông với trạng thái tham chiếu."""
+        return _lehmer_parity(code, self.cells) == self.parity[code >> self.blank_shift]
+
+
+class RankedTable:
+    """
+    Tập đóng + bảng cha dạng mảng, đánh chỉ số theo hạng:
+    - visited: bitset, 1 bit mỗi trạng thái (22 KB cho 3x3)
+    - parent: array('i') lưu hạng của trạng thái cha (NO_PARENT cho gốc)
+    Khóa (key) của một trạng thái là hạng của nó.
+    """
+
+    def __init__(self, ranking: StateRanking):
+        self.ranking = ranking
+        self.visited = bytearray((ranking.count + 7) >> 3)
+        self.parent = array('i', [NO_PARENT]) * ranking.count
+
+    def add(self, code: int, parent_key: int = NO_PARENT, parent_code: Optional[int] = None) -> int:
+        """
+        Đánh dấu code và ghi cha; trả về khóa của code, hoặc -1 nếu code đã được đánh dấu.
+        Nếu code là hàng xóm (di chuyển đơn) của parent_code thì truyền parent_code để tính hạng nhanh.
+        """
+        if parent_code is None:
+            key = self.ranking.rank(code)
+        else:
+            key = self.ranking.child_rank(code, parent_code, parent_key)
+        byte, bit = key >> 3, 1 << (key & 7)
+        if self.visited[byte] & bit:
+            return -1
+        self.visited[byte] |= bit
+        self.parent[key] = parent_key
+        return key
+
+    def path(self, key: int) -> List[int]:
+        """Các mã trạng thái từ gốc đến trạng thái có khóa key."""
+        keys = []
+        while key != NO_PARENT:
+            keys.append(key)
+            key = self.parent[key]
+        keys.reverse()
+        return [self.ranking.unrank(k) for k in keys]
+
+
+class HashedTable:
+    """Cùng giao diện với RankedTable nhưng dùng set/dict (cho bảng quá lớn để đánh hạng). Khóa là mã trạng thái."""
+
+    def __init__(self):
+        self.visited: Set[int] = set()
+        self.parent: Dict[int, int] = {}
+
+    def add(self, code: int, parent_key: int = NO_PARENT, parent_code: Optional[int] = None) -> int:
+        if code in self.visited:
+            return -1
+        self.visited.add(code)
+        self.parent[code] = parent_key
+        return code
+
+    def path(self, key: int) -> List[int]:
+        path = []
+        while key != NO_PARENT:
+            path.append(key)
+            key = self.parent[key]
+        path.reverse()
+        return path
+
+
+ClosedTable = Union[RankedTable, HashedTable]
+
+
+def closed_table(start_code: int, size: int = 3) -> ClosedTable:
+    """Bảng đóng cho một lần tìm kiếm từ start_code: dạng mảng nếu không gian đủ nhỏ để đánh hạng."""
+    ranking = StateRanking(start_code, size)
+    if ranking.count <= RANKED_LIMIT:
+        return RankedTable(ranking)
+    return HashedTable()
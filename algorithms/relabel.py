@@ -0,0 +1,71 @@
+from typing import Dict, List, Tuple
+
+from .state_kernel import State, CELL_BITS, CELL_MASK, blank_shift, pack, goal_positions
+
+# Đổi nhãn ô (liên hợp theo một hoán vị giá trị ô) để mọi trạng thái đích dùng chung bảng/bộ nhớ đệm.
+# Đổi tên các ô không làm thay đổi luật di chuyển (chỉ ô trống di chuyển), nên nếu f là hoán vị
+# giá trị biến goal thành đích chuẩn thì: đường đi start -> goal  <=>  đường đi f(start) -> f(goal).
+# Ô trống không đổi tên, nên đích chuẩn phụ thuộc vào vị trí ô trống của goal:
+#   đích chuẩn = các ô 1..n theo thứ tự đọc, ô trống ở đúng vị trí ô trống của goal.
+# Với 3x3 có tối đa 9 đích chuẩn; đích mặc định (1, 2, ..., 9) đã là đích chuẩn của chính nó.
+# Mọi đích trong blind.py TARGET_GOAL_STATES có ô trống ở góc hoặc tâm, nên chỉ cần 2 bộ bảng.
+
+_RELABELINGS: Dict[Tuple[int, int], "Relabeling"] = {}
+
+
+def canonical_goal_state(blank_index: int, size: int = 3) -> State:
+    """Đích chuẩn cho vị trí ô trống blank_index."""
+    cells = size * size
+    tiles = iter(range(1, cells))
+    return tuple(cells if i == blank_index else next(tiles) for i in range(cells))
+
+
+class Relabeling:
+    """
+    Hoán vị giá trị ô đưa goal_code về đích chuẩn cùng vị trí ô trống.
+    - forward[v] / backward[v]: ánh xạ giá trị lưu (ô - 1) sang nhãn chuẩn và ngược lại
+    - goal: mã của đích chuẩn
+    Mỗi lần đổi nhãn một trạng thái tốn O(số ô).
+    """
+
+    def __init__(self, goal_code: int, size: int = 3):
+        cells = size * size
+        self.size = size
+        self.cells = cells
+        self.blank_shift = blank_shift(size)
+        positions = goal_positions(goal_code, size)
+        self.goal = pack(canonical_goal_state(positions[cells - 1], size))
+        self.forward = [0] * cells
+        self.backward = [0] * cells
+        for value in range(cells):
+            canonical_value = (self.goal >> (CELL_BITS * positions[value])) & CELL_MASK
+            self.forward[value] = canonical_value
+            self.backward[canonical_value] = value
+        self.identity = self.forward == list(range(cells))
+
+    def _map_code(self, code: int, table: List[int]) -> int:
+        result = code & ~((1 << self.blank_shift) - 1)  # Giữ nguyên trường vị trí ô trống
+        for shift in range(0, self.blank_shift, CELL_BITS):
+            result |= table[(code >> shift) & CELL_MASK] << shift
+        return result
+
+    def to_canonical(self, code: int) -> int:
+        return code if self.identity else self._map_code(code, self.forward)
+
+    def from_canonical(self, code: int) -> int:
+        return code if self.identity else self._map_code(code, self.backward)
+
+    def unpack(self, code: int) -> State:
+        """Giải mã một mã trạng thái trong không gian chuẩn thẳng về tuple với nhãn gốc."""
+        backward = self.backward
+        return tuple(backward[(code >> shift) & CELL_MASK] + 1 for shift in range(0, self.blank_shift, CELL_BITS))
+
+
+def get_relabeling(goal_code: int, size: int = 3) -> Relabeling:
+    """Phép đổi nhãn cho goal_code, được lưu đệm theo (đích, kích thước)."""
+    key = (goal_code, size)
+    relabeling = _RELABELINGS.get(key)
+    if relabeling is None:
+        relabeling = Relabeling(goal_code, size)
+        _RELABELINGS[key] = relabeling
+    return relabeling
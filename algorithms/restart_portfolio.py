@@ -0,0 +1,85 @@
+import importlib
+import os
+import random
+from multiprocessing import Array, Pool, Value
+from typing import Callable, List, Optional, Tuple
+
+from .state_kernel import pack, unpack
+from .heuristics import get_heuristic
+
+# Chạy song song các lần khởi động lại (restart) của họ hill climbing (hill_climbing, steepest_hill và các
+# bản _ANDOR) trên một pool tiến trình. Mỗi module cung cấp:
+#   climb(heuristic, goal, state, score, max_iterations, rng) -> (đường đi, điểm cuối, trạng thái tốt nhất,
+#   điểm tốt nhất) cho một lần leo, và RESTART_FROM_BEST: xác suất bắt đầu lần leo từ trạng thái tốt nhất.
+# Các lần leo độc lập với nhau, trừ trạng thái tốt nhất toàn cục (best_state_overall trong bản tuần tự):
+# điểm và các ô của trạng thái đó nằm trong bộ nhớ dùng chung (multiprocessing.Value / Array, cùng một khóa).
+# Mỗi tiến trình con có bộ sinh số ngẫu nhiên riêng (seed + số thứ tự tiến trình nếu có seed).
+# Lần leo đầu tiên đến đích kết thúc tìm kiếm: thoát khỏi with làm pool.terminate() hủy mọi lần leo còn lại.
+
+# Một lần leo: (đường đi dạng list mã trạng thái, điểm cuối, trạng thái tốt nhất, điểm tốt nhất)
+Climb = Callable[..., Tuple[List[int], int, int, int]]
+
+_worker_climb: Optional[Climb] = None
+_worker_heuristic = None
+_worker_rng = random.Random()
+_worker_task: Tuple = ()
+_shared_score = None
+_shared_tiles = None
+
+
+def _init_worker(module_name: str, start: int, start_score: int, goal: int, size: int, max_iterations: int,
+                 best_score, best_tiles, counter, seed: Optional[int]) -> None:
+    global _worker_climb, _worker_heuristic, _worker_rng, _worker_task, _shared_score, _shared_tiles
+    module = importlib.import_module(f".{module_name}", __package__)
+    _worker_climb = module.climb
+    _worker_heuristic = get_heuristic(goal, size)
+    _worker_task = (start, start_score, goal, size, max_iterations, module.RESTART_FROM_BEST)
+    _shared_score = best_score
+    _shared_tiles = best_tiles
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    _worker_rng = random.Random() if seed is None else random.Random(seed * 1000003 + index)
+
+
+def _run_restart(restart: int) -> Tuple[List[int], int]:
+    """Một lần leo (restart = số thứ tự lần khởi động lại); trả về (đường đi, điểm cuối)."""
+    start, start_score, goal, size, max_iterations, restart_from_best = _worker_task
+    state, score = start, start_score
+    if restart > 0 and _worker_rng.random() < restart_from_best:
+        with _shared_score.get_lock():
+            if _shared_score.value < start_score:
+                state, score = pack(tuple(_shared_tiles)), _shared_score.value
+    path, score, best_state, best_score = _worker_climb(_worker_heuristic, goal, state, score,
+                                                        max_iterations, _worker_rng)
+    if best_score < _shared_score.value:
+        with _shared_score.get_lock():
+            if best_score < _shared_score.value:
+                _shared_score.value = best_score
+                _shared_tiles[:] = list(unpack(best_state, size))
+    return path, score
+
+
+def run_portfolio(module_name: str, start: int, goal: int, size: int, max_iterations: int, max_restarts: int,
+                  workers: Optional[int] = None,
+                  seed: Optional[int] = None) -> Tuple[Optional[List[int]], Optional[List[int]]]:
+    """
+    Chạy max_restarts lần leo của module module_name trên workers tiến trình (None = số lõi CPU).
+    Trả về (đường đi đến đích nếu có lần leo tìm thấy, đường đi không tầm thường có điểm cuối thấp nhất);
+    đường đi là list mã trạng thái, bắt đầu tại điểm xuất phát của lần leo đó (như bản tuần tự).
+    """
+    workers = workers or os.cpu_count() or 1
+    start_score = get_heuristic(goal, size)(start)
+    best_score = Value('i', start_score)
+    best_tiles = Array('b', list(unpack(start, size)), lock=False)
+    counter = Value('i', 0)
+    best_path: Optional[List[int]] = None
+    best_path_score = None
+    initargs = (module_name, start, start_score, goal, size, max_iterations, best_score, best_tiles, counter, seed)
+    with Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+        for path, score in pool.imap_unordered(_run_restart, range(max_restarts)):
+            if path[-1] == goal:
+                return path, path  # Thoát khỏi with: pool.terminate() hủy các lần leo còn lại
+            if len(path) > 1 and (best_path is None or score < best_path_score):
+                best_path, best_path_score = path, score
+    return None, best_path
@@ -1,8 +1,11 @@
 # algorithms/simulated_annealing.py
 import random
 import math
+from .state_kernel import pack, unpack, board_size
+from .heuristics import get_heuristic
+from .batch_annealing import BATCH_CHAINS, HAVE_NUMPY, anneal_batch
 
-def solve(start, goal, initial_temperature=100, cooling_rate=0.003):
+def solve(start, goal, initial_temperature=100, cooling_rate=0.003, chains=None, seed=None):
     """
     Giải 8-Puzzle bằng thuật toán Simulated Annealing.
 
@@ -11,54 +14,42 @@ def solve(start, goal, initial_temperature=100, cooling_rate=0.003):
         goal (tuple): Trạng thái đích của puzzle.
         initial_temperature (float): Nhiệt độ ban đầu.
         cooling_rate (float): Tốc độ làm mát (giảm nhiệt độ).
+        chains (int): Số chuỗi SA chạy song song theo lô trên numpy (batch_annealing.py);
+              None = BATCH_CHAINS nếu có numpy, ngược lại 1 (một chuỗi như cũ).
+        seed (int): Hạt giống cho bộ sinh số ngẫu nhiên của các chuỗi song song.
 
     Returns:
         list: Danh sách các trạng thái từ trạng thái ban đầu đến trạng thái đích (nếu tìm thấy),
               hoặc None nếu không tìm thấy giải pháp.
     """
 
-    def get_neighbors(state):
-        """Tìm các trạng thái kế cận của một trạng thái."""
-        empty_index = state.index(9)
-        row, col = empty_index // 3, empty_index % 3
-        neighbors = []
+    # Heuristic Manhattan đã biên dịch theo đích: tính đầy đủ một lần cho trạng thái bắt đầu,
+    # sau đó h của hàng xóm được cập nhật từ h hiện tại bằng bảng delta
+    size = board_size(start)
+    if chains is None:
+        chains = BATCH_CHAINS if HAVE_NUMPY else 1
+    if chains > 1 and HAVE_NUMPY:
+        # Nhiều chuỗi cùng nhịp, trả về chuỗi đầu tiên đến đích
+        return anneal_batch(tuple(start), tuple(goal), size, chains, initial_temperature, cooling_rate,
+                            seed=seed)
+    start_code = pack(start)
+    goal_code = pack(goal)
+    heuristic = get_heuristic(goal_code, size)
 
-        moves = [(0, 1), (0, -1), (1, 0), (-1, 0)]  # Phải, Trái, Xuống, Lên
-        for dr, dc in moves:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 3 and 0 <= new_col < 3:
-                new_index = new_row * 3 + new_col
-                new_state = list(state)
-                new_state[empty_index], new_state[new_index] = new_state[new_index], new_state[empty_index]
-                neighbors.append(tuple(new_state))
-        return neighbors
-
-    def heuristic(state):
-        """Tính heuristic (Manhattan distance) từ trạng thái hiện tại đến trạng thái đích."""
-        distance = 0
-        for i in range(9):
-            if state[i] != 9:  # Không tính ô trống
-                goal_index = goal.index(state[i])
-                row1, col1 = i // 3, i % 3
-                row2, col2 = goal_index // 3, goal_index % 3
-                distance += abs(row1 - row2) + abs(col1 - col2)
-        return distance
-
-    current_state = start
+    current_state = start_code
     path = [current_state]
     current_heuristic = heuristic(current_state)
     temperature = initial_temperature
 
-    while current_state != goal:
+    while current_state != goal_code:
         if temperature <= 0.0001:  # Dừng khi nhiệt độ quá thấp
             return None
 
-        neighbors = get_neighbors(current_state)
+        neighbors = heuristic.successors(current_state, current_heuristic)
         if not neighbors:
             return None
 
-        next_state = random.choice(neighbors)
-        next_heuristic = heuristic(next_state)
+        next_state, next_heuristic = random.choice(neighbors)
         delta_e = next_heuristic - current_heuristic
 
         # Chấp nhận trạng thái tốt hơn hoặc trạng thái xấu hơn với xác suất nhất định
@@ -70,4 +61,4 @@ def solve(start, goal, initial_temperature=100, cooling_rate=0.003):
         # Làm mát hệ thống
         temperature *= (1 - cooling_rate)
 
-    return path
\ No newline at end of file
+    return [unpack(state, size) for state in path]
\ No newline at end of file
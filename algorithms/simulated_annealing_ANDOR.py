@@ -1,57 +1,14 @@
 import random
 import math
-from typing import List, Tuple, Optional, Set, Dict
+from typing import List, Tuple, Optional, Dict
+from .state_kernel import pack, unpack, board_size
+from .heuristics import get_heuristic
+from .batch_annealing import BATCH_CHAINS, HAVE_NUMPY, anneal_batch
 
 State = Tuple[int, ...]
 
-def manhattan_distance(state: State, goal_state: State) -> int:
-    # ... (Giữ nguyên hàm manhattan_distance) ...
-    total = 0
-    try:
-        size = int(len(state)**0.5)
-        if size * size != len(state) or len(goal_state) != len(state): return float('inf')
-        blank_tile = size * size
-        goal_map = {tile: i for i, tile in enumerate(goal_state)}
-    except (ValueError, TypeError): return float('inf')
-
-    for i in range(len(state)):
-        tile = state[i]
-        if tile != blank_tile:
-            curr_row, curr_col = divmod(i, size)
-            goal_pos = goal_map.get(tile)
-            if goal_pos is None: return float('inf')
-            goal_row, goal_col = divmod(goal_pos, size)
-            total += abs(curr_row - goal_row) + abs(curr_col - goal_col)
-    return total
-
-# --- Dán hàm get_neighbors_with_double_moves vào đây ---
-def get_neighbors_with_double_moves(state: State) -> List[State]:
-    neighbors: Set[State] = set(); s_list = list(state)
-    try:
-        size = int(len(state)**0.5);
-        if size * size != len(state): return []
-        blank_tile = size * size; blank_index = s_list.index(blank_tile)
-    except (ValueError, TypeError): return []
-    row, col = divmod(blank_index, size); moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    single_move_intermediates: List[Tuple[State, int]] = []
-    for dr, dc in moves:
-        new_row, new_col = row + dr, col + dc
-        if 0 <= new_row < size and 0 <= new_col < size:
-            new_index = new_row * size + new_col; new_s = s_list[:]; new_s[blank_index], new_s[new_index] = new_s[new_index], new_s[blank_index]
-            neighbor_state = tuple(new_s); neighbors.add(neighbor_state); single_move_intermediates.append((neighbor_state, new_index))
-    for intermediate_state, intermediate_blank_index in single_move_intermediates:
-        s_intermediate = list(intermediate_state); row1, col1 = divmod(intermediate_blank_index, size)
-        for dr, dc in moves:
-            new_row2, new_col2 = row1 + dr, col1 + dc
-            if 0 <= new_row2 < size and 0 <= new_col2 < size:
-                new_index2 = new_row2 * size + new_col2
-                if new_index2 == blank_index: continue
-                new_s2 = s_intermediate[:]; new_s2[intermediate_blank_index], new_s2[new_index2] = new_s2[new_index2], new_s2[intermediate_blank_index]
-                neighbor2_state = tuple(new_s2); neighbors.add(neighbor2_state)
-    return list(neighbors)
-# --- Kết thúc hàm get_neighbors_with_double_moves ---
-
-def solve(start_state: State, goal_state: State, initial_temperature=100.0, cooling_rate=0.005, min_temperature=0.1, max_iterations=50000) -> Optional[List[State]]:
+def solve(start_state: State, goal_state: State, initial_temperature=100.0, cooling_rate=0.005, min_temperature=0.1, max_iterations=50000,
+          chains: Optional[int] = None, seed: Optional[int] = None) -> Optional[List[State]]:
     """
     Giải 8-Puzzle bằng Simulated Annealing với di chuyển kép.
 
@@ -62,6 +19,9 @@ def solve(start_state: State, goal_state: State, initial_temperature=100.0, cool
         cooling_rate (float): Tốc độ làm mát (giảm nhiệt độ).
         min_temperature (float): Nhiệt độ dừng tối thiểu.
         max_iterations (int): Số lần lặp tối đa.
+        chains (int): Số chuỗi SA chạy song song theo lô trên numpy (batch_annealing.py);
+              None = BATCH_CHAINS nếu có numpy, ngược lại 1 (một chuỗi như cũ).
+        seed (int): Hạt giống cho bộ sinh số ngẫu nhiên của các chuỗi song song.
 
     Returns:
         list: Danh sách các trạng thái trên đường đi (có thể không tối ưu) nếu tìm thấy đích,
@@ -70,12 +30,26 @@ def solve(start_state: State, goal_state: State, initial_temperature=100.0, cool
     start_state = tuple(start_state)
     goal_state = tuple(goal_state)
 
-    current_state = start_state
-    current_heuristic = manhattan_distance(current_state, goal_state)
-
-    if current_heuristic == float('inf'):
+    try:
+        size = board_size(start_state)
+        if len(goal_state) != len(start_state):
+            raise ValueError("Kích thước trạng thái không khớp")
+        goal = pack(goal_state)
+        current_state = pack(start_state)
+    except (ValueError, TypeError):
         print("SA (Double): Lỗi tính heuristic ban đầu.")
         return None
+    if chains is None:
+        chains = BATCH_CHAINS if HAVE_NUMPY else 1
+    if chains > 1:
+        if HAVE_NUMPY:
+            # Nhiều chuỗi cùng nhịp, trả về chuỗi đầu tiên đến đích
+            return anneal_batch(start_state, goal_state, size, chains, initial_temperature, cooling_rate,
+                                min_temperature, max_iterations, double=True, seed=seed)
+        print("SA (Double): Không có numpy, chạy một chuỗi.")
+    # Bảng delta của đích: h của hàng xóm = h hiện tại + delta của (các) ô bị di chuyển
+    heuristic = get_heuristic(goal, size)
+    current_heuristic = heuristic(current_state)
     if current_heuristic == 0:
         return [start_state]
 
@@ -89,24 +63,20 @@ def solve(start_state: State, goal_state: State, initial_temperature=100.0, cool
     while temperature > min_temperature and iterations < max_iterations:
         iterations += 1
 
-        if current_state == goal_state:
+        if current_state == goal:
             # print(f"SA (Double): Found goal after {iterations} iterations.")
             # Cần xây dựng lại đường đi dẫn đến đích nếu chỉ lưu best_state
             # Nếu path lưu đường đi hiện tại thì trả về path là hợp lý
-            return path
+            return [unpack(state, size) for state in path]
 
-        # Lấy hàng xóm (bao gồm di chuyển kép)
-        neighbors = get_neighbors_with_double_moves(current_state)
+        # Lấy hàng xóm (bao gồm di chuyển kép) từ bảng macro tính sẵn
+        neighbors = heuristic.macro_successors(current_state, current_heuristic)
         if not neighbors:
              # print("SA (Double): No neighbors found, stopping.")
              break # Không có nước đi nào
 
         # Chọn ngẫu nhiên một hàng xóm
-        next_state = random.choice(neighbors)
-        next_heuristic = manhattan_distance(next_state, goal_state)
-
-        if next_heuristic == float('inf'): # Bỏ qua nếu hàng xóm không hợp lệ
-            continue
+        next_state, _, next_heuristic = random.choice(neighbors)
 
         # Tính toán sự thay đổi năng lượng (heuristic)
         delta_e = next_heuristic - current_heuristic
@@ -129,14 +99,14 @@ def solve(start_state: State, goal_state: State, initial_temperature=100.0, cool
 
     # Kết thúc vòng lặp (nhiệt độ quá thấp hoặc đạt max_iterations)
     # print(f"SA (Double): Finished after {iterations} iterations. Temp: {temperature:.4f}")
-    if best_state == goal_state:
+    if best_state == goal:
          # Nếu trạng thái tốt nhất là đích, cần xây dựng lại đường đi tới nó
          # Việc lưu `path` theo `current_state` có thể không dẫn đến `best_state`
          # -> SA thường không dùng để tìm đường đi, mà để tìm trạng thái tốt.
          # Để trả về path, cần lưu parent hoặc cấu trúc khác.
          # Cách đơn giản nhất là trả về None nếu current_state cuối cùng không phải goal.
-         if current_state == goal_state:
-              return path
+         if current_state == goal:
+              return [unpack(state, size) for state in path]
          else:
               # print("SA (Double): Reached goal state earlier, but path reconstruction not implemented for best_state.")
               return None # Hoặc cố gắng reconstruct nếu có parent
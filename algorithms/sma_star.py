@@ -0,0 +1,199 @@
+from heapq import heapify, heappush, heappop
+from typing import Callable, Dict, List, Optional, Tuple
+
+# SMA* (Simplified Memory-bounded A*), dùng cho a_star / a_star_ANDOR khi có giới hạn bộ nhớ
+# (max_nodes hoặc max_mb). Cây tìm kiếm trong bộ nhớ không quá max_nodes nút:
+# - Nút tốt nhất (f nhỏ nhất, cùng f ưu tiên nút sâu) được mở rộng đầy đủ; f của con lấy
+#   max(f cha, g + h) (pathmax) nên f không giảm dọc theo đường đi.
+# - Khi đầy bộ nhớ, lá tệ nhất (f lớn nhất, cùng f ưu tiên nút nông) bị xóa; f của nó được
+#   ghi lại ở cha (forgotten = min f các con đã quên) và cha quay lại hàng đợi với khóa đó để sinh lại
+#   các con đã quên khi chúng trở thành tốt nhất.
+# - f của nút đã mở rộng được cập nhật ngược lên tổ tiên: min(f các con trong bộ nhớ, forgotten).
+# - Một nút mà đường đi từ gốc đã dùng hết bộ nhớ không thể có con: f = vô cùng.
+# Khóa trong hàng đợi luôn là cận dưới của phần chưa duyệt tương ứng, nên khi lấy ra đích thì đường đi
+# là tối ưu, miễn là đường đi tối ưu vừa trong bộ nhớ (số trạng thái trên đường đi < max_nodes).
+# Trùng lặp: con bị bỏ nếu trạng thái của nó đang nằm trong bộ nhớ với g nhỏ hơn hoặc bằng (bản đó
+# đại diện cho mọi đường đi qua trạng thái; nếu bị xóa, f của nó vẫn được ghi lại ở cha của nó).
+# Bản cũ có g lớn hơn bị thay nếu nó là lá; nếu đã có cây con thì được giữ lại (chỉ tốn bộ nhớ).
+# Hai heap (OPEN và lá) xóa lười: mục lỗi thời chỉ bị bỏ khi lấy ra, và mỗi mục giữ nút đã xóa (cùng chuỗi
+# cha của nó) trong bộ nhớ. Khi tổng số mục vượt HEAP_FACTOR * max_nodes, cả hai heap được lọc lại chỉ còn
+# mục hợp lệ, mỗi nút còn sống nhiều nhất một mục (giữ nguyên số thứ tự nên thứ tự duyệt không đổi),
+# nên bộ nhớ thật sự vẫn là O(max_nodes).
+
+# expand(code, h) -> các (con, chi phí hành động, h_con)
+Expand = Callable[[int, int], List[Tuple[int, int, int]]]
+
+INFINITY = float('inf')
+NODE_BYTES = 400  # Ước lượng bộ nhớ cho một nút (đối tượng, danh sách con, các mục trong hai heap)
+HEAP_FACTOR = 4  # Dựng lại hai heap khi tổng số mục vượt HEAP_FACTOR * max_nodes (+ HEAP_SLACK)
+HEAP_SLACK = 64
+
+
+class _Node:
+    __slots__ = ('code', 'g', 'h', 'f', 'depth', 'parent', 'children', 'forgotten', 'expanded', 'alive')
+
+    def __init__(self, code: int, g: int, h: int, f: float, parent: Optional['_Node']):
+        self.code = code
+        self.g = g
+        self.h = h
+        self.f = f
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.parent = parent
+        self.children: List[_Node] = []
+        self.forgotten = INFINITY  # f nhỏ nhất của các con đã bị xóa khỏi bộ nhớ
+        self.expanded = False
+        self.alive = True
+
+    def open_key(self) -> float:
+        """Khóa trong hàng đợi: f nếu chưa mở rộng, forgotten nếu đã mở rộng (cần sinh lại con đã quên)."""
+        return self.forgotten if self.expanded else self.f
+
+
+def node_budget(max_nodes: Optional[int] = None, max_mb: Optional[float] = None) -> Optional[int]:
+    """Số nút tối đa từ max_nodes và/hoặc max_mb (lấy giá trị nhỏ hơn); None nếu không giới hạn."""
+    budgets = []
+    if max_nodes is not None:
+        budgets.append(int(max_nodes))
+    if max_mb is not None:
+        budgets.append(int(max_mb * (1 << 20)) // NODE_BYTES)
+    if not budgets:
+        return None
+    return max(2, min(budgets))
+
+
+def sma_star_search(start: int, goal: int, start_h: int, expand: Expand, max_nodes: int) -> Optional[List[int]]:
+    """
+    SMA* từ start đến goal với tối đa max_nodes nút trong bộ nhớ.
+    Trả về đường đi tối ưu (list mã trạng thái) nếu nó vừa trong bộ nhớ, None nếu không tìm được.
+    Phải kiểm tra goal đến được từ start trước khi gọi (tìm kiếm trên cây không tự dừng nếu không có lời giải).
+    """
+    root = _Node(start, 0, start_h, start_h, None)
+    sequence = 0  # Phá hòa trong heap, không so sánh _Node
+    open_heap: List[Tuple[float, int, int, _Node]] = [(root.f, 0, sequence, root)]
+    leaves: List[Tuple[float, int, int, _Node]] = [(-root.f, 0, sequence, root)]
+    count = 1
+    in_memory: Dict[int, _Node] = {start: root}  # Bản có g nhỏ nhất của mỗi trạng thái trong bộ nhớ
+
+    def worst_leaf(keep: _Node) -> Optional[_Node]:
+        """Lá có f lớn nhất (cùng f: nông nhất), khác keep và khác gốc; None nếu không có."""
+        skipped = None
+        found = None
+        while leaves:
+            negative_f, _, _, node = leaves[0]
+            if not node.alive or node.children or node.f != -negative_f or node.parent is None:
+                heappop(leaves)  # Mục lỗi thời, không còn là lá, hoặc là gốc
+                continue
+            if node is keep:
+                skipped = heappop(leaves)
+                continue
+            found = node
+            break
+        if skipped is not None:
+            heappush(leaves, skipped)
+        return found
+
+    def prune(node: _Node, remember: bool = True) -> None:
+        """Xóa lá node khỏi bộ nhớ; remember=True: ghi f của nó vào forgotten của cha."""
+        nonlocal count, sequence
+        parent = node.parent
+        parent.children.remove(node)
+        node.alive = False
+        count -= 1
+        if in_memory.get(node.code) is node:
+            del in_memory[node.code]
+        if remember and node.f < parent.forgotten:
+            parent.forgotten = node.f
+            sequence += 1
+            heappush(open_heap, (parent.forgotten, -parent.depth, sequence, parent))
+        if not parent.children:
+            sequence += 1
+            heappush(leaves, (-parent.f, parent.depth, sequence, parent))
+
+    def compact() -> None:
+        """Bỏ mọi mục lỗi thời khỏi open_heap và leaves (mỗi nút còn sống giữ mục sẽ được lấy ra trước nhất)."""
+        valid_open: Dict[int, Tuple[float, int, int, _Node]] = {}
+        for entry in open_heap:
+            node = entry[3]
+            if node.alive and entry[0] == node.open_key():
+                kept = valid_open.get(id(node))
+                if kept is None or entry < kept:
+                    valid_open[id(node)] = entry
+        valid_leaves: Dict[int, Tuple[float, int, int, _Node]] = {}
+        for entry in leaves:
+            node = entry[3]
+            if node.alive and not node.children and node.f == -entry[0] and node.parent is not None:
+                kept = valid_leaves.get(id(node))
+                if kept is None or entry < kept:
+                    valid_leaves[id(node)] = entry
+        open_heap[:] = valid_open.values()
+        leaves[:] = valid_leaves.values()
+        heapify(open_heap)
+        heapify(leaves)
+
+    heap_limit = HEAP_FACTOR * max_nodes + HEAP_SLACK
+    while open_heap:
+        if len(open_heap) + len(leaves) > heap_limit:
+            compact()
+        key, _, _, best = heappop(open_heap)
+        if not best.alive or key != best.open_key():
+            continue  # Mục lỗi thời
+        if key == INFINITY:
+            return None
+        if best.code == goal:
+            path = []
+            node: Optional[_Node] = best
+            while node is not None:
+                path.append(node.code)
+                node = node.parent
+            path.reverse()
+            return path
+
+        # Sinh các con (lần đầu: tất cả; lần sau: chỉ các con đã quên, các con còn trong bộ nhớ
+        # có g không lớn hơn nên bị bỏ như trùng lặp)
+        best.expanded = True
+        best.forgotten = INFINITY
+        generated = []
+        for child_code, cost, child_h in expand(best.code, best.h):
+            child_g = best.g + cost
+            existing = in_memory.get(child_code)
+            if existing is not None and existing.g <= child_g:
+                continue
+            if best.depth + 2 > max_nodes:
+                continue  # Đường đi đến con không vừa bộ nhớ: f = vô cùng
+            generated.append((max(best.f, child_g + child_h), child_code, child_g, child_h))
+        generated.sort()  # Con tốt trước: khi đầy bộ nhớ, các con tệ bị quên trước
+        for child_f, child_code, child_g, child_h in generated:
+            if count >= max_nodes:
+                # Đầy bộ nhớ: xóa lá tệ nhất; nếu chỉ còn đường đi tới best thì quên con
+                victim = worst_leaf(best)
+                if victim is None:
+                    if child_f < best.forgotten:
+                        best.forgotten = child_f
+                    continue
+                prune(victim)
+            existing = in_memory.get(child_code)
+            if existing is not None and not existing.children:
+                prune(existing, remember=False)  # Bản cũ kém hơn (g lớn hơn) và là lá: thay thế
+            child = _Node(child_code, child_g, child_h, child_f, best)
+            in_memory[child_code] = child
+            best.children.append(child)
+            count += 1
+            sequence += 1
+            heappush(open_heap, (child_f, -child.depth, sequence, child))
+            heappush(leaves, (-child_f, child.depth, sequence, child))
+        if best.forgotten < INFINITY:
+            sequence += 1
+            heappush(open_heap, (best.forgotten, -best.depth, sequence, best))
+
+        # Cập nhật f ngược lên tổ tiên
+        node = best
+        while node is not None:
+            backed_up = min(min((child.f for child in node.children), default=INFINITY), node.forgotten)
+            if backed_up == node.f:
+                break
+            node.f = backed_up
+            if not node.children:
+                sequence += 1
+                heappush(leaves, (-node.f, node.depth, sequence, node))
+            node = node.parent
+    return None
@@ -0,0 +1,69 @@
+from typing import List, Sequence, Tuple
+
+# Định nghĩa kiểu dữ liệu cho trạng thái (một tuple các số nguyên)
+State = Tuple[int, ...]
+
+# Mỗi ô chiếm 4 bit, lưu (giá trị ô - 1) nên ô trống của bảng 4x4 (16) vẫn vừa 4 bit.
+# Vị trí ô trống được lưu sẵn ngay phía trên phần dữ liệu các ô:
+#   code = sum((tile - 1) << (4 * i)) | (blank_index << (4 * số_ô))
+# Với bảng 3x3, một trạng thái chỉ chiếm 40 bit, so sánh và băm trực tiếp trên số nguyên.
+CELL_BITS = 4
+CELL_MASK = (1 << CELL_BITS) - 1
+
+
+def board_size(state: Sequence[int]) -> int:
+    """Trả về kích thước cạnh bảng (3 cho 8-Puzzle), hoặc raise ValueError nếu không phải bảng vuông."""
+    size = int(len(state) ** 0.5)
+    if size * size != len(state):
+        raise ValueError(f"Trạng thái không phải bảng vuông: {state}")
+    return size
+
+
+def blank_shift(size: int = 3) -> int:
+    """Vị trí bit bắt đầu của trường lưu chỉ số ô trống."""
+    return CELL_BITS * size * size
+
+
+def pack(state: Sequence[int]) -> int:
+    """
+    Mã hóa một trạng thái (tuple/list) thành một số nguyên.
+    Ô trống là ô có giá trị bằng số ô (ví dụ: 9 cho 3x3).
+    """
+    cells = len(state)
+    code = 0
+    blank_index = -1
+    for i, tile in enumerate(state):
+        if tile == cells:
+            blank_index = i
+        code |= (tile - 1) << (CELL_BITS * i)
+    if blank_index < 0:
+        raise ValueError(f"Không tìm thấy ô trống ({cells}) trong {state}")
+    return code | (blank_index << (CELL_BITS * cells))
+
+
+def unpack(code: int, size: int = 3) -> State:
+    """Giải mã số nguyên về tuple trạng thái (chỉ dùng ở biên API, ví dụ khi dựng lại đường đi)."""
+    return tuple(((code >> (CELL_BITS * i)) & CELL_MASK) + 1 for i in range(size * size))
+
+
+def slide(code: int, blank_index: int, target_index: int, size: int = 3) -> int:
+    """
+    Đổi chỗ ô trống (tại blank_index) với ô tại target_index.
+    Chỉ dùng phép XOR trên số nguyên, không tạo list/tuple trung gian.
+    """
+    cells = size * size
+    moved = (code >> (CELL_BITS * target_index)) & CELL_MASK
+    diff = moved ^ (cells - 1)  # (cells - 1) là giá trị lưu của ô trống
+    return (code
+            ^ (diff << (CELL_BITS * target_index))
+            ^ (diff << (CELL_BITS * blank_index))
+            ^ ((blank_index ^ target_index) << (CELL_BITS * cells)))
+
+
+def goal_positions(goal_code: int, size: int = 3) -> List[int]:
+    """goal_positions[v] = vị trí đích của ô có giá trị lưu v (tức ô v + 1)."""
+    cells = size * size
+    positions = [0] * cells
+    for i in range(cells):
+        positions[(goal_code >> (CELL_BITS * i)) & CELL_MASK] = i
+    return positions
@@ -1,56 +1,12 @@
 import random
 import math # Không cần math cho stochastic hill climbing đơn giản
-from typing import List, Tuple, Optional, Set, Dict
+from typing import List, Tuple, Optional, Dict
+from .state_kernel import pack, unpack, board_size
+from .heuristics import get_heuristic
+from .restart_portfolio import run_portfolio
 
 State = Tuple[int, ...]
 
-def manhattan_distance(state: State, goal_state: State) -> int:
-    # ... (Giữ nguyên hàm manhattan_distance) ...
-    total = 0
-    try:
-        size = int(len(state)**0.5)
-        if size * size != len(state) or len(goal_state) != len(state): return float('inf')
-        blank_tile = size * size
-        goal_map = {tile: i for i, tile in enumerate(goal_state)}
-    except (ValueError, TypeError): return float('inf')
-
-    for i in range(len(state)):
-        tile = state[i]
-        if tile != blank_tile:
-            curr_row, curr_col = divmod(i, size)
-            goal_pos = goal_map.get(tile)
-            if goal_pos is None: return float('inf')
-            goal_row, goal_col = divmod(goal_pos, size)
-            total += abs(curr_row - goal_row) + abs(curr_col - goal_col)
-    return total
-
-# --- Dán hàm get_neighbors_with_double_moves vào đây ---
-def get_neighbors_with_double_moves(state: State) -> List[State]:
-    neighbors: Set[State] = set(); s_list = list(state)
-    try:
-        size = int(len(state)**0.5);
-        if size * size != len(state): return []
-        blank_tile = size * size; blank_index = s_list.index(blank_tile)
-    except (ValueError, TypeError): return []
-    row, col = divmod(blank_index, size); moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    single_move_intermediates: List[Tuple[State, int]] = []
-    for dr, dc in moves:
-        new_row, new_col = row + dr, col + dc
-        if 0 <= new_row < size and 0 <= new_col < size:
-            new_index = new_row * size + new_col; new_s = s_list[:]; new_s[blank_index], new_s[new_index] = new_s[new_index], new_s[blank_index]
-            neighbor_state = tuple(new_s); neighbors.add(neighbor_state); single_move_intermediates.append((neighbor_state, new_index))
-    for intermediate_state, intermediate_blank_index in single_move_intermediates:
-        s_intermediate = list(intermediate_state); row1, col1 = divmod(intermediate_blank_index, size)
-        for dr, dc in moves:
-            new_row2, new_col2 = row1 + dr, col1 + dc
-            if 0 <= new_row2 < size and 0 <= new_col2 < size:
-                new_index2 = new_row2 * size + new_col2
-                if new_index2 == blank_index: continue
-                new_s2 = s_intermediate[:]; new_s2[intermediate_blank_index], new_s2[new_index2] = new_s2[new_index2], new_s2[intermediate_blank_index]
-                neighbor2_state = tuple(new_s2); neighbors.add(neighbor2_state)
-    return list(neighbors)
-# --- Kết thúc hàm get_neighbors_with_double_moves ---
-
 def is_solvable(state, goal_state=(1, 2, 3, 4, 5, 6, 7, 8, 9)):
      # ... (Copy hàm is_solvable từ hill_climbing_ANDOR.py) ...
     try:
@@ -67,7 +23,77 @@ def is_solvable(state, goal_state=(1, 2, 3, 4, 5, 6, 7, 8, 9)):
         return (inversions % 2) == (goal_inversions % 2)
     except: return False
 
-def solve(start_state: State, goal_state: State, max_iterations=10000, max_restarts=20) -> Optional[List[State]]:
+RESTART_FROM_BEST = 0.6  # Xác suất bắt đầu lần leo từ trạng thái tốt nhất đã biết
+
+def climb(heuristic, goal: int, current_state: int, current_score: int, max_iterations: int,
+          rng=random) -> Tuple[List[int], int, int, int]:
+    """
+    Một lần leo (di chuyển kép) từ current_state, dùng chung cho solve tuần tự và restart_portfolio.py.
+
+    Args:
+        heuristic: Heuristic đã biên dịch cho đích (heuristics.get_heuristic).
+        goal (int): Mã trạng thái đích.
+        current_state (int): Mã trạng thái bắt đầu lần leo.
+        current_score (int): Heuristic của current_state.
+        max_iterations (int): Số bước tối đa.
+        rng: Bộ sinh số ngẫu nhiên (module random hoặc random.Random riêng của tiến trình).
+
+    Returns:
+        tuple: (đường đi dạng list mã trạng thái, điểm cuối, trạng thái tốt nhất, điểm tốt nhất).
+    """
+    path = [current_state]
+    best_state, best_score = current_state, current_score
+    local_visited = {current_state} # Tránh vòng lặp
+
+    iterations = 0
+    stuck_counter = 0
+    while current_state != goal and iterations < max_iterations:
+        iterations += 1
+        # Lấy hàng xóm (bao gồm di chuyển kép) từ bảng macro tính sẵn
+        neighbors = heuristic.macro_successors(current_state, current_score)
+        uphill_neighbors = [] # Danh sách các hàng xóm tốt hơn (heuristic thấp hơn)
+
+        # Tìm tất cả các hàng xóm tốt hơn chưa thăm
+        for neighbor, _, neighbor_score in neighbors:
+             if neighbor not in local_visited:
+                  if neighbor_score < current_score:
+                       uphill_neighbors.append((neighbor, neighbor_score))
+
+        next_state = None
+        if uphill_neighbors:
+             # Chọn ngẫu nhiên một trong số các hàng xóm tốt hơn
+             next_state, next_score = rng.choice(uphill_neighbors)
+             stuck_counter = 0
+        else:
+             # Bị kẹt, không có hàng xóm nào tốt hơn
+             stuck_counter += 1
+             if stuck_counter > 10 : # Thoát nếu bị kẹt quá lâu
+                  break
+             # Tùy chọn: thực hiện bước đi ngẫu nhiên để thoát kẹt
+             unvisited = [(n, s) for n, _, s in neighbors if n not in local_visited]
+             if unvisited:
+                 next_state, next_score = rng.choice(unvisited)
+             else:
+                 break # Không còn nước đi
+
+        if next_state is None:
+             break
+
+        # Di chuyển đến trạng thái đã chọn
+        current_state = next_state
+        current_score = next_score
+        path.append(current_state)
+        local_visited.add(current_state)
+
+        # Cập nhật trạng thái/điểm tốt nhất của lần leo
+        if current_score < best_score:
+            best_state = current_state
+            best_score = current_score
+
+    return path, current_score, best_state, best_score
+
+def solve(start_state: State, goal_state: State, max_iterations=10000, max_restarts=20,
+          workers: Optional[int] = 1, seed: Optional[int] = None) -> Optional[List[State]]:
     """
     Giải 8-Puzzle bằng Stochastic Hill Climbing với di chuyển kép.
     Chọn ngẫu nhiên trong số các hàng xóm tốt hơn.
@@ -79,83 +105,57 @@ def solve(start_state: State, goal_state: State, max_iterations=10000, max_resta
         print("Stochastic Hill (Double): Trạng thái không giải được.")
         return None
 
-    best_state_overall = start_state
-    best_score_overall = manhattan_distance(start_state, goal_state)
+    # Mã hóa trạng thái (state_kernel) và lấy heuristic Manhattan đã biên dịch cho đích:
+    # h của hàng xóm = h hiện tại + delta của (các) ô bị di chuyển, không quét lại cả bảng
+    size = board_size(start_state)
+    start = pack(start_state)
+    goal = pack(goal_state)
+    if workers != 1:
+        # Các lần khởi động lại chạy song song trên nhiều tiến trình (restart_portfolio.py);
+        # workers=None dùng mọi lõi CPU, seed cố định bộ sinh số ngẫu nhiên của từng tiến trình
+        found, _ = run_portfolio("stochastic_hill_ANDOR", start, goal, size, max_iterations, max_restarts,
+                                 workers, seed)
+        return None if found is None else [unpack(state, size) for state in found]
+    heuristic = get_heuristic(goal, size)
+    start_score = heuristic(start)
+    rng = random.Random(seed)  # seed cũng cố định bản tuần tự
+
+    best_state_overall = start
+    best_score_overall = start_score
     overall_path = []
 
     for restart in range(max_restarts):
         if restart == 0:
-            current_state = start_state
+            current_state = start
         else:
              # Khởi động lại ngẫu nhiên hoặc từ điểm tốt nhất
-             if random.random() < 0.6 and best_score_overall < manhattan_distance(start_state, goal_state):
+             if rng.random() < RESTART_FROM_BEST and best_score_overall < start_score:
                  current_state = best_state_overall
              else:
-                 current_state = start_state # Luôn có thể quay lại trạng thái ban đầu
-
-        current_score = manhattan_distance(current_state, goal_state)
-        path = [current_state]
-        local_visited = {current_state} # Tránh vòng lặp
-
-        iterations = 0
-        stuck_counter = 0
-        while current_state != goal_state and iterations < max_iterations:
-            iterations += 1
-            # Lấy hàng xóm (bao gồm di chuyển kép)
-            neighbors = get_neighbors_with_double_moves(current_state)
-            uphill_neighbors = [] # Danh sách các hàng xóm tốt hơn (heuristic thấp hơn)
-
-            # Tìm tất cả các hàng xóm tốt hơn chưa thăm
-            for neighbor in neighbors:
-                 if neighbor not in local_visited:
-                      neighbor_score = manhattan_distance(neighbor, goal_state)
-                      if neighbor_score < current_score:
-                           uphill_neighbors.append(neighbor)
-
-            next_state = None
-            if uphill_neighbors:
-                 # Chọn ngẫu nhiên một trong số các hàng xóm tốt hơn
-                 next_state = random.choice(uphill_neighbors)
-                 stuck_counter = 0
-            else:
-                 # Bị kẹt, không có hàng xóm nào tốt hơn
-                 stuck_counter += 1
-                 if stuck_counter > 10 : # Thoát nếu bị kẹt quá lâu
-                      break
-                 # Tùy chọn: thực hiện bước đi ngẫu nhiên để thoát kẹt
-                 unvisited = [n for n in neighbors if n not in local_visited]
-                 if unvisited:
-                     next_state = random.choice(unvisited)
-                 else:
-                     break # Không còn nước đi
-
-            if next_state is None:
-                 break
-
-            # Di chuyển đến trạng thái đã chọn
-            current_state = next_state
-            current_score = manhattan_distance(current_state, goal_state)
-            path.append(current_state)
-            local_visited.add(current_state)
-
-            # Cập nhật trạng thái/điểm tốt nhất toàn cục
-            if current_score < best_score_overall:
-                best_state_overall = current_state
-                best_score_overall = current_score
-
-            # Kiểm tra mục tiêu
-            if current_state == goal_state:
-                # print(f"Stochastic Hill (Double): Found goal in restart {restart+1}.")
-                return path
+                 current_state = start # Luôn có thể quay lại trạng thái ban đầu
+
+        # Điểm của trạng thái bắt đầu lần chạy đã biết (start_score hoặc best_score_overall)
+        current_score = best_score_overall if current_state == best_state_overall else start_score
+        path, current_score, run_best_state, run_best_score = climb(heuristic, goal, current_state,
+                                                                    current_score, max_iterations, rng)
+        current_state = path[-1]
+        # Cập nhật trạng thái/điểm tốt nhất toàn cục
+        if run_best_score < best_score_overall:
+            best_state_overall = run_best_state
+            best_score_overall = run_best_score
+
+        # Kiểm tra mục tiêu
+        if current_state == goal:
+            return [unpack(state, size) for state in path] # Trả về đường đi ngay khi tìm thấy đích
 
         # Cập nhật đường đi tổng thể nếu lần chạy này tốt hơn
-        if current_state != goal_state and path:
-             if not overall_path or current_score < manhattan_distance(overall_path[-1], goal_state):
+        if current_state != goal and path:
+             if not overall_path or current_score < heuristic(overall_path[-1]):
                   overall_path = path
 
     # Sau tất cả các lần khởi động lại
-    if best_score_overall == 0 and overall_path and overall_path[-1] == goal_state:
-        return overall_path
+    if best_score_overall == 0 and overall_path and overall_path[-1] == goal:
+        return [unpack(state, size) for state in overall_path]
     elif best_score_overall == 0 and not overall_path:
         return [start_state] # start == goal
     else:
@@ -0,0 +1,72 @@
+from array import array
+
+# Bảng chuyển vị (transposition table) dung lượng cố định cho IDA* (ida_engine.py).
+# Mỗi mục lưu cho một trạng thái (khóa = phần dữ liệu ô của mã trạng thái, ô trống suy ra được):
+# - g: độ sâu nhỏ nhất đã gặp trạng thái (dùng để cắt các lần gặp lại sâu hơn)
+# - bound: cận dưới số hành động còn lại đã học được từ các cây con thất bại (>= h ban đầu)
+# - stamp: số thứ tự lần lặp IDA* khi cây con ở độ sâu g được duyệt xong
+# Bộ nhớ là các mảng phẳng (14 byte mỗi ô), không tạo đối tượng cho từng mục.
+# Thay thế hai tầng: mỗi xô có 2 ô; ô đầu ưu tiên độ sâu (giữ mục có g nhỏ hơn, tức cây con lớn
+# hơn, tốn nhiều công duyệt lại hơn), ô sau luôn bị thay. Mục bị đẩy khỏi ô đầu chuyển xuống ô sau.
+
+ENTRY_BYTES = 8 + 1 + 1 + 4  # khóa (Q) + g (B) + bound (B) + stamp (I)
+EMPTY = (1 << 64) - 1
+LIMIT = 0xFF
+
+
+class TranspositionTable:
+    """Bảng chuyển vị dung lượng cố định, giới hạn theo MB."""
+
+    def __init__(self, max_mb: float = 16.0, cells: int = 9):
+        slots = max(2, int(max_mb * (1 << 20)) // ENTRY_BYTES)
+        self.buckets = max(1, slots // 2) | 1  # Số xô lẻ để phép chia lấy dư trộn đều các bit của khóa
+        slots = self.buckets * 2
+        self.key_mask = (1 << (4 * cells)) - 1
+        self.keys = array('Q', [EMPTY]) * slots
+        self.g = bytearray(slots)
+        self.bound = bytearray(slots)
+        self.stamp = array('I', [0]) * slots
+
+    def probe(self, code: int) -> int:
+        """Chỉ số ô chứa code, hoặc -1 nếu không có."""
+        key = code & self.key_mask
+        slot = (key % self.buckets) << 1
+        keys = self.keys
+        if keys[slot] == key:
+            return slot
+        if keys[slot + 1] == key:
+            return slot + 1
+        return -1
+
+    def store(self, code: int, g: int, bound: int, stamp: int) -> None:
+        """
+        Ghi kết quả duyệt xong cây con của code ở độ sâu g.
+        g nhỏ hơn hoặc bằng g đã lưu thì cập nhật g và stamp; bound luôn lấy giá trị lớn hơn.
+        """
+        if g > LIMIT or bound > LIMIT:
+            return
+        key = code & self.key_mask
+        slot = (key % self.buckets) << 1
+        keys = self.keys
+        for index in (slot, slot + 1):
+            if keys[index] == key:
+                if g <= self.g[index]:
+                    self.g[index] = g
+                    self.stamp[index] = stamp
+                if bound > self.bound[index]:
+                    self.bound[index] = bound
+                return
+
+        if keys[slot] == EMPTY or g <= self.g[slot]:
+            # Ô ưu tiên độ sâu: mục cũ (nếu có) chuyển xuống ô luôn-thay
+            keys[slot + 1] = keys[slot]
+            self.g[slot + 1] = self.g[slot]
+            self.bound[slot + 1] = self.bound[slot]
+            self.stamp[slot + 1] = self.stamp[slot]
+            index = slot
+        else:
+            index = slot + 1
+        keys[index] = key
+        self.g[index] = g
+        self.bound[index] = bound
+        self.stamp[index] = stamp
@@ -1,46 +1,33 @@
-from heapq import heappush, heappop
+from .state_kernel import pack, unpack, board_size
+from .move_tables import successors
+from .ranking import closed_table
+from .bucket_queue import make_queue
+from .frontier_search import frontier_path
 
-def get_neighbors(state):
-    neighbors = []
-    s = list(state)
-    blank_index = s.index(9)
-    row, col = divmod(blank_index, 3)
-    moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for dr, dc in moves:
-        new_row = row + dr
-        new_col = col + dc
-        if 0 <= new_row < 3 and 0 <= new_col < 3:
-            new_index = new_row * 3 + new_col
-            new_s = s[:]
-            new_s[blank_index], new_s[new_index] = new_s[new_index], new_s[blank_index]
-            neighbors.append(tuple(new_s))
-    return neighbors
-
-def reconstruct_path(state, parent):
-    path = []
-    while state is not None:
-        path.append(state)
-        state = parent[state]
-    path.reverse()
-    return path
-
-def solve(start_state, goal_state):
-    pq = [(0, start_state)]
-    costs = {start_state: 0}
-    parent = {start_state: None}
-    visited = set()
+def solve(start_state, goal_state, queue="bucket", frontier=False):
+    size = board_size(start_state)
+    start = pack(start_state)
+    goal = pack(goal_state)
+    if frontier:
+        # Mọi nước đi chi phí 1 nên UCS duyệt theo lớp như BFS: dùng cùng tìm kiếm biên (frontier_search.py)
+        path = frontier_path(start, goal, size)
+        return None if path is None else [unpack(state, size) for state in path]
+    # visited là bitset và parent là mảng int32 theo hạng trạng thái (xem ranking.py).
+    # Mọi nước đi có chi phí 1 và trạng thái được lấy ra theo chi phí không giảm, nên chi phí
+    # lần đầu một trạng thái được sinh ra đã là nhỏ nhất: đánh dấu ngay khi sinh là đủ.
+    # Chi phí là số nguyên nhỏ nên hàng đợi là mảng xô theo chi phí; queue="heap" dùng heapq để so sánh.
+    table = closed_table(start, size)
+    pq = make_queue(queue)
+    pq.push(0, 0, (start, table.add(start), -1))
     
     while pq:
-        current_cost, current = heappop(pq)
-        if current == goal_state:
-            return reconstruct_path(current, parent)
-        if current in visited:
-            continue
-        visited.add(current)
-        for next_state in get_neighbors(current):
-            new_cost = current_cost + 1
-            if next_state not in costs or new_cost < costs[next_state]:
-                costs[next_state] = new_cost
-                parent[next_state] = current
-                heappush(pq, (new_cost, next_state))
-    return None
\ No newline at end of file
+        current_cost, _, (current, key, previous) = pq.pop()
+        if current == goal:
+            return [unpack(state, size) for state in table.path(key)]
+        for next_state in successors(current, size):
+            if next_state == previous:
+                continue  # Quay lại trạng thái cha: chắc chắn đã được đánh dấu, bỏ qua để khỏi tính hạng
+            next_key = table.add(next_state, key, current)
+            if next_key >= 0:
+                pq.push(current_cost + 1, current_cost + 1, (next_state, next_key, current))
+    return None
@@ -1,53 +1,21 @@
-from heapq import heappush, heappop
-from typing import List, Tuple, Optional, Set, Dict
+from typing import List, Tuple, Optional, Dict
+from .state_kernel import pack, unpack, board_size
+from .macro_tables import macro_successors
+from .bucket_queue import make_queue
 
 State = Tuple[int, ...]
 
-# --- Dán hàm get_neighbors_with_costs vào đây ---
-def get_neighbors_with_costs(state: State) -> List[Tuple[State, int]]:
-    neighbors_with_cost: List[Tuple[State, int]] = []
-    added_states: Set[State] = set()
-    s_list = list(state)
-    try:
-        size = int(len(state)**0.5)
-        if size * size != len(state): return []
-        blank_tile = size * size; blank_index = s_list.index(blank_tile)
-    except (ValueError, TypeError): return []
-    row, col = divmod(blank_index, size); moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    single_move_intermediates: List[Tuple[State, int]] = []
-    for dr, dc in moves: # Single moves (cost 1)
-        new_row, new_col = row + dr, col + dc
-        if 0 <= new_row < size and 0 <= new_col < size:
-            new_index = new_row * size + new_col; new_s = s_list[:]; new_s[blank_index], new_s[new_index] = new_s[new_index], new_s[blank_index]
-            neighbor_state = tuple(new_s)
-            if neighbor_state not in added_states:
-                 neighbors_with_cost.append((neighbor_state, 1)); added_states.add(neighbor_state)
-            single_move_intermediates.append((neighbor_state, new_index))
-    for intermediate_state, intermediate_blank_index in single_move_intermediates: # Double moves (cost 2)
-        s_intermediate = list(intermediate_state); row1, col1 = divmod(intermediate_blank_index, size)
-        for dr, dc in moves:
-            new_row2, new_col2 = row1 + dr, col1 + dc
-            if 0 <= new_row2 < size and 0 <= new_col2 < size:
-                new_index2 = new_row2 * size + new_col2
-                if new_index2 == blank_index: continue
-                new_s2 = s_intermediate[:]; new_s2[intermediate_blank_index], new_s2[new_index2] = new_s2[new_index2], new_s2[intermediate_blank_index]
-                neighbor2_state = tuple(new_s2)
-                if neighbor2_state not in added_states: # Chỉ thêm nếu chưa có trong KQ
-                    neighbors_with_cost.append((neighbor2_state, 2)); added_states.add(neighbor2_state)
-    return neighbors_with_cost
-# --- Kết thúc hàm get_neighbors_with_costs ---
-
-def reconstruct_path(state: State, parent: Dict[State, Optional[State]]) -> List[State]:
-    # ... (Giữ nguyên hàm reconstruct_path) ...
+def reconstruct_path(state: int, parent: Dict[int, Optional[int]], size: int = 3) -> List[State]:
+    # Trạng thái được lưu dạng mã số nguyên (state_kernel), chỉ giải mã về tuple khi dựng đường đi
     path: List[State] = []
-    current: Optional[State] = state
+    current: Optional[int] = state
     while current is not None:
-        path.append(current)
+        path.append(unpack(current, size))
         current = parent.get(current)
     path.reverse()
     return path
 
-def solve(start_state: State, goal_state: State) -> Optional[List[State]]:
+def solve(start_state: State, goal_state: State, queue: str = 'bucket') -> Optional[List[State]]:
     """
     Giải 8-Puzzle bằng Uniform Cost Search (UCS) với di chuyển kép có chi phí.
     Tìm đường đi có tổng chi phí (1 cho đơn, 2 cho kép) thấp nhất.
@@ -55,27 +23,30 @@ def solve(start_state: State, goal_state: State) -> Optional[List[State]]:
     Args:
         start_state (tuple): Trạng thái bắt đầu.
         goal_state (tuple): Trạng thái đích.
+        queue (str): 'bucket' (mảng xô theo chi phí, O(1)) hoặc 'heap' (heapq, để so sánh).
 
     Returns:
         list: Đường đi tối ưu về chi phí (list các tuple trạng thái) nếu tìm thấy, None nếu không.
     """
-    start_state = tuple(start_state)
-    goal_state = tuple(goal_state)
+    try:
+        size = board_size(start_state)
+        start = pack(start_state)
+        goal = pack(goal_state)
+    except (ValueError, TypeError):
+        return None
 
-    # Hàng đợi ưu tiên lưu trữ (current_cost, state)
-    pq: List[Tuple[int, State]] = [(0, start_state)]
+    # Hàng đợi ưu tiên lưu trữ (current_cost, state); chi phí là số nguyên nhỏ nên dùng mảng xô
+    pq = make_queue(queue)
+    pq.push(0, 0, start)
 
     # Dictionary lưu chi phí thấp nhất đã biết để đến mỗi trạng thái
-    costs: Dict[State, int] = {start_state: 0}
+    costs: Dict[int, int] = {start: 0}
     # Dictionary lưu trạng thái cha để dựng lại đường đi
-    parent: Dict[State, Optional[State]] = {start_state: None}
-
-    # Set các trạng thái đã được lấy ra khỏi pq và xử lý hoàn toàn (tối ưu hóa)
-    # closed_set: Set[State] = set() # Không hoàn toàn cần thiết cho UCS chuẩn, nhưng có thể giúp
+    parent: Dict[int, Optional[int]] = {start: None}
 
     while pq:
         # Lấy trạng thái có chi phí thấp nhất từ hàng đợi
-        current_cost, current_state = heappop(pq)
+        current_cost, _, current_state = pq.pop()
 
         # Nếu đã tìm thấy đường đi tốt hơn đến trạng thái này trước đó, bỏ qua
         # (Điều này xảy ra nếu cùng 1 trạng thái được thêm vào pq nhiều lần với chi phí khác nhau)
@@ -83,14 +54,11 @@ def solve(start_state: State, goal_state: State) -> Optional[List[State]]:
             continue
 
         # Nếu đã đến đích, trả về đường đi
-        if current_state == goal_state:
-            return reconstruct_path(goal_state, parent)
-
-        # Đánh dấu đã xử lý (nếu dùng closed_set)
-        # closed_set.add(current_state)
+        if current_state == goal:
+            return reconstruct_path(goal, parent, size)
 
-        # Khám phá các hàng xóm (lấy cả trạng thái và chi phí di chuyển)
-        for next_state, move_cost in get_neighbors_with_costs(current_state):
+        # Khám phá các hàng xóm (lấy cả trạng thái và chi phí di chuyển) từ bảng macro tính sẵn
+        for next_state, move_cost in macro_successors(current_state, size):
             # Tính chi phí mới để đến trạng thái hàng xóm
             new_cost = current_cost + move_cost
 
@@ -100,7 +68,7 @@ def solve(start_state: State, goal_state: State) -> Optional[List[State]]:
                 costs[next_state] = new_cost
                 parent[next_state] = current_state
                 # Thêm vào hàng đợi ưu tiên với chi phí mới
-                heappush(pq, (new_cost, next_state))
+                pq.push(new_cost, new_cost, next_state)
 
     # Không tìm thấy giải pháp
     return None
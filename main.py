@@ -937,5 +937,7 @@ if __name__ == "__main__":
     except Exception as e: print(f"Font error: {e}. Using default."); font = pygame.font.Font(None, 24); title_font = pygame.font.Font(None, 36); puzzle_font = pygame.font.Font(None, 60); button_font = pygame.font.Font(None, 20); info_font = pygame.font.Font(None, 22)
     START_STATE = (1, 8, 2, 9, 4, 3, 7, 6, 5) 
     GOAL_STATE = (1, 2, 3, 4, 5, 6, 7, 8, 9)
+    try: from algorithms import exact_table, state_kernel; exact_table.get_exact_table(state_kernel.pack(GOAL_STATE))
+    except Exception as e: print(f"Warning: Could not load exact distance table: {e}")
     if not is_solvable(START_STATE): print(f"Warning: Default START_STATE {START_STATE} is not solvable!")
     main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from algorithms import batch_annealing
+from algorithms.batch_annealing import anneal_batch
+from algorithms.macro_tables import macro_successors
+from algorithms.move_tables import successors
+from algorithms.state_kernel import pack
+
+GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 9)
+STARTS = [
+    (2, 1, 3, 7, 6, 8, 4, 9, 5),
+    (8, 1, 3, 7, 5, 2, 4, 9, 6),
+    (1, 2, 3, 4, 9, 6, 7, 5, 8),
+]
+CHAINS = 256
+
+
+def is_path(path, start, double):
+    if path[0] != start or path[-1] != GOAL:
+        return False
+    for a, b in zip(path, path[1:]):
+        if double:
+            neighbors = [code for code, _ in macro_successors(pack(a), 3)]
+        else:
+            neighbors = successors(pack(a), 3)
+        if pack(b) not in neighbors:
+            return False
+    return True
+
+
+@pytest.mark.parametrize("double", [False, True])
+def test_paths_reach_goal(double):
+    for seed, start in enumerate(STARTS):
+        path = anneal_batch(start, GOAL, chains=CHAINS, double=double, seed=seed)
+        assert path is not None
+        assert is_path(path, start, double)
+
+
+@pytest.mark.parametrize("double", [False, True])
+def test_same_seed_same_path(double):
+    start = STARTS[0]
+    first = anneal_batch(start, GOAL, chains=CHAINS, double=double, seed=7)
+    assert anneal_batch(start, GOAL, chains=CHAINS, double=double, seed=7) == first
+
+
+class CountingNumpy:
+    """Thay np trong batch_annealing: ghi lại số phần tử lớn nhất của mảng tạo bằng empty / zeros / full."""
+
+    def __init__(self):
+        self.largest = 0
+
+    def __getattr__(self, name):
+        return getattr(np, name)
+
+    def _track(self, array):
+        self.largest = max(self.largest, array.size)
+        return array
+
+    def empty(self, *args, **kwargs):
+        return self._track(np.empty(*args, **kwargs))
+
+    def zeros(self, *args, **kwargs):
+        return self._track(np.zeros(*args, **kwargs))
+
+    def full(self, *args, **kwargs):
+        return self._track(np.full(*args, **kwargs))
+
+
+def test_no_move_log(monkeypatch):
+    # Không cấp phát mảng K x số bước: mọi mảng tạo bằng np.empty / np.zeros / np.full có tối đa K x số ô phần tử
+    counting = CountingNumpy()
+    monkeypatch.setattr(batch_annealing, "np", counting)
+    assert anneal_batch(STARTS[1], GOAL, chains=CHAINS, seed=3) is not None
+    assert 0 < counting.largest <= CHAINS * len(GOAL)
@@ -0,0 +1,29 @@
+from algorithms import a_star, beam_stack, beam_stack_ANDOR
+from algorithms.macro_tables import macro_successors
+from algorithms.move_tables import successors
+from algorithms.state_kernel import pack
+
+GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 9)
+START = (8, 6, 7, 2, 5, 4, 3, 9, 1)
+
+
+def is_path(path, start, double):
+    if path[0] != start or path[-1] != GOAL:
+        return False
+    for a, b in zip(path, path[1:]):
+        neighbors = [code for code, _ in macro_successors(pack(a), 3)] if double else successors(pack(a), 3)
+        if pack(b) not in neighbors:
+            return False
+    return True
+
+
+def test_expired_deadline_still_returns_a_path():
+    # Hết giờ trước lời giải đầu tiên: vẫn chạy tiếp đến lời giải đầu tiên thay vì trả về None
+    assert is_path(beam_stack.solve(START, GOAL, deadline=0.0), START, False)
+    assert is_path(beam_stack_ANDOR.solve(START, GOAL, deadline=0.0), START, True)
+
+
+def test_no_deadline_is_optimal():
+    path = beam_stack.solve(START, GOAL, deadline=None)
+    assert is_path(path, START, False)
+    assert len(path) == len(a_star.solve(START, GOAL))
@@ -0,0 +1,38 @@
+import multiprocessing
+
+from algorithms import a_star, hda_star
+from algorithms.move_tables import successors
+from algorithms.state_kernel import pack
+
+GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 9)
+GOAL_4X4 = tuple(range(1, 17))
+STARTS = [
+    (6, 8, 9, 5, 2, 4, 3, 7, 1),
+    (2, 1, 3, 7, 6, 8, 4, 9, 5),
+    (1, 2, 3, 4, 5, 6, 7, 9, 8),
+]
+# 4x4 (ô trống = 16), 28 bước tối ưu
+START_4X4 = (9, 1, 6, 4, 5, 12, 2, 3, 13, 15, 16, 8, 14, 7, 10, 11)
+
+
+def is_path(path, size):
+    return all(pack(b) in successors(pack(a), size) for a, b in zip(path, path[1:]))
+
+
+def test_distributed_search_is_optimal_on_3x3():
+    # Gọi thẳng hda_star (bỏ qua ngưỡng PARALLEL_MIN_CELLS) để chạy tìm kiếm phân tán trên 8-puzzle
+    for workers in (2, 3):
+        for start in STARTS:
+            path = hda_star.hda_star(pack(start), pack(GOAL), 3, workers=workers)
+            assert path[0] == pack(start) and path[-1] == pack(GOAL)
+            assert len(path) == len(a_star.solve(start, GOAL))
+            assert is_path([hda_star.unpack(code, 3) for code in path], 3)
+    assert not multiprocessing.active_children()  # Mọi tiến trình đã dừng sau khi kết thúc
+
+
+def test_solve_runs_in_parallel_on_4x4():
+    path = hda_star.solve(START_4X4, GOAL_4X4, workers=3)
+    assert path[0] == START_4X4 and path[-1] == GOAL_4X4
+    assert len(path) - 1 == 28
+    assert is_path(path, 4)
+    assert not multiprocessing.active_children()
@@ -0,0 +1,22 @@
+import random
+
+import pytest
+
+from algorithms import hill_climbing, hill_climbing_ANDOR, steepest_hill, steepest_hill_ANDOR, stochastic_hill_ANDOR
+
+GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 9)
+STARTS = [
+    (6, 8, 9, 5, 2, 4, 3, 7, 1),
+    (8, 6, 7, 2, 5, 4, 3, 9, 1),
+]
+
+
+@pytest.mark.parametrize("module", [hill_climbing, hill_climbing_ANDOR, steepest_hill, steepest_hill_ANDOR,
+                                    stochastic_hill_ANDOR])
+def test_serial_seed_is_reproducible(module):
+    # workers=1 (mặc định): seed phải cố định kết quả dù bộ sinh toàn cục của random ở trạng thái nào
+    for start in STARTS:
+        random.seed(1)
+        first = module.solve(start, GOAL, max_restarts=5, seed=11)
+        random.seed(2)
+        assert module.solve(start, GOAL, max_restarts=5, seed=11) == first
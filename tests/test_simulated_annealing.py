@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from algorithms import simulated_annealing, simulated_annealing_ANDOR
+from algorithms.batch_annealing import BATCH_CHAINS
+from algorithms.macro_tables import macro_successors
+from algorithms.move_tables import successors
+from algorithms.state_kernel import pack
+
+GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 9)
+START = (1, 2, 3, 4, 9, 6, 7, 5, 8)
+MODULES = [(simulated_annealing, False), (simulated_annealing_ANDOR, True)]
+
+
+def is_path(path, start, double):
+    if path[0] != start or path[-1] != GOAL:
+        return False
+    for a, b in zip(path, path[1:]):
+        neighbors = [code for code, _ in macro_successors(pack(a), 3)] if double else successors(pack(a), 3)
+        if pack(b) not in neighbors:
+            return False
+    return True
+
+
+def no_batch(*args, **kwargs):
+    raise AssertionError("anneal_batch không được gọi khi chạy một chuỗi")
+
+
+@pytest.mark.parametrize("module, double", MODULES)
+def test_without_numpy_runs_one_chain(monkeypatch, module, double):
+    monkeypatch.setattr(module, "HAVE_NUMPY", False)
+    monkeypatch.setattr(module, "anneal_batch", no_batch)
+    random.seed(1)  # Một chuỗi không luôn đến đích (di chuyển kép): cố định bộ sinh toàn cục
+    path = module.solve(START, GOAL)
+    assert path is not None and is_path(path, START, double)
+
+
+@pytest.mark.parametrize("module, double", MODULES)
+def test_default_chains_with_numpy(monkeypatch, module, double):
+    # Có numpy: chains=None chuyển sang BATCH_CHAINS chuỗi theo lô; chains=1 vẫn là một chuỗi như cũ
+    calls = []
+
+    def fake_batch(start, goal, size, chains, *args, **kwargs):
+        calls.append((chains, kwargs.get("double", False), kwargs.get("seed")))
+        return [start, goal]
+
+    monkeypatch.setattr(module, "HAVE_NUMPY", True)
+    monkeypatch.setattr(module, "anneal_batch", fake_batch)
+    module.solve(START, GOAL, seed=5)
+    assert calls == [(BATCH_CHAINS, double, 5)]
+    random.seed(1)  # Một chuỗi không luôn đến đích (di chuyển kép): cố định bộ sinh toàn cục
+    assert is_path(module.solve(START, GOAL, chains=1), START, double)
+    assert len(calls) == 1
@@ -0,0 +1,53 @@
+import heapq
+
+from algorithms import a_star, a_star_ANDOR, sma_star
+from algorithms.exact_table_ANDOR import path_cost
+from algorithms.move_tables import successors
+from algorithms.state_kernel import pack
+
+GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 9)
+MAX_NODES = 50
+
+# (trạng thái, số bước tối ưu với di chuyển đơn, chi phí tối ưu với di chuyển kép)
+CASES = [
+    ((6, 8, 9, 5, 2, 4, 3, 7, 1), 28, 28),
+    ((2, 1, 3, 7, 6, 8, 4, 9, 5), 21, 21),
+    ((4, 2, 1, 6, 9, 5, 3, 8, 7), 24, 24),
+    ((8, 1, 3, 7, 5, 2, 4, 9, 6), 21, 21),
+]
+
+
+def record_heap_sizes(monkeypatch):
+    """Thay heappush trong sma_star để ghi lại độ dài lớn nhất của mỗi heap."""
+    largest = [0]
+
+    def heappush(heap, item):
+        heapq.heappush(heap, item)
+        largest[0] = max(largest[0], len(heap))
+
+    monkeypatch.setattr(sma_star, "heappush", heappush)
+    return largest
+
+
+def heap_bound():
+    # Sau khi lọc mỗi heap còn tối đa MAX_NODES mục; giữa hai lần lọc có thêm tối đa heap_limit mục
+    # cộng số mục một lần mở rộng đẩy vào
+    return sma_star.HEAP_FACTOR * MAX_NODES + sma_star.HEAP_SLACK + 64
+
+
+def test_heaps_stay_bounded_single_moves(monkeypatch):
+    largest = record_heap_sizes(monkeypatch)
+    for start, moves, _ in CASES:
+        path = a_star.solve(start, GOAL, max_nodes=MAX_NODES)
+        assert len(path) - 1 == moves
+        assert all(pack(b) in successors(pack(a), 3) for a, b in zip(path, path[1:]))
+    assert largest[0] <= heap_bound()
+
+
+def test_heaps_stay_bounded_double_moves(monkeypatch):
+    largest = record_heap_sizes(monkeypatch)
+    for start, _, cost in CASES[1:]:
+        path = a_star_ANDOR.solve(start, GOAL, max_nodes=MAX_NODES)
+        assert path[0] == start and path[-1] == GOAL
+        assert path_cost(path) == cost
+    assert largest[0] <= heap_bound()